@@ -1,152 +1,238 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session
+from flask import Flask, render_template, request, redirect, url_for, jsonify, session, g, abort, get_template_attribute
+from markupsafe import Markup
+import click
 import os
-from werkzeug.utils import secure_filename
-from db_config import get_connection, init_db
+from db_config import get_connection, release_connection, pool_stats, init_db, IntegrityError
 import hashlib
-from PIL import Image
-from PIL.ExifTags import TAGS, GPSTAGS
+import hmac
+import logging
 import time
-from math import radians, sin, cos, sqrt, atan2
+import threading
 from datetime import datetime
-from datetime import date
-import random
-
-# ✅ 거리 계산 (하버사인 공식)
-def calc_distance(lat1, lon1, lat2, lon2):
-    R = 6371.0  # km 단위
-    dlat = radians(lat2 - lat1)
-    dlon = radians(lon2 - lon1)
-    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
-    c = 2 * atan2(sqrt(a), sqrt(1 - a))
-    return R * c
-
-
-# ✅ 안전한 시간 파싱 (EXIF or DB 포맷 혼용 대응)
-def safe_parse_time(t):
-    """다양한 datetime 포맷을 처리 (ex: '2025-10-29 19:43:33', '2025-10-29 19:43:33.441000')"""
-    if not t:
-        return None
-    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y:%m:%d %H:%M:%S"):
-        try:
-            return datetime.strptime(t, fmt)
-        except ValueError:
-            continue
-    print(f"[WARN] 시간 파싱 실패 → '{t}'")
-    return None
-
+from ranking import (
+    record_photo, claim_photo, rebuild_all_sessions, rebuild_user_sessions, ranking_trace, tracing, start_trace, reset_trace,
+    RANKING_WINDOWS, normalize_shot_time, now_shot_time, to_epoch, backfill_shot_at,
+)
+from images import derivative_path, make_derivatives, backfill_derivatives, public_url, backfill_thumb_urls
+from storage import store_upload, register_blob
+from importer import import_photos
+from jobs import JobQueue, photo_job_status
+from color_analyzer import analyze_image
+from cache import make_cache, ReadThroughCache
+from like_counter import LikeCounterBuffer
+from user_stats import bump_user_stats, bump_likes_received, load_user_stats, rebuild_user_stats
+from daily_color import DailyColorService
+from leaderboard import Leaderboard
+from metrics import observe_request, render_metrics
+from log_config import setup_logging
+from assets import StaticAssets, precompress_assets
+
+log = logging.getLogger(__name__)
+from geo import parse_bbox, query_trend, geohash_encode, query_nearby, backfill_geohash
+
+# ✅ 랭킹 계산용 전체 사진 조회 (email, shot_time, lat, lon)
+def fetch_ranking_rows():
+    conn = get_connection()
+    cur = conn.cursor()
 
-# ✅ 산책 세션 그룹핑 (시간 기준)
-def group_by_time(photo_data, gap_min=300):  # 🔹 5시간(300분) 기준으로 동일 세션 묶음
-    sessions = []
-    current = [photo_data[0]]
+    cur.execute("""
+        SELECT U.EMAIL, P.SHOT_AT, P.GPS_LATITUDE, P.GPS_LONGITUDE
+        FROM PHOTOS P
+        JOIN USERS U ON P.USER_ID = U.USER_ID
+        WHERE P.GPS_LATITUDE IS NOT NULL AND P.GPS_LONGITUDE IS NOT NULL
+          AND P.SHOT_AT IS NOT NULL
+        ORDER BY U.EMAIL, P.SHOT_AT
+    """)
+    rows = cur.fetchall()
+    conn.close()
+    return rows
 
-    for i in range(1, len(photo_data)):
-        t1 = safe_parse_time(photo_data[i - 1][0])
-        t2 = safe_parse_time(photo_data[i][0])
-        if not t1 or not t2:
-            continue
 
-        diff = (t2 - t1).total_seconds() / 60
-        print(f"[DEBUG] 시간 비교: {photo_data[i - 1][0]} → {photo_data[i][0]} | 차이 {diff:.2f}분")
+# =========================================
+# Flask 기본 설정
+# =========================================
+setup_logging()  # LOG_LEVEL / LOG_LEVELS
+app = Flask(__name__)
+app.secret_key = 'colorwalk-secret'
+app.config['UPLOAD_FOLDER'] = 'static/uploads'
 
-        if diff <= gap_min:
-            current.append(photo_data[i])
-        else:
-            sessions.append(current)
-            current = [photo_data[i]]
+os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+init_db()  # 처음 실행 시 테이블 생성
 
-    sessions.append(current)
-    print(f"[DEBUG] 세션 {len(sessions)}개로 그룹핑 완료")
-    return sessions
+# ✅ 정적 파일: 지문 URL(?v=) + immutable + 내용 해시 ETag + 사전 압축본 (assets.py)
+static_assets = StaticAssets(app)
+static_assets.init_app()
 
 
-# ✅ 사용자별 세션 점수 계산
-def calc_user_score(email, photo_data):
-    sessions = group_by_time(photo_data)
-    total_score = 0
-    total_dist = 0
-    total_photos = 0
+# =========================================
+# 요청 단위 DB 연결 (예외가 나도 요청이 끝나면 항상 풀에 반납)
+# =========================================
+def get_db():
+    """현재 요청의 연결 (처음 호출할 때 풀에서 가져오고 이후엔 재사용)"""
+    if "db" not in g:
+        conn = get_connection()
+        if conn is None:
+            abort(503, "DB 연결 실패 (연결 풀 대기 시간 초과)")
+        g.db = conn
+    return g.db
 
-    for session in sessions:
-        session_dist = 0
-        if len(session) < 2:
-            print(f"[INFO] {email} 세션에 사진 1장만 있어 거리 계산 생략")
-            total_photos += len(session)
-            continue
 
-        for i in range(1, len(session)):
-            _, lat1, lon1 = session[i - 1]
-            _, lat2, lon2 = session[i]
+@app.teardown_appcontext
+def release_db(exc):
+    conn = g.pop("db", None)
+    if conn is not None:
+        release_connection(conn)  # 커밋하지 않은 작업은 롤백됨
 
-            # ✅ 문자열 → float 변환
-            lat1, lon1, lat2, lon2 = float(lat1), float(lon1), float(lat2), float(lon2)
-            dist = calc_distance(lat1, lon1, lat2, lon2)
-            session_dist += dist
-            print(f"[DEBUG] 거리 계산: ({lat1},{lon1}) → ({lat2},{lon2}) = {dist:.3f} km")
 
-        photo_count = len(session)
-        score = photo_count * 10 + session_dist * 5
+# =========================================
+# 요청 지연 시간 측정 + Prometheus /metrics
+# =========================================
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+
+# ✅ 요청 단위 랭킹 추적: ?trace=ranking 또는 X-Ranking-Trace: 1 (로컬 요청 / 디버그 모드만)
+@app.before_request
+def enable_request_trace():
+    wanted = request.args.get("trace") == "ranking" or request.headers.get("X-Ranking-Trace") == "1"
+    if wanted and (app.debug or request.remote_addr in ("127.0.0.1", "::1")):
+        g.ranking_trace_token = start_trace()
+
+
+@app.teardown_request
+def disable_request_trace(exc):
+    token = g.pop("ranking_trace_token", None)
+    if token is not None:
+        reset_trace(token)
+
+
+@app.after_request
+def record_request_latency(response):
+    started = g.get("request_started")
+    if started is not None:
+        observe_request(request.endpoint, request.method, response.status_code,
+                        time.perf_counter() - started)
+    return response
+
+
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")  # 설정 시 외부 수집기는 Authorization: Bearer <토큰>
+
+
+def _metrics_allowed():
+    """로컬 요청이거나 METRICS_TOKEN 과 일치하는 Bearer 토큰이 있을 때만 허용"""
+    if request.remote_addr in ("127.0.0.1", "::1"):
+        return True
+    auth = request.headers.get("Authorization", "")
+    return bool(METRICS_TOKEN) and hmac.compare_digest(auth, f"Bearer {METRICS_TOKEN}")
+
+
+@app.route("/metrics")
+def metrics():
+    # ✅ /internal/pool 과 같은 내부용 → 외부에는 존재하지 않는 것처럼 404
+    if not _metrics_allowed():
+        abort(404)
+    pool = pool_stats()
+    body = render_metrics({
+        "colorwalk_db_pool_busy": pool["busy"],
+        "colorwalk_db_pool_open": pool["open"],
+        "colorwalk_db_pool_max": pool["max"],
+        "colorwalk_db_acquired_total": pool["acquired"],
+        "colorwalk_db_acquire_failures_total": pool["acquire_failures"],
+        "colorwalk_db_acquire_wait_seconds_total": pool["wait_total_ms"] / 1000,
+        "colorwalk_photo_cache_hits_total": photo_cache.hits,
+        "colorwalk_photo_cache_misses_total": photo_cache.misses,
+        "colorwalk_gallery_cache_hits_total": gallery_cache.backend.hits,
+        "colorwalk_gallery_cache_misses_total": gallery_cache.backend.misses,
+        "colorwalk_card_cache_hits_total": card_cache.hits,
+        "colorwalk_card_cache_misses_total": card_cache.misses,
+    })
+    return body, 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
 
-        total_score += score
-        total_dist += session_dist
-        total_photos += photo_count
 
-        print(f"[DEBUG] {email} 세션 요약 → 거리: {round(session_dist, 3)} km, 사진 수: {photo_count}")
+# ✅ 연결 풀 상태 (내부용: 서버 로컬에서만 조회 가능)
+@app.route("/internal/pool")
+def internal_pool():
+    if request.remote_addr not in ("127.0.0.1", "::1"):
+        abort(404)
+    return jsonify(pool_stats())
 
-    print(f"[RESULT] {email} 총 거리: {round(total_dist, 3)} km, 총 사진 수: {total_photos}, 총 점수: {round(total_score, 1)}")
-    return total_photos, total_dist, total_score
 
+# =========================================
+# 업로드 후처리 작업 (워커 스레드에서 실행)
+# =========================================
+job_queue = JobQueue.from_env()
+_ranking_locks = [threading.Lock() for _ in range(16)]  # 같은 사용자 세션 동시 갱신 방지
 
-# ✅ 전체 사용자 랭킹 계산
-def calculate_ranking():
-    conn = get_connection()
-    cur = conn.cursor()
 
+@job_queue.handler("derive")
+def derive_job(cur, payload):
+    job_queue.run_cpu(make_derivatives, payload["save_path"], True)
+    image_path = payload.get("image_path")
+    if not image_path:
+        return  # 예전 형식 작업 (THUMB_URL 은 backfill-image-urls 로 채움)
+    # ✅ 썸네일이 생긴 뒤에만 THUMB_URL 저장 (같은 내용의 다른 사진도 함께)
     cur.execute("""
-        SELECT U.EMAIL, TO_CHAR(P.SHOT_TIME), P.GPS_LATITUDE, P.GPS_LONGITUDE
-        FROM PHOTOS P
-        JOIN USERS U ON P.USER_ID = U.USER_ID
-        WHERE P.GPS_LATITUDE IS NOT NULL AND P.GPS_LONGITUDE IS NOT NULL
-        ORDER BY U.EMAIL, P.SHOT_TIME
-    """)
-    rows = cur.fetchall()
-    conn.close()
-
-    if not rows:
-        print("[WARN] 📸 photos 테이블에 데이터가 없습니다.")
-        return []
-
-    # ✅ 사용자별 데이터 분류
-    users = {}
-    for email, shot_time, lat, lon in rows:
-        users.setdefault(email, []).append((shot_time, lat, lon))
+        SELECT photo_id FROM photos
+        WHERE image_path = :image_path AND thumb_url IS NULL
+    """, {"image_path": image_path})
+    photo_ids = [r[0] for r in cur.fetchall()]
+    if photo_ids:
+        cur.execute("""
+            UPDATE photos SET thumb_url = :thumb_url
+            WHERE image_path = :image_path AND thumb_url IS NULL
+        """, {"thumb_url": public_url(image_path, "thumb"), "image_path": image_path})
+        cur.connection.commit()
+        invalidate_gallery()  # 원본 URL 로 캐시된 카드 → 썸네일로
+        for photo_id in photo_ids:
+            invalidate_card(photo_id)
+
+
+@job_queue.handler("ranking")
+def ranking_job(cur, payload):
+    user_id = payload["user_id"]
+    with _ranking_locks[user_id % len(_ranking_locks)], ranking_trace(payload.get("trace", False)):
+        # ✅ 이미 반영된 사진(작업 재실행 / 다른 프로세스 / rebuild-ranking)은 건너뜀
+        #    표시와 세션 추가가 한 트랜잭션이라 중간에 죽어도 둘 다 없던 일이 된다
+        photo_id = payload.get("photo_id")
+        if photo_id is not None and not claim_photo(cur, photo_id):
+            log.debug("랭킹 반영 건너뜀 (이미 반영됨): photo_id=%s", photo_id)
+            return
+        record_photo(cur, user_id, payload["shot_time"], payload["lat"], payload["lon"])
+        cur.connection.commit()
+
+
+@job_queue.handler("color")
+def color_job(cur, payload):
+    result = job_queue.run_cpu(analyze_image, payload["save_path"])
+    # ✅ 사용자가 색상을 고르지 않았으면 분석 결과를 카테고리로 사용
+    assign = payload.get("auto_assign") and result["color_id"]
+    cur.execute(f"""
+        UPDATE photos
+        SET dominant_color_id = :color_id, color_confidence = :confidence
+            {", color_id = :color_id" if assign else ""}
+        WHERE photo_id = :photo_id
+    """, {
+        "color_id": result["color_id"],
+        "confidence": result["confidence"],
+        "photo_id": payload["photo_id"],
+    })
+    if assign:
+        cur.connection.commit()
+        invalidate_gallery()  # 카테고리가 바뀌었으므로 색상별 첫 페이지 갱신
+        invalidate_card(payload["photo_id"])
 
-    # ✅ 각 사용자별 점수 계산
-    results = []
-    for email, photo_data in users.items():
-        print(f"\n[START] {email} 사용자 점수 계산 시작 ({len(photo_data)}장)")
-        total_photos, total_dist, total_score = calc_user_score(email, photo_data)
-        results.append((email, total_photos, round(total_dist, 2), round(total_score, 1)))
 
-    # ✅ 점수순 정렬
-    results.sort(key=lambda x: x[3], reverse=True)
+# ✅ 리더보드 스냅샷 (LEADERBOARD_REFRESH_SEC 마다 USER_SCORES 에서 새로 만들어 교체)
+leaderboard = Leaderboard(refresh_interval=float(os.environ.get("LEADERBOARD_REFRESH_SEC", 60)))
 
-    print("\n📊 최종 랭킹 결과:")
-    for rank, (email, cnt, dist, score) in enumerate(results, start=1):
-        print(f" {rank}. {email} | 사진 {cnt}장 | 거리 {dist:.2f} km | 점수 {score:.1f}")
 
-    return results
-
-
-# =========================================
-# Flask 기본 설정
-# =========================================
-app = Flask(__name__)
-app.secret_key = 'colorwalk-secret'
-app.config['UPLOAD_FOLDER'] = 'static/uploads'
-
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-init_db()  # 처음 실행 시 테이블 생성
+@app.before_request
+def start_background_workers():
+    # 최초 요청 시 워커 시작 + 미완료 작업 복구 (이후엔 즉시 반환)
+    job_queue.start()
+    leaderboard.start()
+    daily_colors.start()
 
 
 # =========================================
@@ -155,11 +241,10 @@ init_db()  # 처음 실행 시 테이블 생성
 @app.route("/testdb")
 def test_db():
     try:
-        conn = get_connection()
+        conn = get_db()
         cur = conn.cursor()
         cur.execute("SELECT '연결 성공!' FROM dual")
         result = cur.fetchone()
-        conn.close()
         return f"✅ Oracle 연결 확인: {result[0]}"
     except Exception as e:
         return f"❌ 연결 실패: {str(e)}"
@@ -175,13 +260,12 @@ def register():
         email = request.form["email"]
         password = hashlib.sha256(request.form["password"].encode()).hexdigest()
 
-        conn = get_connection()
+        conn = get_db()
         cur = conn.cursor()
 
         # 이메일 중복 검사
         cur.execute("SELECT 1 FROM USERS WHERE email = :email", {"email": email})
         if cur.fetchone():
-            conn.close()
             return "<h3>⚠️ 이미 존재하는 이메일입니다.</h3>"
 
         # 새 사용자 등록
@@ -190,7 +274,6 @@ def register():
             VALUES (:name, :email, :password)
         """, {"name": name, "email": email, "password": password})
         conn.commit()
-        conn.close()
         return redirect(url_for("login"))
 
     return render_template("register.html")
@@ -205,20 +288,20 @@ def login():
         email = request.form["email"]
         password = hashlib.sha256(request.form["password"].encode()).hexdigest()
 
-        conn = get_connection()
+        conn = get_db()
         cur = conn.cursor()
         cur.execute("""
-            SELECT user_id, name
+            SELECT user_id, name, today_color, today_date
             FROM USERS
             WHERE email = :email AND password = :password
         """, {"email": email, "password": password})
         user = cur.fetchone()
-        conn.close()
 
         if user:
             session["user_id"] = int(user[0])
             session["user_name"] = user[1]
             session["user_email"] = email
+            daily_colors.restore(session, user[2], user[3])  # 다른 기기에서 다시 뽑은 오늘 색상
             return redirect(url_for("main"))
         else:
             return "<h3>❌ 이메일 또는 비밀번호가 올바르지 않습니다.</h3>"
@@ -240,93 +323,18 @@ def main():
     return render_template('main.html')
 
 
+# ✅ 오늘의 색상: 기본은 (사용자, 날짜) 시드 선택, 다시 뽑기만 세션 + 백그라운드 일괄 저장
+daily_colors = DailyColorService(
+    flush_interval=float(os.environ.get("COLOR_FLUSH_INTERVAL", 5.0)),
+)
+
+
 @app.route('/api/color')
 def api_color():
-    import json
-    today = str(date.today())
-    force = request.args.get("force") == "1"
     user_id = session.get("user_id")
-
-    # ✅ 색상 목록
-    colors = [
-        {"id": 1, "key": "red", "name": "레드", "emoji": "❤️", "hex": "#FF4B5C"},
-        {"id": 2, "key": "orange", "name": "오렌지", "emoji": "🧡", "hex": "#FF8C42"},
-        {"id": 3, "key": "yellow", "name": "옐로우", "emoji": "💛", "hex": "#FFD93D"},
-        {"id": 4, "key": "green", "name": "그린", "emoji": "💚", "hex": "#4CAF50"},
-        {"id": 5, "key": "blue", "name": "블루", "emoji": "💙", "hex": "#4A90E2"},
-        {"id": 6, "key": "purple", "name": "퍼플", "emoji": "💜", "hex": "#A66DD4"},
-        {"id": 7, "key": "brown", "name": "브라운", "emoji": "🤎", "hex": "#8B5E3C"},
-        {"id": 8, "key": "black", "name": "블랙", "emoji": "🖤", "hex": "#222"},
-        {"id": 9, "key": "white", "name": "화이트", "emoji": "🤍", "hex": "#FFFFFF"},
-    ]
-
-    # ✅ 기존 세션 방식 그대로 유지
-    if 'global_color_data' not in session:
-        session['global_color_data'] = {}
-
-    color_cache = session['global_color_data']
-
-    # ✅ 오늘의 색상 유지 (세션 기준)
-    if not force and today in color_cache:
-        return jsonify(color_cache[today])
-
-    # ✅ 색상 새로 뽑기
-    if force and today in color_cache:
-        colors = [c for c in colors if c["key"] != color_cache[today]["key"]]
-
-    new_color = random.choice(colors)
-    color_cache[today] = new_color
-    session['global_color_data'] = color_cache
-
-    # ✅ 로그인한 경우 DB에도 오늘 색상/날짜 저장
-    if user_id:
-        try:
-            conn = get_connection()
-            cur = conn.cursor()
-            cur.execute("""
-                UPDATE users
-                SET today_color = :c, today_date = :d
-                WHERE user_id = :uid
-            """, {
-                "c": json.dumps(new_color, ensure_ascii=False),
-                "d": today,
-                "uid": user_id
-            })
-            conn.commit()
-            conn.close()
-        except Exception as e:
-            print("⚠️ DB 저장 오류:", e)
-
-    return jsonify(new_color)
-
-# =========================================
-# EXIF GPS → 소수점 변환 유틸
-# =========================================
-def convert_to_decimal(value):
-    """EXIF GPS 데이터를 10진수(float)로 변환"""
-    if not value:
-        return None
-    try:
-        # (도, 분, 초) 형식
-        if isinstance(value, (list, tuple)) and len(value) == 3:
-            def _to_float(x):
-                return x[0] / x[1] if isinstance(x, tuple) else float(x)
-            deg = _to_float(value[0])
-            minutes = _to_float(value[1])
-            seconds = _to_float(value[2])
-            return round(deg + (minutes / 60.0) + (seconds / 3600.0), 6)
-        # 이미 float이거나 int일 때
-        elif isinstance(value, (float, int)):
-            return round(float(value), 6)
-        # 문자열인 경우
-        elif isinstance(value, str):
-            return round(float(value), 6)
-        else:
-            return None
-    except Exception as e:
-        print("⚠️ GPS 변환 오류:", e)
-        return None
-
+    if request.args.get("force") == "1":
+        return jsonify(daily_colors.reroll(session, user_id))
+    return jsonify(daily_colors.current(session, user_id))
 
 # =========================================
 # 업로드 (촬영시간 + 위도/경도 완전 추출)
@@ -343,19 +351,20 @@ def upload():
 
     desc = request.form.get('description')
     loc = request.form.get('location')
-    color_id = int(request.form.get('color_id') or 1)
+    color_id_form = request.form.get('color_id')
+    color_id = int(color_id_form or 1)  # 미선택 시 색상 분석 결과로 교체됨
     file = request.files.get('image')
 
     if not file:
         return "<h3>⚠️ 이미지는 반드시 선택해야 합니다.</h3>"
 
-    filename = secure_filename(file.filename)
-    save_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-    file.save(save_path)
-    db_path = f"uploads/{filename}"
+    # ✅ 콘텐츠 해시 경로로 저장 (쓰는 동안 해시 계산 + 같은 버퍼에서 EXIF 파싱)
+    stored = store_upload(file.stream, app.config['UPLOAD_FOLDER'], file.filename)
+    db_path = stored["db_path"]
+    exif = stored["exif"]
 
-    # ✅ 기본값
-    gps_lat, gps_lon, shot_time = None, None, None
+    # ✅ 기본값 (촬영시간은 EXIF 우선)
+    gps_lat, gps_lon, shot_time = None, None, exif["shot_time"]
 
     # ✅ 1) 프론트에서 전달된 GPS 좌표 확인
     gps_lat_form = request.form.get('gps_latitude')
@@ -363,55 +372,42 @@ def upload():
     if gps_lat_form and gps_lon_form:
         gps_lat = float(gps_lat_form)
         gps_lon = float(gps_lon_form)
-        print(f"📍 브라우저 위치 수신 → 위도 {gps_lat}, 경도 {gps_lon}")
+        log.debug("브라우저 위치 수신 → 위도 %s, 경도 %s", gps_lat, gps_lon)
 
     # ✅ 2) EXIF에서 GPS 시도 (만약 존재한다면)
     if gps_lat is None or gps_lon is None:
-        try:
-            img = Image.open(save_path)
-            exif_data = img._getexif()
-            if exif_data:
-                gps_info = {}
-                for tag_id, value in exif_data.items():
-                    tag = TAGS.get(tag_id, tag_id)
-                    if tag == "DateTimeOriginal":
-                        shot_time = value
-                    elif tag == "GPSInfo":
-                        for t in value:
-                            sub_tag = GPSTAGS.get(t, t)
-                            gps_info[sub_tag] = value[t]
-                if gps_info:
-                    gps_lat = convert_to_decimal(gps_info.get("GPSLatitude"))
-                    gps_lon = convert_to_decimal(gps_info.get("GPSLongitude"))
-                    if gps_info.get("GPSLatitudeRef") == "S":
-                        gps_lat = -gps_lat
-                    if gps_info.get("GPSLongitudeRef") == "W":
-                        gps_lon = -gps_lon
-        except Exception as e:
-            print("⚠️ EXIF 파싱 실패:", e)
+        gps_lat, gps_lon = exif["lat"], exif["lon"]
 
     # ✅ 3) GPS 정보가 전혀 없을 경우 랜덤값
     if gps_lat is None or gps_lon is None:
         import random
         gps_lat = round(random.uniform(34.2, 37.9), 6)
         gps_lon = round(random.uniform(126.5, 129.5), 6)
-        print(f"📍 랜덤 좌표 지정됨 → 위도 {gps_lat}, 경도 {gps_lon}")
+        log.debug("랜덤 좌표 지정됨 → 위도 %s, 경도 %s", gps_lat, gps_lon)
 
-    # ✅ 4) 촬영시간이 없으면 현재 시각으로 설정
+    # ✅ 4) 촬영시각 정규화 (OffsetTimeOriginal 반영), 없거나 해석 불가면 현재 시각
+    shot_at = normalize_shot_time(shot_time, exif["shot_offset"]) or now_shot_time()
     if not shot_time:
-        shot_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        shot_time = shot_at.strftime("%Y-%m-%d %H:%M:%S")
+
+    # ✅ 썸네일 URL 은 파일이 이미 있을 때만 (같은 내용 재업로드), 없으면 derive 작업이 만든 뒤 채움
+    thumb_ready = not stored["is_new"] and os.path.exists(derivative_path(stored["save_path"], "thumb"))
 
     # ✅ DB 저장
-    conn = get_connection()
+    conn = get_db()
     cur = conn.cursor()
+    photo_id_var = cur.var(int)
     cur.execute("""
         INSERT INTO PHOTOS (
             user_id, color_id, description, location, image_path,
-            gps_latitude, gps_longitude, shot_time, likes_count, created_at
+            gps_latitude, gps_longitude, geohash, shot_time, shot_at, thumb_url,
+            likes_count, created_at
         ) VALUES (
             :user_id, :color_id, :description, :location, :image_path,
-            :gps_latitude, :gps_longitude, :shot_time, 0, SYSTIMESTAMP
+            :gps_latitude, :gps_longitude, :geohash, :shot_time, :shot_at, :thumb_url,
+            0, SYSTIMESTAMP
         )
+        RETURNING photo_id INTO :photo_id
     """, {
         "user_id": int(user_id),
         "color_id": int(color_id),
@@ -420,195 +416,433 @@ def upload():
         "image_path": db_path,
         "gps_latitude": gps_lat,
         "gps_longitude": gps_lon,
-        "shot_time": shot_time
+        "geohash": geohash_encode(gps_lat, gps_lon),
+        "shot_time": shot_time,
+        "shot_at": shot_at,
+        "thumb_url": public_url(db_path, "thumb") if thumb_ready else None,  # 목록 화면은 이 값을 그대로 사용
+        "photo_id": photo_id_var
     })
+    photo_id = photo_id_var.getvalue()[0]
+
+    # ✅ 처음 보는 내용이면 저장소에 기록 + 내 업로드 수
+    register_blob(cur, stored["content_hash"], db_path, stored["byte_size"])
+    bump_user_stats(cur, int(user_id), photos=1)
+
+    # ✅ 후처리 작업 등록 (썸네일은 아직 없을 때만) → 커밋 후 워커에 투입
+    jobs = []
+    if not thumb_ready:
+        jobs.append(("derive", {"save_path": stored["save_path"], "image_path": db_path}))
+    jobs.append(("color", {
+        "photo_id": photo_id,
+        "save_path": stored["save_path"],
+        "auto_assign": not color_id_form,
+    }))
+    jobs.append(("ranking", {
+        "trace": tracing(user_id),  # 요청에서 켠 랭킹 추적을 작업까지 이어감
+        "photo_id": photo_id,  # 같은 사진을 두 번 반영하지 않도록 (claim_photo)
+        "user_id": int(user_id),
+        "shot_time": to_epoch(shot_at),  # epoch 숫자 → 작업에서 다시 파싱하지 않음
+        "lat": gps_lat,
+        "lon": gps_lon,
+    }))
+    jobs = [(job_queue.create_job(cur, photo_id, kind, payload), kind, payload)
+            for kind, payload in jobs]
+
     conn.commit()
-    conn.close()
+    invalidate_gallery(user_id)
 
-    return redirect(url_for("gallery", color_id=color_id, t=int(time.time())))
+    for job_id, kind, payload in jobs:
+        job_queue.submit(job_id, kind, payload)
+
+    return redirect(url_for("gallery", color_id=color_id))
 
 
 # =========================================
-# (옵션) 메타데이터 단독 추출 유틸
+# 갤러리
 # =========================================
-def extract_metadata(image_path):
-    img = Image.open(image_path)
-    exif_data = img._getexif()
-    meta = {"gps": None, "time": None}
-    if exif_data:
-        for tag_id, value in exif_data.items():
-            tag = TAGS.get(tag_id, tag_id)
-            if tag == 'DateTimeOriginal':
-                meta["time"] = value
-            elif tag == 'GPSInfo':
-                gps_info = {}
-                for t in value:
-                    sub_tag = GPSTAGS.get(t, t)
-                    gps_info[sub_tag] = value[t]
-                meta["gps"] = gps_info
-    return meta
+GALLERY_PAGE_SIZE = 24
+
+# ✅ 갤러리 개수 / 색상별 첫 페이지 캐시 (TTL + 쓰기 시 무효화, CACHE_URL 이면 프로세스 간 공유)
+#   - count:all, count:user:<id> : 업로드 시 무효화
+#   - first:<color_key>          : "gallery" 태그 (업로드, 좋아요, 색상 자동 분류 시 무효화)
+#   댓글은 갤러리 카드에 표시되지 않으므로 댓글 작성은 사진 상세 캐시만 비운다.
+GALLERY_CACHE_TTL = int(os.environ.get("GALLERY_CACHE_TTL", 30))
+gallery_cache = ReadThroughCache(make_cache("gallery", maxsize=512, ttl=GALLERY_CACHE_TTL))
+
+
+def invalidate_gallery(user_id=None):
+    gallery_cache.invalidate_tag("gallery")
+    if user_id:
+        gallery_cache.invalidate("count:all", f"count:user:{user_id}")
+
+
+def count_all_photos(cur):
+    def load():
+        cur.execute("SELECT COUNT(*) FROM photos")
+        return cur.fetchone()[0]
+    return gallery_cache.get_or_load("count:all", load)
+
+
+def count_user_photos(cur, user_id):
+    if not user_id:
+        return 0
+
+    def load():
+        cur.execute("SELECT COUNT(*) FROM photos WHERE user_id = :1", [user_id])
+        return cur.fetchone()[0]
+    return gallery_cache.get_or_load(f"count:user:{user_id}", load)
+
+
+def first_gallery_page(cur, color_key=None):
+    key = f"first:{(color_key or 'all').lower()}"
+    return gallery_cache.get_or_load(key, lambda: fetch_gallery_page(cur, color_key), tags=("gallery",))
+
+
+# ✅ DB 이미지 경로 → 정적 파일 URL (kind: "thumb" / "medium" 파생본, None 이면 원본)
+def to_image_url(image_path, kind=None):
+    if kind:
+        image_path = derivative_path(image_path, kind)
+    if not image_path.startswith("static/"):
+        image_path = os.path.join("static", image_path).replace("\\", "/")
+    return url_for("static", filename=image_path.replace("static/", ""))
+
+
+# ✅ NVL(thumb_url, image_path) 로 읽은 값 → 목록용 이미지 URL
+#    썸네일이 만들어져 저장된 URL('/...')은 그대로, 아직 없으면(THUMB_URL NULL) 원본 URL
+def thumb_url_of(value):
+    return value if value.startswith("/") else to_image_url(value)
+
+
+def fill_thumb_urls(rows, idx):
+    """행 목록의 idx 번째 값을 썸네일 URL 로 (모두 저장된 URL 이면 복사 없이 그대로 반환)"""
+    if all(r[idx].startswith("/") for r in rows):
+        return rows
+    return [r[:idx] + (thumb_url_of(r[idx]),) + r[idx + 1:] for r in rows]
 
 
 # =========================================
-# 갤러리
+# 사진 카드 HTML 조각 캐시 (갤러리 첫 페이지 / 마이페이지)
 # =========================================
+# 카드마다 렌더링 결과를 "<종류>:<photo_id>" 로 저장 → 목록 화면은 캐시 조회 + 이어 붙이기
+# 좋아요(마이페이지 카드의 좋아요 수), 댓글, 색상 자동 분류 시 그 사진의 카드만 비운다.
+CARD_CACHE_TTL = int(os.environ.get("CARD_CACHE_TTL", 600))
+CARD_KINDS = ("gallery", "mypage")
+card_cache = make_cache("card", maxsize=4096, ttl=CARD_CACHE_TTL)
+
+
+def invalidate_card(photo_id):
+    card_cache.delete(*(f"{kind}:{photo_id}" for kind in CARD_KINDS))
+
+
+def render_cards(kind, photos):
+    """photos[i][0] 은 photo_id → 카드 HTML 을 이어 붙인 Markup (캐시에 없을 때만 렌더링)"""
+    macro = get_template_attribute("photo_cards.html", f"{kind}_card")
+    parts = []
+    for p in photos:
+        key = f"{kind}:{p[0]}"
+        html = card_cache.get(key)
+        if html is None:
+            html = str(macro(p))
+            card_cache.set(key, html)
+        parts.append(html)
+    return Markup("".join(parts))
+
+
+# ✅ 커서 (created_at, photo_id) ↔ 문자열
+def encode_gallery_cursor(created_at, photo_id):
+    created = created_at.isoformat() if hasattr(created_at, "isoformat") else str(created_at)
+    return f"{created}|{photo_id}"
+
+
+def decode_gallery_cursor(cursor):
+    created, photo_id = cursor.rsplit("|", 1)
+    return datetime.fromisoformat(created), int(photo_id)
+
+
+# ✅ 갤러리 한 페이지 조회 (created_at DESC, photo_id DESC 키셋 페이지네이션)
+def fetch_gallery_page(cur, color_key=None, cursor=None, limit=GALLERY_PAGE_SIZE):
+    where = []
+    params = {"limit": limit + 1}  # 1개 더 가져와서 다음 페이지 존재 여부 확인
+
+    if color_key and color_key.lower() != "all":
+        where.append("LOWER(c.color_key) = LOWER(:color_key)")
+        params["color_key"] = color_key
+
+    if cursor:
+        cursor_time, cursor_id = decode_gallery_cursor(cursor)
+        where.append("""(p.created_at < :cursor_time
+                 OR (p.created_at = :cursor_time AND p.photo_id < :cursor_id))""")
+        params["cursor_time"] = cursor_time
+        params["cursor_id"] = cursor_id
+
+    cur.execute(f"""
+        SELECT p.photo_id, u.name, c.color_name, p.description, p.location,
+            NVL(p.thumb_url, p.image_path), NVL(p.likes_count, 0), p.created_at, c.color_key
+        FROM PHOTOS p
+        JOIN USERS u ON p.user_id = u.user_id
+        JOIN COLOR_CATEGORIES c ON p.color_id = c.color_id
+        {"WHERE " + " AND ".join(where) if where else ""}
+        ORDER BY p.created_at DESC, p.photo_id DESC
+        FETCH FIRST :limit ROWS ONLY
+    """, params)
+    rows = cur.fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_gallery_cursor(rows[-1][7], rows[-1][0])
+
+    # ✅ 썸네일 URL (업로드 시 저장된 값, 옛 행만 보정)
+    return fill_thumb_urls(rows, 5), next_cursor
+
+
 @app.route("/gallery")
 @app.route("/gallery/<color_key>")
 def gallery(color_key=None):
-    conn = get_connection()
+    conn = get_db()
     cur = conn.cursor()
 
-    # ✅ 전체 사진 개수
-    cur.execute("SELECT COUNT(*) FROM photos")
-    all_photo = cur.fetchone()[0]
-
-    # ✅ 현재 로그인한 유저의 업로드 사진 개수
-    user_id = session.get("user_id")
-    cur.execute("SELECT COUNT(*) FROM photos WHERE user_id = :1", [user_id])
-    upload_photo = cur.fetchone()[0]
-
-    # ✅ color_key가 없거나 "all"이면 전체 보기
-    if not color_key or color_key.lower() == "all":
-        cur.execute("""
-            SELECT p.photo_id, u.name, c.color_name, p.description, p.location,
-                p.image_path, NVL(p.likes_count, 0), p.created_at, c.color_key
-            FROM PHOTOS p
-            JOIN USERS u ON p.user_id = u.user_id
-            JOIN COLOR_CATEGORIES c ON p.color_id = c.color_id
-            ORDER BY p.created_at DESC
-        """)
-    else:
-        # ✅ color_key로 필터링
-        cur.execute("""
-            SELECT p.photo_id, u.name, c.color_name, p.description, p.location,
-                p.image_path, NVL(p.likes_count, 0), p.created_at, c.color_key
-            FROM PHOTOS p
-            JOIN USERS u ON p.user_id = u.user_id
-            JOIN COLOR_CATEGORIES c ON p.color_id = c.color_id
-            WHERE LOWER(c.color_key) = LOWER(:1)
-            ORDER BY p.created_at DESC
-        """, [color_key])
-
-    photos = cur.fetchall()
-    conn.close()
+    # ✅ 전체 사진 개수 / 현재 로그인한 유저의 업로드 사진 개수 (캐시)
+    all_photo = count_all_photos(cur)
+    upload_photo = count_user_photos(cur, session.get("user_id"))
 
-    # ✅ 이미지 경로 보정
-    photos_fixed = []
-    for p in photos:
-        image_path = p[5]
-        if not image_path.startswith("static/"):
-            image_path = os.path.join("static", image_path).replace("\\", "/")
-        image_url = url_for("static", filename=image_path.replace("static/", ""))
-        new_p = list(p)
-        new_p[5] = image_url
-        photos_fixed.append(tuple(new_p))
+    # ✅ 첫 페이지만 렌더링 (이후는 /api/gallery 로 무한 스크롤)
+    photos, next_cursor = first_gallery_page(cur, color_key)
 
     return render_template(
         "gallery.html",
         all_photo=all_photo,
         upload_photo=upload_photo,
-        photos=photos_fixed,
-        color_key=color_key
+        photos=photos,
+        photo_cards=render_cards("gallery", photos),
+        color_key=color_key,
+        next_cursor=next_cursor
     )
 
 
+# =========================================
+# 갤러리 페이지 API (무한 스크롤용)
+# =========================================
+@app.route("/api/gallery")
+def api_gallery():
+    color_key = request.args.get("color_key")
+    cursor = request.args.get("cursor")
+    limit = min(max(request.args.get("limit", GALLERY_PAGE_SIZE, type=int), 1), 100)
+
+    conn = get_db()
+    cur = conn.cursor()
+    try:
+        if not cursor and limit == GALLERY_PAGE_SIZE:
+            photos, next_cursor = first_gallery_page(cur, color_key)
+        else:
+            photos, next_cursor = fetch_gallery_page(cur, color_key, cursor, limit)
+    except ValueError:
+        return jsonify({"error": "잘못된 cursor"}), 400
+
+    return jsonify({
+        "photos": [
+            {
+                "photo_id": p[0],
+                "username": p[1],
+                "color_name": p[2],
+                "description": p[3],
+                "location": p[4],
+                "image_url": p[5],
+                "likes_count": p[6],
+                "color_key": p[8],
+            }
+            for p in photos
+        ],
+        "next_cursor": next_cursor
+    })
+
 
 # =========================================
 # 사진 상세 보기 API (팝업용)
 # =========================================
-@app.route('/photo/<int:photo_id>')
-def photo_detail(photo_id):
-    user_id = session.get("user_id")
-    conn = get_connection()
-    cur = conn.cursor()
+PHOTO_CACHE_TTL = 300
+photo_cache = make_cache("photo", maxsize=2048, ttl=PHOTO_CACHE_TTL)
+
+
+def photo_cache_key(photo_id):
+    return f"photo:{photo_id}"
+
+
+def liked_cache_key(photo_id, user_id):
+    return f"liked:{photo_id}:{user_id}"
+
+
+COMMENT_PAGE_SIZE = 20
+
+
+# ✅ 댓글 커서 (created_at, comment_id) ↔ 문자열 (갤러리 커서와 같은 형식)
+def comment_to_json(comment_id, username, content, created_at):
+    return {
+        "comment_id": comment_id,
+        "username": username,
+        "content": content,
+        "created_at": str(created_at) if created_at is not None else None,
+    }
 
+
+def page_comments(rows, limit):
+    """최신순 (limit+1)행 → (오래된 순 댓글 목록, 더 이전 댓글 커서)"""
+    older_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        older_cursor = encode_gallery_cursor(rows[-1][3], rows[-1][0])
+    return [comment_to_json(*r) for r in reversed(rows)], older_cursor
+
+
+# ✅ 사진 + 좋아요 여부 + 최신 댓글 1페이지를 한 번의 쿼리로 조회 (댓글 수만큼 행이 나옴)
+def fetch_photo_detail(cur, photo_id, user_id, comment_limit=COMMENT_PAGE_SIZE):
     cur.execute("""
         SELECT p.photo_id, u.name, p.description, p.location, p.image_path,
-        p.shot_time, p.likes_count, p.created_at
+               NVL(TO_CHAR(p.shot_at, 'YYYY-MM-DD HH24:MI:SS'), p.shot_time), NVL(p.likes_count, 0),
+               CASE WHEN EXISTS (
+                   SELECT 1 FROM likes l
+                   WHERE l.photo_id = p.photo_id AND l.user_id = :user_id
+               ) THEN 1 ELSE 0 END,
+               c.comment_id, cu.name, c.content, c.created_at
         FROM PHOTOS p
         JOIN USERS u ON p.user_id = u.user_id
+        LEFT JOIN (
+            SELECT comment_id, user_id, content, created_at,
+                   ROW_NUMBER() OVER (ORDER BY created_at DESC, comment_id DESC) AS rn
+            FROM comments
+            WHERE photo_id = :photo_id
+        ) c ON c.rn <= :comment_limit
+        LEFT JOIN users cu ON c.user_id = cu.user_id
         WHERE p.photo_id = :photo_id
-    """, {"photo_id": photo_id})
-    photo = cur.fetchone()
+        ORDER BY c.rn
+    """, {"photo_id": photo_id, "user_id": user_id, "comment_limit": comment_limit + 1})
+    rows = cur.fetchall()
+    if not rows:
+        return None, False
 
-    cur.execute("SELECT COUNT(*) FROM likes WHERE photo_id = :photo_id", {"photo_id": photo_id})
-    likes_count = cur.fetchone()[0]
+    p = rows[0]
+    comments, comments_cursor = page_comments(
+        [r[8:12] for r in rows if r[8] is not None], comment_limit
+    )
+    photo = {
+        "photo_id": p[0],
+        "username": p[1],
+        "description": p[2],
+        "location": p[3],
+        "image_path": p[4],
+        "preview_url": to_image_url(p[4], "medium"),
+        "shot_time": p[5],
+        "likes_count": int(p[6]),
+        "comments": comments,
+        "comments_cursor": comments_cursor,
+    }
+    return photo, bool(p[7])
 
-    cur.execute("SELECT 1 FROM likes WHERE photo_id = :photo_id AND user_id = :user_id",
-                {"photo_id": photo_id, "user_id": user_id})
-    liked = bool(cur.fetchone())
 
-    cur.execute("""
-        SELECT c.content, u.name
-        FROM comments c
-        JOIN users u ON c.user_id = u.user_id
-        WHERE c.photo_id = :photo_id ORDER BY c.created_at ASC
-    """, {"photo_id": photo_id})
-    comments = [{"username": r[1], "content": r[0]} for r in cur.fetchall()]
+@app.route('/photo/<int:photo_id>')
+def photo_detail(photo_id):
+    user_id = session.get("user_id")
 
-    conn.close()
-    return jsonify({
-        "photo_id": photo[0],
-        "username": photo[1],
-        "description": photo[2],
-        "location": photo[3],
-        "image_path": photo[4],
-        "shot_time": photo[5],
-        "likes_count": likes_count,
-        "liked": liked,
-        "comments": comments
-    })
+    # ✅ 사진별 캐시 + (사진, 사용자)별 좋아요 여부 캐시
+    photo = photo_cache.get(photo_cache_key(photo_id))
+    liked = photo_cache.get(liked_cache_key(photo_id, user_id))
+
+    if photo is None or liked is None:
+        conn = get_db()
+        cur = conn.cursor()
+        photo, liked = fetch_photo_detail(cur, photo_id, user_id)
+        if photo is None:
+            return jsonify({"error": "사진을 찾을 수 없습니다"}), 404
+        photo_cache.set(photo_cache_key(photo_id), photo)
+        photo_cache.set(liked_cache_key(photo_id, user_id), liked)
+
+    return jsonify({**photo, "liked": liked})
 
 
 # =========================================
 # 좋아요 토글
 # =========================================
-# =========================================
-# 좋아요 토글
-# =========================================
+# LIKE_WRITE_BEHIND=1 이면 likes_count 증감을 메모리에 모아 일괄 반영
+def invalidate_like_counts(photo_ids):
+    """likes_count 를 담은 캐시 비우기 (사진 상세, 카드 조각, 갤러리 첫 페이지)"""
+    for photo_id in photo_ids:
+        photo_cache.delete(photo_cache_key(photo_id))
+        invalidate_card(photo_id)
+    invalidate_gallery()
+
+
+like_buffer = None
+if os.environ.get("LIKE_WRITE_BEHIND") == "1":
+    like_buffer = LikeCounterBuffer(
+        flush_interval=float(os.environ.get("LIKE_FLUSH_INTERVAL", 2.0)),
+        max_pending=int(os.environ.get("LIKE_FLUSH_MAX_PENDING", 500)),
+        on_flush=invalidate_like_counts,  # DB 에 반영된 뒤에 비워야 옛 값이 다시 캐시되지 않음
+    )
+    like_buffer.start()
+
+
 @app.route("/like/<int:photo_id>", methods=["POST"])
 def toggle_like(photo_id):
     if "user_id" not in session:
         return jsonify({"error": "로그인 필요"}), 401
 
     user_id = session["user_id"]
-    conn = get_connection()
+    conn = get_db()
     cur = conn.cursor()
 
-    # 이미 좋아요했는지 확인
+    # ✅ 없는 사진이면 404 (현재 좋아요 수는 쓰기 지연 모드 응답에 사용)
+    cur.execute("SELECT NVL(likes_count, 0) FROM photos WHERE photo_id = :photo_id",
+                {"photo_id": photo_id})
+    row = cur.fetchone()
+    if row is None:
+        return jsonify({"error": "사진을 찾을 수 없습니다"}), 404
+
+    # ✅ 이미 좋아요했다면 DELETE 가 1행을 지움 → 취소
     cur.execute("""
-        SELECT like_id FROM likes 
+        DELETE FROM likes
         WHERE photo_id = :photo_id AND user_id = :user_id
     """, {"photo_id": photo_id, "user_id": user_id})
-    existing = cur.fetchone()
 
-    if existing:
-        # ✅ 좋아요 취소
-        cur.execute("DELETE FROM likes WHERE like_id = :id", {"id": existing[0]})
-        action = "unliked"
-        liked = False
+    if cur.rowcount:
+        action, liked, delta = "unliked", False, -1
     else:
-        # ✅ 좋아요 추가
+        # ✅ 좋아요 추가 (유니크 인덱스로 중복 클릭 방지)
+        try:
+            cur.execute("""
+                INSERT INTO likes (photo_id, user_id, created_at)
+                VALUES (:photo_id, :user_id, SYSTIMESTAMP)
+            """, {"photo_id": photo_id, "user_id": user_id})
+            delta = 1
+        except IntegrityError:
+            delta = 0  # 사진은 있으므로 유니크 인덱스 위반 = 동시에 들어온 다른 요청이 이미 추가함
+        action, liked = "liked", True
+
+    # ✅ 내가 누른 좋아요 수 (받은 좋아요는 likes_count 와 같은 시점에 반영)
+    bump_user_stats(cur, user_id, likes_given=delta)
+
+    if like_buffer:
+        # ✅ 쓰기 지연 모드: 증감만 모아 두고 주기적으로 일괄 반영
+        conn.commit()
+        like_buffer.add(photo_id, delta)
+        likes_count = max(row[0] + like_buffer.pending(photo_id), 0)
+    else:
+        # ✅ 원자적 증감 (COUNT(*) 재계산 없음)
+        count_var = cur.var(int)
         cur.execute("""
-            INSERT INTO likes (photo_id, user_id, created_at)
-            VALUES (:photo_id, :user_id, SYSTIMESTAMP)
-        """, {"photo_id": photo_id, "user_id": user_id})
-        action = "liked"
-        liked = True
-
-    # ✅ 변경 후 현재 좋아요 수 다시 계산
-    cur.execute("SELECT COUNT(*) FROM likes WHERE photo_id = :photo_id", {"photo_id": photo_id})
-    likes_count = cur.fetchone()[0]
-
-    # ✅ photos 테이블의 likes_count 컬럼 갱신
-    cur.execute("""
-        UPDATE photos
-        SET likes_count = :count
-        WHERE photo_id = :photo_id
-    """, {"count": likes_count, "photo_id": photo_id})
+            UPDATE photos
+            SET likes_count = NVL(likes_count, 0) + :delta
+            WHERE photo_id = :photo_id
+            RETURNING likes_count INTO :likes_count
+        """, {"delta": delta, "photo_id": photo_id, "likes_count": count_var})
+        counts = count_var.getvalue()
+        likes_count = counts[0] if counts else 0
+        bump_likes_received(cur, {photo_id: delta})
+        conn.commit()
 
-    conn.commit()
-    conn.close()
+    # ✅ 내 좋아요 여부는 바로 갱신, 좋아요 수 캐시(상세 / 카드 / 갤러리)도 비움
+    #    (쓰기 지연 모드는 flush 후에 한 번 더 비움)
+    photo_cache.set(liked_cache_key(photo_id, user_id), liked)
+    invalidate_like_counts([photo_id])
 
     # ✅ liked 필드 추가해서 프론트로 전송
     return jsonify({
@@ -622,27 +856,71 @@ def toggle_like(photo_id):
 # =========================================
 @app.route('/comment/<int:photo_id>', methods=['POST'])
 def add_comment(photo_id):
-    user_id = session.get("user_id")
+    if "user_id" not in session:
+        return jsonify({"error": "로그인 필요"}), 401
+
+    user_id = session["user_id"]
     content = request.json.get("content", "")
-    conn = get_connection()
+    conn = get_db()
     cur = conn.cursor()
 
+    comment_id = cur.var(int)
+    created_at = cur.var(datetime)
     cur.execute("""
         INSERT INTO comments (photo_id, user_id, content, created_at)
         VALUES (:photo_id, :user_id, :content, SYSTIMESTAMP)
-    """, {"photo_id": photo_id, "user_id": user_id, "content": content})
+        RETURNING comment_id, created_at INTO :comment_id, :created_at
+    """, {
+        "photo_id": photo_id,
+        "user_id": user_id,
+        "content": content,
+        "comment_id": comment_id,
+        "created_at": created_at,
+    })
     conn.commit()
 
-    cur.execute("""
-        SELECT c.content, u.name
+    # ✅ 상세 캐시 / 카드 조각 무효화 (댓글 첫 페이지)
+    photo_cache.delete(photo_cache_key(photo_id))
+    invalidate_card(photo_id)
+
+    # ✅ 새 댓글 1개만 반환 → 프론트에서 목록 끝에 추가
+    return jsonify({"comment": comment_to_json(
+        comment_id.getvalue()[0], session.get("user_name"), content, created_at.getvalue()[0]
+    )})
+
+
+# =========================================
+# 댓글 목록 API (최신순 커서 페이지네이션, "이전 댓글 더보기")
+# =========================================
+@app.route('/api/photos/<int:photo_id>/comments')
+def api_photo_comments(photo_id):
+    before = request.args.get("before")
+    limit = min(max(request.args.get("limit", COMMENT_PAGE_SIZE, type=int), 1), 100)
+
+    where = ["c.photo_id = :photo_id"]
+    params = {"photo_id": photo_id, "limit": limit + 1}
+    if before:
+        try:
+            before_time, before_id = decode_gallery_cursor(before)
+        except ValueError:
+            return jsonify({"error": "잘못된 cursor"}), 400
+        where.append("""(c.created_at < :before_time
+                 OR (c.created_at = :before_time AND c.comment_id < :before_id))""")
+        params["before_time"] = before_time
+        params["before_id"] = before_id
+
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute(f"""
+        SELECT c.comment_id, u.name, c.content, c.created_at
         FROM comments c
         JOIN users u ON c.user_id = u.user_id
-        WHERE c.photo_id = :photo_id ORDER BY c.created_at ASC
-    """, {"photo_id": photo_id})
-    comments = [{"username": r[1], "content": r[0]} for r in cur.fetchall()]
-    conn.close()
-    return jsonify({"comments": comments})
-
+        WHERE {" AND ".join(where)}
+        ORDER BY c.created_at DESC, c.comment_id DESC
+        FETCH FIRST :limit ROWS ONLY
+    """, params)
+    comments, older_cursor = page_comments(cur.fetchall(), limit)
+    return jsonify({"comments": comments, "next_cursor": older_cursor})
 
 
 # =========================================
@@ -650,67 +928,459 @@ def add_comment(photo_id):
 # =========================================
 @app.route("/trend")
 def trend():
-    conn = get_connection()
+    # ✅ 지도 데이터는 /api/trend/clusters 에서 화면 범위만큼만 받아옴
+    return render_template("trend.html", logged_in="user_id" in session)
+
+
+# =========================================
+# 트렌드 지도 API (bbox + zoom 클러스터링)
+# =========================================
+@app.route("/api/trend/clusters")
+def api_trend_clusters():
+    try:
+        bbox = parse_bbox(request.args.get("bbox"))
+        zoom = int(request.args.get("zoom", 7))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ✅ mine=1 이면 로그인한 사용자 사진만
+    user_id = None
+    if request.args.get("mine") == "1":
+        user_id = session.get("user_id")
+        if not user_id:
+            return jsonify({"error": "로그인 필요"}), 401
+
+    conn = get_db()
+    cur = conn.cursor()
+    result = query_trend(cur, bbox, max(0, min(zoom, 20)), user_id)
+
+    for p in result["points"]:
+        p["image_path"] = thumb_url_of(p["image_path"])
+    for c in result["clusters"]:
+        if "image_path" in c:
+            c["image_path"] = thumb_url_of(c["image_path"])
+    return jsonify(result)
+
+# =========================================
+# 주변 사진 API (지오해시 후보 셀 → 거리 정밀 필터)
+# =========================================
+NEARBY_MAX_RADIUS_KM = 50
+
+
+def _nearby_args():
+    radius_km = request.args.get("radius_km", 1.0, type=float)
+    limit = request.args.get("limit", 50, type=int)
+    return min(max(radius_km, 0.01), NEARBY_MAX_RADIUS_KM), min(max(limit, 1), 200)
+
+
+def _nearby_response(photos):
+    for p in photos:
+        p["image_path"] = thumb_url_of(p["image_path"])
+    return jsonify({"photos": photos})
+
+
+@app.route("/api/photos/nearby")
+def api_photos_nearby():
+    lat = request.args.get("lat", type=float)
+    lon = request.args.get("lon", type=float)
+    if lat is None or lon is None or not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return jsonify({"error": "lat, lon 값이 필요합니다"}), 400
+    radius_km, limit = _nearby_args()
+
+    conn = get_db()
     cur = conn.cursor()
+    photos = query_nearby(cur, lat, lon, radius_km, limit)
+    return _nearby_response(photos)
+
+
+@app.route("/api/photos/<int:photo_id>/nearby")
+def api_photo_nearby(photo_id):
+    radius_km, limit = _nearby_args()
 
-    # ✅ 전체 사진 + 업로더 이름 함께 조회
+    conn = get_db()
+    cur = conn.cursor()
     cur.execute("""
-        SELECT p.photo_id, p.image_path, p.color_id,
-               NVL(p.gps_latitude, 37.5665),
-               NVL(p.gps_longitude, 126.9780),
-               u.name
-        FROM photos p
-        JOIN users u ON p.user_id = u.user_id
-    """)
-    photos = [
-        {
-            "photo_id": p[0],
-            "image_path": url_for("static", filename=p[1].replace("static/", "")),
-            "color_id": p[2],
-            "lat": float(p[3]),
-            "lon": float(p[4]),
-            "username": p[5],  # ✅ 사용자 이름 추가
-        }
-        for p in cur.fetchall()
-    ]
-
-    # ✅ 로그인한 사용자 사진만 따로
-    my_photos = []
-    user_id = session.get("user_id")
-    if user_id:
-        cur.execute("""
-            SELECT p.photo_id, p.image_path, p.color_id,
-                   NVL(p.gps_latitude, 37.5665),
-                   NVL(p.gps_longitude, 126.9780),
-                   u.name
-            FROM photos p
-            JOIN users u ON p.user_id = u.user_id
-            WHERE p.user_id = :user_id
-        """, {"user_id": user_id})
-        my_photos = [
-            {
-                "photo_id": p[0],
-                "image_path": url_for("static", filename=p[1].replace("static/", "")),
-                "color_id": p[2],
-                "lat": float(p[3]),
-                "lon": float(p[4]),
-                "username": p[5],
-            }
-            for p in cur.fetchall()
-        ]
+        SELECT gps_latitude, gps_longitude FROM photos WHERE photo_id = :photo_id
+    """, {"photo_id": photo_id})
+    row = cur.fetchone()
+    if not row or row[0] is None or row[1] is None:
+        return jsonify({"error": "위치 정보가 있는 사진을 찾을 수 없습니다"}), 404
+
+    photos = query_nearby(cur, float(row[0]), float(row[1]), radius_km, limit, exclude_photo_id=photo_id)
+    return _nearby_response(photos)
+
+
+# =========================================
+# 사진 후처리 상태 API
+# =========================================
+@app.route("/api/photos/<int:photo_id>/status")
+def api_photo_status(photo_id):
+    conn = get_db()
+    cur = conn.cursor()
+    status = photo_job_status(cur, photo_id)
+    return jsonify({"photo_id": photo_id, **status})
 
-    conn.close()
-    return render_template("trend.html", photos=photos, my_photos=my_photos)
 
 @app.route('/test')
 def test():
     return render_template('test.html')
 
+# =========================================
+# 랭킹 (리더보드 스냅샷만 읽음, DB 조회 없음)
+# =========================================
+RANKING_PAGE_SIZE = 50
+RANKING_WINDOW_LABELS = {"all": "전체", "day": "오늘", "week": "이번 주", "month": "이번 달"}
+
+
+def _page_args(default_limit):
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", default_limit, type=int), 1), 200)
+    return offset, limit
+
+
+def _window_arg():
+    """?window=day|week|month (기본 all) → 알 수 없는 값이면 None"""
+    window = request.args.get("window", "all")
+    return window if window == "all" or window in RANKING_WINDOWS else None
+
+
 @app.route('/ranking')
 def ranking():
-    ranks = calculate_ranking()
-    print("📊 랭킹 계산 결과:", ranks)
-    return render_template('ranking.html', ranks=ranks)
+    window = _window_arg() or "all"
+    snap = leaderboard.snapshot(window)
+    page = max(request.args.get("page", 1, type=int), 1)
+    offset = (page - 1) * RANKING_PAGE_SIZE
+    return render_template(
+        'ranking.html',
+        ranks=snap.page(offset, RANKING_PAGE_SIZE),
+        page=page,
+        has_next=offset + RANKING_PAGE_SIZE < len(snap),
+        total=len(snap),
+        my_rank=snap.entry_of(session.get("user_id")),
+        window=window,
+        windows=RANKING_WINDOW_LABELS,
+    )
+
+
+@app.route('/api/ranking')
+def api_ranking():
+    window = _window_arg()
+    if window is None:
+        return jsonify({"error": "window 는 all, day, week, month 중 하나"}), 400
+    snap = leaderboard.snapshot(window)
+    offset, limit = _page_args(RANKING_PAGE_SIZE)
+    return jsonify({
+        "window": window,
+        "total": len(snap),
+        "built_at": snap.built_at,
+        "offset": offset,
+        "entries": snap.page(offset, limit),
+    })
+
+
+@app.route('/api/ranking/top')
+def api_ranking_top():
+    window = _window_arg()
+    if window is None:
+        return jsonify({"error": "window 는 all, day, week, month 중 하나"}), 400
+    snap = leaderboard.snapshot(window)
+    n = min(max(request.args.get("n", 10, type=int), 1), 200)
+    return jsonify({"window": window, "total": len(snap), "built_at": snap.built_at,
+                    "entries": snap.top(n)})
+
+
+@app.route('/api/ranking/me')
+def api_ranking_me():
+    if "user_id" not in session:
+        return jsonify({"error": "로그인 필요"}), 401
+    window = _window_arg()
+    if window is None:
+        return jsonify({"error": "window 는 all, day, week, month 중 하나"}), 400
+    snap = leaderboard.snapshot(window)
+    return jsonify({"window": window, "total": len(snap), "built_at": snap.built_at,
+                    "entry": snap.entry_of(session["user_id"])})
+
+
+# =========================================
+# CLI: 랭킹 세션 집계 전체 재생성
+# =========================================
+@app.cli.command("rebuild-ranking")
+def rebuild_ranking_command():
+    """USER_SESSIONS / USER_SCORES / USER_DAILY_SCORES 를 PHOTOS 기준으로 다시 만든다"""
+    conn = get_connection()
+    cur = conn.cursor()
+    user_count = rebuild_all_sessions(cur)
+    conn.commit()
+    conn.close()
+    click.echo(f"✅ 랭킹 집계 재생성 완료 ({user_count}명)")
+    # 실행 중인 서버의 리더보드는 다음 갱신 주기(LEADERBOARD_REFRESH_SEC)에 반영된다
+    click.echo("ℹ️ 실행 중인 서버 랭킹은 LEADERBOARD_REFRESH_SEC 주기 안에 반영됩니다")
+
+
+# =========================================
+# CLI: 폴더의 사진 일괄 가져오기
+# =========================================
+@app.cli.command("import-photos")
+@click.argument("folder", type=click.Path(exists=True, file_okay=False))
+@click.option("--user", "user_ref", required=True, help="가져올 사용자 (이메일 또는 user_id)")
+@click.option("--workers", default=None, type=int, help="프로세스 수 (기본: CPU 수)")
+@click.option("--batch-size", default=200, help="한 번에 INSERT / 커밋할 사진 수")
+def import_photos_command(folder, user_ref, workers, batch_size):
+    """EXIF / 파생본 / 색상 분석은 프로세스 풀, INSERT 는 batch 단위 (중단 후 재실행 가능)"""
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT user_id, email FROM users
+        WHERE email = :ref OR TO_CHAR(user_id) = :ref
+    """, {"ref": user_ref})
+    row = cur.fetchone()
+    if not row:
+        conn.close()
+        raise click.ClickException(f"사용자를 찾을 수 없습니다: {user_ref}")
+    user_id, email = int(row[0]), row[1]
+
+    def progress(stats):
+        click.echo(f"📥 {stats['done']}/{stats['total']} 처리 "
+                   f"(추가 {stats['imported']}, 건너뜀 {stats['skipped']}, 실패 {len(stats['failed'])})")
+
+    click.echo(f"📂 {folder} → {email}")
+    stats = import_photos(conn, user_id, folder, app.config['UPLOAD_FOLDER'],
+                          workers=workers, batch_size=batch_size, progress=progress)
+    for src, err in stats["failed"]:
+        click.echo(f"⚠️ {src}: {err}")
+
+    # ✅ 랭킹 집계는 가져오기가 끝난 뒤 이 사용자만 한 번 재생성
+    #    (이번에 추가한 사진이 없어도, 중단된 이전 실행이 남긴 미반영 사진이 있으면 재생성)
+    cur.execute("""
+        SELECT COUNT(*) FROM photos
+        WHERE user_id = :user_id AND ranked_at IS NULL
+    """, {"user_id": user_id})
+    if stats["imported"] or cur.fetchone()[0]:
+        rebuild_user_sessions(cur, user_id)
+        conn.commit()
+        invalidate_gallery(user_id)
+    conn.close()
+    click.echo(f"✅ 가져오기 완료: 추가 {stats['imported']}장, 건너뜀 {stats['skipped']}장, "
+               f"실패 {len(stats['failed'])}장")
+
+
+# =========================================
+# CLI: CSS/JS 사전 압축 (배포 전 빌드 단계)
+# =========================================
+@app.cli.command("build-assets")
+@click.option("--level", default=9, help="gzip 압축 레벨")
+def build_assets_command(level):
+    """static/css, static/js 의 .gz / .br 을 만든다 (원본이 바뀌면 다시 실행)"""
+    results = precompress_assets(app.static_folder, level)
+    for name, size, gz, br in results:
+        click.echo(f"🗜️ {name}: {size}B → gzip {gz or '-'}B, br {br or '-'}B")
+    click.echo(f"✅ 사전 압축 완료 ({len(results)}개)")
+
+
+# =========================================
+# CLI: 기존 업로드 썸네일 / 미리보기 일괄 생성
+# =========================================
+@app.cli.command("build-derivatives")
+@click.option("--workers", default=None, type=int, help="프로세스 수 (기본: CPU 코어 수)")
+@click.option("--force", is_flag=True, help="이미 있는 파생본도 다시 생성")
+def build_derivatives_command(workers, force):
+    """static/uploads 의 원본마다 thumb / medium 파생본을 만든다"""
+    total, created, failed = backfill_derivatives(app.config['UPLOAD_FOLDER'], workers, force)
+    for src, err in failed:
+        click.echo(f"⚠️ {src}: {err}")
+    click.echo(f"✅ 원본 {total}개 처리, 파생본 {created}개 생성, 실패 {len(failed)}개")
+
+
+# =========================================
+# CLI: 기존 사진 지오해시 채우기
+# =========================================
+@app.cli.command("backfill-geohash")
+@click.option("--batch-size", default=1000, help="한 번에 갱신할 행 수")
+def backfill_geohash_command(batch_size):
+    """GEOHASH 가 비어 있는 사진을 batch 단위로 채운다 (중단 후 재실행 가능)"""
+    conn = get_connection()
+    cur = conn.cursor()
+    total = 0
+    while True:
+        updated = backfill_geohash(cur, batch_size)
+        conn.commit()
+        if not updated:
+            break
+        total += updated
+        click.echo(f"📍 지오해시 {total}건 갱신")
+    conn.close()
+    click.echo(f"✅ 지오해시 채우기 완료 ({total}건)")
+
+
+# =========================================
+# CLI: SHOT_TIME 문자열 → SHOT_AT(TIMESTAMP) 변환
+# =========================================
+@app.cli.command("migrate-shot-time")
+@click.option("--batch-size", default=1000, help="한 번에 변환할 행 수 (묶음마다 커밋)")
+def migrate_shot_time_command(batch_size):
+    """SHOT_AT 이 비어 있는 사진을 photo_id 순서로 변환한다 (중단 후 재실행 가능)"""
+    conn = get_connection()
+    cur = conn.cursor()
+    total = failed = 0
+    last_id = 0
+    while True:
+        read, last_id, bad = backfill_shot_at(cur, last_id, batch_size)
+        conn.commit()
+        if not read:
+            break
+        total += read
+        failed += bad
+        click.echo(f"📅 촬영시각 {total}건 처리 (photo_id ≤ {last_id})")
+    conn.close()
+    click.echo(f"✅ 촬영시각 변환 완료 ({total - failed}건 변환, 해석 실패 {failed}건)")
+    if total:
+        click.echo("ℹ️ 랭킹 집계에 반영하려면 flask --app app rebuild-ranking 을 실행하세요")
+
+
+# =========================================
+# CLI: 기존 사진 썸네일 URL 채우기
+# =========================================
+@app.cli.command("backfill-image-urls")
+@click.option("--batch-size", default=1000, help="한 번에 갱신할 행 수")
+def backfill_image_urls_command(batch_size):
+    """THUMB_URL 이 비어 있고 썸네일 파일이 있는 사진을 batch 단위로 채운다 (중단 후 재실행 가능)"""
+    conn = get_connection()
+    cur = conn.cursor()
+    total = filled = 0
+    last_id = 0
+    while True:
+        read, last_id, updated = backfill_thumb_urls(cur, app.static_folder, last_id, batch_size)
+        conn.commit()
+        if not read:
+            break
+        total += read
+        filled += updated
+        click.echo(f"🖼️ 썸네일 URL {filled}건 갱신 ({total}건 확인, photo_id ≤ {last_id})")
+    conn.close()
+    click.echo(f"✅ 썸네일 URL 채우기 완료 ({filled}건, 썸네일 없음 {total - filled}건)")
+    if total - filled:
+        click.echo("ℹ️ 썸네일이 없는 사진은 flask --app app build-derivatives 후 다시 실행하세요")
+
+
+# =========================================
+# CLI: 실패한 후처리 작업 재실행
+# =========================================
+@app.cli.command("retry-jobs")
+@click.option("--photo-id", default=None, type=int, help="특정 사진의 작업만 재실행")
+def retry_jobs_command(photo_id):
+    """PHOTO_JOBS 의 failed 작업을 다시 큐에 넣고 끝날 때까지 처리"""
+    count = job_queue.retry_failed(photo_id)
+    job_queue.join()
+    click.echo(f"✅ 실패 작업 {count}건 재실행 완료")
+
+
+# =========================================
+# CLI: 스칼라 / 배치 랭킹 계산 결과 동등성 검증
+# =========================================
+@app.cli.command("verify-ranking")
+@click.option("--synthetic", default=0, help="DB 대신 임의 데이터 N장으로 검증")
+@click.option("--seed", default=0, help="임의 데이터 시드")
+@click.option("--trace", is_flag=True, help="사진 쌍마다 랭킹 계산 추적 로그 출력")
+def verify_ranking_command(synthetic, seed, trace):
+    """calc_user_score 루프와 ranking_batch 결과가 같은지 확인"""
+    from ranking_batch import compare_rankings, synthetic_rows
+
+    rows = synthetic_rows(n_photos=synthetic, seed=seed) if synthetic else fetch_ranking_rows()
+    with ranking_trace(trace):
+        mismatches = compare_rankings(rows)
+    if mismatches:
+        for email, scalar, batch in mismatches:
+            click.echo(f"❌ {email}: scalar={scalar} batch={batch}")
+        raise SystemExit(1)
+    click.echo(f"✅ 스칼라/배치 결과 일치 ({len(rows)}장)")
+
+# =========================================
+# 마이페이지 (상단 통계 + 내 사진 / 좋아요한 사진 키셋 페이지)
+# =========================================
+# 첫 페이지만 렌더링하고 나머지는 /api/me/photos, /api/me/likes 로 이어서 받는다.
+# 상단 통계는 USER_STATS 한 줄 (집계 쿼리 없음) + 리더보드 스냅샷 순위.
+MYPAGE_PAGE_SIZE = 24
+
+
+def split_page(rows, limit, cursor_of):
+    """limit+1 행 → (limit 행, 다음 페이지 커서 또는 None)"""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, cursor_of(rows[-1])
+    return rows, None
+
+
+# ✅ 내가 업로드한 사진 (photo_id DESC, 커서 = 마지막 photo_id)
+def fetch_my_photos(cur, user_id, cursor=None, limit=MYPAGE_PAGE_SIZE):
+    params = {"user_id": user_id, "limit": limit + 1}
+    after = ""
+    if cursor:
+        params["cursor_id"] = int(cursor)
+        after = "AND photo_id < :cursor_id"
+    cur.execute(f"""
+        SELECT photo_id, description, color_id, NVL(thumb_url, image_path), location, NVL(likes_count, 0)
+        FROM photos
+        WHERE user_id = :user_id {after}
+        ORDER BY photo_id DESC
+        FETCH FIRST :limit ROWS ONLY
+    """, params)
+    rows, next_cursor = split_page(cur.fetchall(), limit, lambda r: str(r[0]))
+    return fill_thumb_urls(rows, 3), next_cursor
+
+
+# ✅ 내가 좋아요한 사진 (좋아요 시각 DESC, 커서 = (좋아요 시각, photo_id))
+def fetch_liked_photos(cur, user_id, cursor=None, limit=MYPAGE_PAGE_SIZE):
+    params = {"user_id": user_id, "limit": limit + 1}
+    after = ""
+    if cursor:
+        params["cursor_time"], params["cursor_id"] = decode_gallery_cursor(cursor)
+        after = """AND (l.created_at < :cursor_time
+                 OR (l.created_at = :cursor_time AND l.photo_id < :cursor_id))"""
+    cur.execute(f"""
+        SELECT p.photo_id, p.description, p.color_id, NVL(p.thumb_url, p.image_path),
+               p.location, NVL(p.likes_count, 0), l.created_at
+        FROM likes l
+        JOIN photos p ON p.photo_id = l.photo_id
+        WHERE l.user_id = :user_id {after}
+        ORDER BY l.created_at DESC, l.photo_id DESC
+        FETCH FIRST :limit ROWS ONLY
+    """, params)
+    rows, next_cursor = split_page(cur.fetchall(), limit, lambda r: encode_gallery_cursor(r[6], r[0]))
+    return fill_thumb_urls(rows, 3), next_cursor
+
+
+# ✅ 상단 통계 + 현재 순위 (스냅샷에 아직 없으면 현재 점수로 이분 탐색)
+def my_stats(cur, user_id):
+    stats = load_user_stats(cur, user_id) or {
+        "photo_count": 0, "likes_received": 0, "likes_given": 0, "distance_km": 0.0, "score": 0.0,
+    }
+    snapshot = leaderboard.snapshot()
+    entry = snapshot.entry_of(user_id)
+    if entry:
+        stats["rank"] = entry["rank"]
+    else:
+        stats["rank"] = snapshot.rank_for_score(stats["score"]) if stats["score"] else None
+    stats["rank_total"] = len(snapshot)
+    return stats
+
+
+def my_page_json(photos, next_cursor):
+    return jsonify({
+        "photos": [
+            {
+                "photo_id": p[0],
+                "description": p[1],
+                "color_id": p[2],
+                "image_url": p[3],
+                "location": p[4],
+                "likes_count": p[5],
+            }
+            for p in photos
+        ],
+        "html": render_cards("mypage", photos),  # 마이페이지는 카드 조각을 그대로 이어 붙임
+        "next_cursor": next_cursor,
+    })
+
 
 @app.route("/mypage")
 def mypage():
@@ -721,56 +1391,67 @@ def mypage():
     user_name = session.get("user_name")
     user_id = session.get("user_id")
 
-    conn = get_connection()
+    conn = get_db()
     cursor = conn.cursor()
 
-    # ✅ 내가 업로드한 사진
-    cursor.execute("""
-        SELECT photo_id, description, color_id, image_path, location, likes_count
-        FROM photos
-        WHERE user_id = :user_id
-        ORDER BY photo_id DESC
-    """, {"user_id": user_id})
-    my_photos = cursor.fetchall()
-
-    # ✅ 내가 좋아요한 사진
-    cursor.execute("""
-        SELECT p.photo_id, p.description, p.color_id, p.image_path, p.location, p.likes_count
-        FROM photos p
-        JOIN likes l ON p.photo_id = l.photo_id
-        WHERE l.user_id = :user_id
-        ORDER BY l.created_at DESC
-    """, {"user_id": user_id})
-    liked_photos = cursor.fetchall()
-
-    conn.close()
-
-    # ✅ 이미지 경로 보정 함수
-    def fix_image_path(photo_rows):
-        fixed = []
-        for p in photo_rows:
-            image_path = p[3]
-            if not image_path.startswith("static/"):
-                image_path = os.path.join("static", image_path).replace("\\", "/")
-            image_url = url_for("static", filename=image_path.replace("static/", ""))
-            new_p = list(p)
-            new_p[3] = image_url
-            fixed.append(tuple(new_p))
-        return fixed
-
-    # ✅ 경로 보정
-    my_photos_fixed = fix_image_path(my_photos)
-    liked_photos_fixed = fix_image_path(liked_photos)
+    # ✅ 두 목록 모두 첫 페이지만 (썸네일 URL 은 저장된 값, 카드는 사진별 조각 캐시)
+    my_photos, my_cursor = fetch_my_photos(cursor, user_id)
+    liked_photos, liked_cursor = fetch_liked_photos(cursor, user_id)
 
     # ✅ 렌더링
     return render_template(
         "mypage.html",
         user_name=user_name,
-        my_photos=my_photos_fixed,
-        liked_photos=liked_photos_fixed
+        my_photos=my_photos,
+        liked_photos=liked_photos,
+        my_cards=render_cards("mypage", my_photos),
+        liked_cards=render_cards("mypage", liked_photos),
+        my_cursor=my_cursor,
+        liked_cursor=liked_cursor,
+        stats=my_stats(cursor, user_id),
     )
 
 
+@app.route("/api/me/photos")
+def api_my_photos():
+    if "user_id" not in session:
+        return jsonify({"error": "로그인 필요"}), 401
+    limit = min(max(request.args.get("limit", MYPAGE_PAGE_SIZE, type=int), 1), 100)
+    try:
+        photos, next_cursor = fetch_my_photos(get_db().cursor(), session["user_id"],
+                                              request.args.get("cursor"), limit)
+    except ValueError:
+        return jsonify({"error": "잘못된 cursor"}), 400
+    return my_page_json(photos, next_cursor)
+
+
+@app.route("/api/me/likes")
+def api_my_likes():
+    if "user_id" not in session:
+        return jsonify({"error": "로그인 필요"}), 401
+    limit = min(max(request.args.get("limit", MYPAGE_PAGE_SIZE, type=int), 1), 100)
+    try:
+        photos, next_cursor = fetch_liked_photos(get_db().cursor(), session["user_id"],
+                                                 request.args.get("cursor"), limit)
+    except ValueError:
+        return jsonify({"error": "잘못된 cursor"}), 400
+    return my_page_json(photos, next_cursor)
+
+
+# =========================================
+# CLI: 사용자 통계 재집계
+# =========================================
+@app.cli.command("rebuild-user-stats")
+def rebuild_user_stats_command():
+    """USER_STATS 를 PHOTOS / LIKES 기준으로 다시 만든다 (증감이 어긋났을 때)"""
+    conn = get_connection()
+    cur = conn.cursor()
+    user_count = rebuild_user_stats(cur)
+    conn.commit()
+    conn.close()
+    click.echo(f"✅ 사용자 통계 재생성 완료 ({user_count}명)")
+
+
 
 # =========================================
 # 실행
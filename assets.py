@@ -0,0 +1,168 @@
+import os
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+
+from flask import request, send_from_directory, abort
+from werkzeug.security import safe_join
+
+from storage import content_hash_of
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 정적 파일 / 업로드 이미지 캐시 (지문 URL + immutable + 강한 ETag + 사전 압축)
+# =========================================
+# url_for('static', filename=...) 에 내용 해시 지문(?v=)을 자동으로 붙인다.
+#  - 지문이 현재 내용과 같은 요청 → Cache-Control: immutable (1년), 브라우저가 다시 묻지 않음
+#  - 지문 없는/옛 지문 요청      → no-cache (ETag 로 재검증 → 304)
+#  - 콘텐츠 해시 경로의 업로드(uploads/ab/cd/<sha256>.jpg 와 thumb/medium 파생본)는
+#    경로 자체가 지문이라 그대로 immutable (파생본은 원본 + DERIVATIVES 설정으로 정해짐)
+# ETag 는 mtime 이 아닌 내용 해시(압축본은 "-br" / "-gzip" 접미어)라 서버가 여러 대여도 같다.
+# CSS/JS 는 flask build-assets 로 .gz / .br 을 미리 만들어 두면 Accept-Encoding 에 맞춰 그대로 보낸다.
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+PRECOMPRESS_DIRS = ("css", "js")
+PRECOMPRESS_EXTS = {".css", ".js", ".svg", ".json"}
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))  # 선호 순서
+
+
+class StaticAssets:
+    def __init__(self, app):
+        self.app = app
+        self._fingerprints = {}  # filename → (mtime_ns, size, 지문)
+        self._lock = threading.Lock()
+
+    @property
+    def folder(self):
+        return self.app.static_folder
+
+    def init_app(self):
+        """static 라우트를 교체하고 url_for 에 지문을 붙인다"""
+        self.app.view_functions["static"] = self.send_asset
+        self.app.url_defaults(self._add_version)
+
+    def _add_version(self, endpoint, values):
+        if endpoint == "static" and "filename" in values and "v" not in values:
+            version = self.url_version(values["filename"])
+            if version:
+                values["v"] = version
+
+    @staticmethod
+    def is_content_addressed(filename):
+        """uploads/ab/cd/[thumb|medium/]<sha256>.ext → 경로가 곧 내용 지문"""
+        name = filename.replace("\\", "/")
+        return name.startswith("uploads/") and bool(content_hash_of(name))
+
+    def url_version(self, filename):
+        """URL 에 붙일 지문 (콘텐츠 해시 경로이거나 파일이 없으면 None)"""
+        if self.is_content_addressed(filename):
+            return None
+        return self.fingerprint(filename)
+
+    def fingerprint(self, filename):
+        """파일 내용 SHA-256 앞 16자리 (mtime/크기가 같으면 다시 읽지 않음)"""
+        if self.is_content_addressed(filename):
+            return content_hash_of(filename)[:16]
+        path = safe_join(self.folder, filename)
+        try:
+            st = os.stat(path) if path else None
+        except OSError:
+            st = None
+        if st is None:
+            return None
+        cached = self._fingerprints.get(filename)
+        if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+            return cached[2]
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(64 * 1024), b""):
+                sha.update(chunk)
+        fp = sha.hexdigest()[:16]
+        with self._lock:
+            self._fingerprints[filename] = (st.st_mtime_ns, st.st_size, fp)
+        return fp
+
+    def _pick_encoding(self, path):
+        """Accept-Encoding 에 맞고 원본보다 오래되지 않은 사전 압축본 → (인코딩, 확장자)"""
+        source_mtime = os.stat(path).st_mtime_ns
+        for encoding, ext in ENCODINGS:
+            if not request.accept_encodings[encoding]:
+                continue
+            try:
+                if os.stat(path + ext).st_mtime_ns >= source_mtime:
+                    return encoding, ext
+            except OSError:
+                continue
+        return None, ""
+
+    def send_asset(self, filename):
+        path = safe_join(self.folder, filename)
+        if path is None or not os.path.isfile(path):
+            abort(404)
+        fp = self.fingerprint(filename)
+        compressible = os.path.splitext(filename)[1].lower() in PRECOMPRESS_EXTS
+        encoding, ext = self._pick_encoding(path) if compressible else (None, "")
+
+        response = send_from_directory(
+            self.folder, filename + ext,
+            mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            etag=f"{fp}-{encoding}" if encoding else fp,  # 표현(압축 방식)마다 다른 강한 ETag
+            conditional=True,
+            max_age=None,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if compressible:
+            response.vary.add("Accept-Encoding")
+        versioned = self.is_content_addressed(filename) or request.args.get("v") == fp
+        response.headers["Cache-Control"] = IMMUTABLE if versioned else REVALIDATE
+        return response
+
+
+# =========================================
+# 빌드 단계: CSS/JS 사전 압축 (flask build-assets)
+# =========================================
+def _brotli():
+    try:
+        import brotli  # 선택 의존성
+        return brotli
+    except ImportError:
+        return None
+
+
+def precompress_assets(static_folder, level=9):
+    """
+    static/css, static/js 의 파일마다 .gz (+ brotli 패키지가 있으면 .br) 생성
+    압축본이 원본보다 작을 때만 남긴다. 반환: [(파일, 원본 크기, gzip 크기, br 크기)]
+    """
+    brotli = _brotli()
+    if brotli is None:
+        log.info("brotli 패키지가 없어 .br 은 만들지 않습니다 (pip install brotli)")
+    results = []
+    for sub in PRECOMPRESS_DIRS:
+        base = os.path.join(static_folder, sub)
+        for root, _, files in os.walk(base):
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() not in PRECOMPRESS_EXTS:
+                    continue
+                path = os.path.join(root, name)
+                with open(path, "rb") as f:
+                    data = f.read()
+                sizes = [None, None]
+                variants = [(".gz", gzip.compress(data, compresslevel=level, mtime=0))]
+                if brotli is not None:
+                    variants.append((".br", brotli.compress(data, quality=11)))
+                for i, (ext, packed) in enumerate(variants):
+                    if len(packed) < len(data):
+                        with open(path + ext, "wb") as f:
+                            f.write(packed)
+                        sizes[i] = len(packed)
+                    elif os.path.exists(path + ext):
+                        os.remove(path + ext)
+                rel = os.path.relpath(path, static_folder).replace(os.sep, "/")
+                results.append((rel, len(data), sizes[0], sizes[1]))
+    return results
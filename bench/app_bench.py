@@ -0,0 +1,371 @@
+"""
+Flask 라우트 부하 벤치마크 (Oracle 없이 SQLite 대역으로 실행)
+
+    python bench/app_bench.py --scale 1k                      # 사진 1천 장
+    python bench/app_bench.py --scale 100k --requests 500 --concurrency 4
+    python bench/app_bench.py --scale 1m --db /tmp/bench-1m.db  # 생성한 DB 재사용
+    python bench/app_bench.py --scale 1k --compare bench/results/1k-abc1234.json
+
+1) bench/fake_oracledb.py 를 oracledb 로 등록하고 app 을 import (init_db 의 PL/SQL DDL 포함)
+2) 가상 사용자/사진/좋아요/댓글을 생성하고 rebuild_all_sessions 로 랭킹 테이블 채움
+3) 라우트마다 Flask test client 로 요청을 보내 req/s 와 p50/p95/p99 (ms) 측정
+4) 결과를 JSON 으로 저장 (기본: bench/results/<scale>-<커밋>.json) → --compare 로 커밋 간 비교
+
+SQLite 와 Oracle 은 실행 계획이 다르므로 절대값보다 같은 조건에서의 상대 비교용이다.
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import platform
+import threading
+import statistics
+import contextlib
+import subprocess
+from datetime import datetime, timedelta
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import fake_oracledb  # noqa: E402
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+BATCH = 20_000
+
+# 대한민국 대략 범위 (업로드 시 랜덤 좌표와 같은 범위)
+LAT_RANGE = (34.2, 37.9)
+LON_RANGE = (126.5, 129.5)
+BBOX_SEOUL = "126.8,37.4,127.2,37.7"
+BBOX_KOREA = f"{LON_RANGE[0]},{LAT_RANGE[0]},{LON_RANGE[1]},{LAT_RANGE[1]}"
+
+
+# =========================================
+# 가상 데이터 생성
+# =========================================
+def generate_data(conn, n_photos, seed=0):
+    from geo import geohash_encode
+    from images import public_url
+    from ranking import rebuild_all_sessions
+
+    rng = random.Random(seed)
+    n_users = max(20, n_photos // 50)
+    cur = conn.cursor()
+
+    password = hashlib.sha256(b"bench").hexdigest()
+    cur.executemany(
+        "INSERT INTO users (user_id, name, email, password) VALUES (:1, :2, :3, :4)",
+        [(u, f"user{u}", f"user{u}@bench.local", password) for u in range(1, n_users + 1)],
+    )
+
+    # ✅ 좋아요를 먼저 뽑아 사진별 likes_count 를 맞춰 둔다
+    likes = set()
+    while len(likes) < n_photos // 2:
+        likes.add((rng.randint(1, n_photos), rng.randint(1, n_users)))
+    like_counts = {}
+    for photo_id, _ in likes:
+        like_counts[photo_id] = like_counts.get(photo_id, 0) + 1
+
+    # ✅ 사용자별 산책(사진 2~8장, 5~40분 간격) 단위로 사진 생성
+    base_time = datetime(2025, 1, 1)
+    photo_id = 0
+    rows = []
+
+    def flush():
+        cur.executemany("""
+            INSERT INTO photos (
+                photo_id, user_id, color_id, description, location, image_path,
+                gps_latitude, gps_longitude, geohash, shot_time, shot_at, likes_count, created_at,
+                dominant_color_id, color_confidence, thumb_url
+            ) VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9, :10, :11, :12, :13, :14, :15, :16)
+        """, rows)
+        rows.clear()
+
+    while photo_id < n_photos:
+        user_id = rng.randint(1, n_users)
+        t = base_time + timedelta(days=rng.randint(0, 364), hours=rng.randint(6, 20))
+        lat, lon = rng.uniform(*LAT_RANGE), rng.uniform(*LON_RANGE)
+        for _ in range(min(rng.randint(2, 8), n_photos - photo_id)):
+            photo_id += 1
+            color_id = rng.randint(1, 9)
+            digest = hashlib.sha256(str(photo_id).encode()).hexdigest()
+            image_path = f"uploads/{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+            rows.append((
+                photo_id, user_id, color_id, f"벤치 사진 {photo_id}", "서울", image_path,
+                round(lat, 6), round(lon, 6), geohash_encode(lat, lon),
+                t.strftime("%Y-%m-%d %H:%M:%S"), t, like_counts.get(photo_id, 0),
+                (base_time + timedelta(seconds=photo_id * 30)).isoformat(" "),
+                color_id, round(rng.uniform(0.3, 1.0), 4), public_url(image_path, "thumb"),
+            ))
+            t += timedelta(minutes=rng.randint(5, 40))
+            lat += rng.uniform(-0.003, 0.003)
+            lon += rng.uniform(-0.003, 0.003)
+        if len(rows) >= BATCH:
+            flush()
+    if rows:
+        flush()
+
+    likes = sorted(likes)
+    for i in range(0, len(likes), BATCH):
+        cur.executemany("INSERT INTO likes (photo_id, user_id) VALUES (:1, :2)", likes[i:i + BATCH])
+
+    comments = [
+        (rng.randint(1, n_photos), rng.randint(1, n_users), f"댓글 {i}",
+         (base_time + timedelta(seconds=i * 60)).isoformat(" "))
+        for i in range(n_photos // 5)
+    ]
+    for i in range(0, len(comments), BATCH):
+        cur.executemany("""
+            INSERT INTO comments (photo_id, user_id, content, created_at) VALUES (:1, :2, :3, :4)
+        """, comments[i:i + BATCH])
+
+    rebuild_all_sessions(cur)
+    cur.execute("CREATE TABLE bench_meta (n_photos NUMBER, n_users NUMBER)")
+    cur.execute("INSERT INTO bench_meta VALUES (:1, :2)", (n_photos, n_users))
+    conn.commit()
+    return n_users
+
+
+def existing_data(conn):
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT n_photos, n_users FROM bench_meta")
+    except fake_oracledb.DatabaseError:
+        return None
+    return cur.fetchone()
+
+
+# =========================================
+# 측정 대상 라우트
+# =========================================
+def tiny_jpeg(rng):
+    from PIL import Image
+    buf = io.BytesIO()
+    color = tuple(rng.randint(0, 255) for _ in range(3))
+    Image.new("RGB", (64, 48), color).save(buf, "JPEG")
+    buf.seek(0)
+    return buf
+
+
+def build_routes(n_photos):
+    def page_cursor(client):
+        return client.get("/api/gallery?limit=24").get_json().get("next_cursor") or ""
+
+    return {
+        "gallery": lambda c, rng: c.get("/gallery"),
+        "gallery_color": lambda c, rng: c.get(f"/gallery/{rng.choice(['red', 'blue', 'green'])}"),
+        "api_gallery_page2": lambda c, rng: c.get(f"/api/gallery?cursor={page_cursor(c)}"),
+        "photo_detail": lambda c, rng: c.get(f"/photo/{rng.randint(1, n_photos)}"),
+        "trend": lambda c, rng: c.get("/trend"),
+        "trend_clusters_korea": lambda c, rng: c.get(f"/api/trend/clusters?bbox={BBOX_KOREA}&zoom=7"),
+        "trend_clusters_seoul": lambda c, rng: c.get(f"/api/trend/clusters?bbox={BBOX_SEOUL}&zoom=14"),
+        "nearby": lambda c, rng: c.get(f"/api/photos/{rng.randint(1, n_photos)}/nearby?radius_km=2"),
+        "ranking": lambda c, rng: c.get("/ranking"),
+        "like": lambda c, rng: c.post(f"/like/{rng.randint(1, n_photos)}"),
+        "upload": lambda c, rng: c.post("/upload", data={
+            "description": "벤치 업로드",
+            "location": "서울",
+            "color_id": str(rng.randint(1, 9)),
+            "gps_latitude": str(rng.uniform(*LAT_RANGE)),
+            "gps_longitude": str(rng.uniform(*LON_RANGE)),
+            "image": (tiny_jpeg(rng), "bench.jpg"),
+        }, content_type="multipart/form-data"),
+    }
+
+
+def logged_in_client(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as s:
+        s["user_id"] = user_id
+        s["user_name"] = f"user{user_id}"
+        s["user_email"] = f"user{user_id}@bench.local"
+    return client
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def run_route(app, fn, n_users, requests, concurrency, warmup, seed):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    per_thread = [requests // concurrency + (1 if i < requests % concurrency else 0)
+                  for i in range(concurrency)]
+
+    def worker(i, count):
+        rng = random.Random(seed * 1000 + i)
+        client = logged_in_client(app, rng.randint(1, n_users))
+        for _ in range(warmup):
+            fn(client, rng)
+        local = []
+        local_errors = 0
+        ready.wait()
+        for _ in range(count):
+            started = time.perf_counter()
+            try:
+                status = fn(client, rng).status_code
+            except Exception:
+                status = 599
+            local.append((time.perf_counter() - started) * 1000)
+            if status >= 400:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors.append(local_errors)
+
+    ready = threading.Event()
+    threads = [threading.Thread(target=worker, args=(i, n)) for i, n in enumerate(per_thread) if n]
+    for t in threads:
+        t.start()
+    time.sleep(0.05 * len(threads))  # 워밍업이 끝날 시간을 대략 기다린 뒤 동시에 시작
+    started = time.perf_counter()
+    ready.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+    }
+
+
+# =========================================
+# 결과 저장 / 비교
+# =========================================
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, text=True,
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_results(results):
+    print(f"\n{'route':<24}{'req/s':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'err':>6}")
+    for name, r in results["routes"].items():
+        print(f"{name:<24}{r['rps']:>10.1f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}"
+              f"{r['p99_ms']:>10.2f}{r['errors']:>6}")
+
+
+def print_comparison(base, results):
+    print(f"\n📊 {base.get('commit')} → {results['commit']} (p95 ms / req/s 변화)")
+    for name, r in results["routes"].items():
+        old = base.get("routes", {}).get(name)
+        if not old:
+            print(f"  {name:<24} (기준 결과 없음)")
+            continue
+        p95 = (r["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0.0
+        rps = (r["rps"] - old["rps"]) / old["rps"] * 100 if old["rps"] else 0.0
+        print(f"  {name:<24} p95 {old['p95_ms']:>8.2f} → {r['p95_ms']:>8.2f} ({p95:+6.1f}%)"
+              f"   req/s {old['rps']:>8.1f} → {r['rps']:>8.1f} ({rps:+6.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", choices=SCALES, default="1k")
+    parser.add_argument("--photos", type=int, help="사진 수 직접 지정 (--scale 대신)")
+    parser.add_argument("--requests", type=int, default=200, help="라우트별 측정 요청 수")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시 요청 스레드 수")
+    parser.add_argument("--warmup", type=int, default=5, help="스레드별 워밍업 요청 수")
+    parser.add_argument("--routes", help="쉼표로 구분한 라우트 이름 (기본: 전체)")
+    parser.add_argument("--db", help="SQLite 파일 경로 (이미 생성된 같은 규모 DB 가 있으면 재사용)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="결과 JSON 경로 (기본: bench/results/<scale>-<커밋>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--verbose", action="store_true", help="앱 출력(print) 표시")
+    args = parser.parse_args()
+
+    n_photos = args.photos or SCALES[args.scale]
+    label = args.scale if not args.photos else f"{n_photos}"
+    workdir = tempfile.mkdtemp(prefix="colorwalk-bench-")
+    db_path = args.db or os.path.join(workdir, "bench.db")
+
+    # ✅ app import 전에 oracledb 교체, 업로드 파일은 임시 폴더에 저장되도록 cwd 이동
+    fake_oracledb.install(db_path)
+    os.environ.setdefault("DB_POOL_MAX", str(max(5, args.concurrency + 3)))
+    os.environ.setdefault("LOG_LEVEL", "DEBUG" if args.verbose else "WARNING")
+    os.chdir(workdir)
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with quiet:
+        import app as app_module
+        from db_config import get_connection
+
+    app = app_module.app
+    conn = get_connection()
+    meta = existing_data(conn)
+    if meta and meta[0] == n_photos:
+        n_users = meta[1]
+        print(f"♻️ 기존 DB 재사용: {db_path} (사진 {n_photos:,}장, 사용자 {n_users:,}명)")
+    elif meta:
+        sys.exit(f"❌ {db_path} 는 사진 {meta[0]:,}장 규모입니다. 다른 --db 경로를 지정하세요.")
+    else:
+        started = time.perf_counter()
+        with quiet:
+            n_users = generate_data(conn, n_photos, args.seed)
+        print(f"🧪 데이터 생성: 사진 {n_photos:,}장, 사용자 {n_users:,}명 "
+              f"({time.perf_counter() - started:.1f}s) → {db_path}")
+    conn.close()
+
+    routes = build_routes(n_photos)
+    selected = args.routes.split(",") if args.routes else list(routes)
+    unknown = set(selected) - set(routes)
+    if unknown:
+        sys.exit(f"❌ 알 수 없는 라우트: {', '.join(sorted(unknown))} (가능: {', '.join(routes)})")
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "scale": label,
+        "photos": n_photos,
+        "users": n_users,
+        "requests_per_route": args.requests,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "sqlite": fake_oracledb.sqlite3.sqlite_version,
+        "routes": {},
+    }
+    for name in selected:
+        with quiet:
+            results["routes"][name] = run_route(
+                app, routes[name], n_users, args.requests, args.concurrency, args.warmup, args.seed,
+            )
+        r = results["routes"][name]
+        print(f"  ✔ {name:<24} {r['rps']:>8.1f} req/s   p95 {r['p95_ms']:.2f} ms")
+
+    with quiet:
+        app_module.job_queue.join()  # 업로드 후처리 작업이 끝날 때까지 대기
+
+    print_results(results)
+    out = args.out or os.path.join(BENCH_DIR, "results", f"{label}-{results['commit']}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 결과 저장: {out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
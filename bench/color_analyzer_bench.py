@@ -0,0 +1,86 @@
+"""
+대표 색상 분석기 벤치마크
+
+    python bench/color_analyzer_bench.py                 # 합성 12MP 픽스처 9장 생성 후 측정
+    python bench/color_analyzer_bench.py --fixtures DIR  # 실제 사진 폴더로 측정
+
+합성 픽스처는 색상별(COLOR_CATEGORIES 9종) 4000x3000 JPEG 로,
+저주파 색 얼룩 + 센서 노이즈를 섞어 실제 사진과 비슷한 압축률이 나오도록 만든다.
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from color_analyzer import analyze_image  # noqa: E402
+
+BUDGET_MS = 50
+
+# color_id → 픽스처 기준 RGB
+FIXTURE_COLORS = {
+    1: (220, 40, 50), 2: (245, 140, 40), 3: (245, 215, 50),
+    4: (60, 170, 80), 5: (50, 110, 220), 6: (140, 80, 200),
+    7: (120, 70, 35), 8: (20, 20, 22), 9: (245, 245, 242),
+}
+
+
+def make_fixtures(folder, size=(4000, 3000), seed=0):
+    rng = np.random.default_rng(seed)
+    w, h = size
+    paths = {}
+    for color_id, base in FIXTURE_COLORS.items():
+        blotches = rng.normal(0, 12, (h // 100, w // 100, 3)) + np.array(base)
+        img = Image.fromarray(blotches.clip(0, 255).astype(np.uint8)).resize(size, Image.Resampling.BICUBIC)
+        noisy = np.asarray(img, dtype=np.int16) + rng.integers(-5, 6, (h, w, 3))
+        path = os.path.join(folder, f"fixture_{color_id}.jpg")
+        Image.fromarray(noisy.clip(0, 255).astype(np.uint8)).save(path, quality=92)
+        paths[path] = color_id
+    return paths
+
+
+def run(paths, repeat):
+    timings = []
+    correct = 0
+    for path, expected in paths.items():
+        analyze_image(path)  # 🔥 워밍업 (파일 캐시)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = analyze_image(path)
+            timings.append((time.perf_counter() - start) * 1000)
+        ok = expected is None or result["color_id"] == expected
+        correct += ok
+        print(f"{'✅' if ok else '❌'} {os.path.basename(path)}: {result}")
+    return timings, correct
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--fixtures", help="실제 사진 폴더 (없으면 합성 픽스처 생성)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.fixtures:
+            paths = {os.path.join(args.fixtures, n): None for n in sorted(os.listdir(args.fixtures))}
+        else:
+            print("🖼️ 12MP 합성 픽스처 생성 중...")
+            paths = make_fixtures(tmp)
+        timings, correct = run(paths, args.repeat)
+
+    timings.sort()
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"\n📊 {len(paths)}장 x {args.repeat}회")
+    print(f"   평균 {statistics.mean(timings):.1f} ms | p50 {statistics.median(timings):.1f} ms | p95 {p95:.1f} ms")
+    print(f"   분류 정확도 {correct}/{len(paths)}")
+    print(f"   {'✅' if p95 < BUDGET_MS else '⚠️'} 목표 {BUDGET_MS} ms / 장")
+    return 0 if p95 < BUDGET_MS else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""
+벤치마크용 oracledb 대역 (SQLite 기반)
+
+    import fake_oracledb
+    fake_oracledb.install("/tmp/bench.db")   # sys.modules["oracledb"] 교체
+    import app                                # db_config 가 이 모듈로 풀을 만든다
+
+app.py / 각 모듈이 쓰는 Oracle 문법만 SQLite 로 옮긴다.
+  - NVL, TO_CHAR, FLOOR          → SQLite 사용자 함수
+  - SYSTIMESTAMP / SYSDATE       → CURRENT_TIMESTAMP
+  - SYSTIMESTAMP - NUMTODSINTERVAL(:n, 'SECOND') → datetime(CURRENT_TIMESTAMP, -n seconds)
+  - FETCH FIRST n ROWS ONLY      → LIMIT n
+  - RETURNING ... INTO :v        → SQLite RETURNING + cur.var() 값 채우기
+  - BEGIN EXECUTE IMMEDIATE '..' → 안의 DDL 실행 (이미 있으면 무시, init_db 의 PL/SQL 블록)
+  - IDENTITY / ALTER TABLE ADD (a, b) 등 DDL 차이
+Oracle 과 실행 계획·동시성 특성은 다르므로 절대값보다 커밋 간 비교용으로 쓴다.
+"""
+import re
+import sys
+import sqlite3
+import threading
+from datetime import datetime, date
+
+IntegrityError = sqlite3.IntegrityError
+DatabaseError = sqlite3.DatabaseError
+Error = sqlite3.Error
+
+POOL_GETMODE_WAIT = 0
+POOL_GETMODE_NOWAIT = 1
+POOL_GETMODE_FORCEGET = 2
+POOL_GETMODE_TIMEDWAIT = 3
+
+DB_PATH = None
+
+# ✅ README 의 기본 테이블 (init_db 가 만들지 않는 것들) + dual
+BASE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dual (dummy TEXT);
+INSERT INTO dual SELECT 'X' WHERE NOT EXISTS (SELECT 1 FROM dual);
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    password TEXT NOT NULL,
+    today_color TEXT,
+    today_date TEXT,
+    created_at DATE DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS color_categories (
+    color_id INTEGER PRIMARY KEY,
+    color_key TEXT NOT NULL,
+    color_name TEXT NOT NULL,
+    hex_code TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS photos (
+    photo_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id NUMBER,
+    color_id NUMBER,
+    description TEXT,
+    location TEXT,
+    image_path TEXT NOT NULL,
+    gps_latitude NUMBER,
+    gps_longitude NUMBER,
+    shot_time TEXT,
+    likes_count NUMBER DEFAULT 0,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS likes (
+    like_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    photo_id NUMBER,
+    user_id NUMBER,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS comments (
+    comment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    photo_id NUMBER,
+    user_id NUMBER,
+    content TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_photos_user ON photos (user_id);
+CREATE INDEX IF NOT EXISTS idx_photos_color ON photos (color_id);
+CREATE INDEX IF NOT EXISTS idx_likes_photo ON likes (photo_id);
+"""
+
+COLOR_CATEGORIES = [
+    (1, "red", "레드", "#FF6B6B"), (2, "orange", "오렌지", "#FFA94D"),
+    (3, "yellow", "옐로우", "#FFD43B"), (4, "green", "그린", "#51C56E"),
+    (5, "blue", "블루", "#339AF0"), (6, "purple", "퍼플", "#945EFB"),
+    (7, "brown", "브라운", "#A17C6B"), (8, "black", "블랙", "#212529"),
+    (9, "white", "화이트", "#F8F9FA"),
+]
+
+
+# =========================================
+# 타입 변환 (datetime ↔ TEXT)
+# =========================================
+def _parse_timestamp(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+sqlite3.register_adapter(datetime, lambda d: d.isoformat(" "))
+sqlite3.register_adapter(date, lambda d: d.isoformat())
+sqlite3.register_converter("TIMESTAMP", _parse_timestamp)
+sqlite3.register_converter("DATE", _parse_timestamp)
+
+
+_ORACLE_DATE_FORMAT = [
+    ("YYYY", "%Y"), ("MM", "%m"), ("DD", "%d"),
+    ("HH24", "%H"), ("MI", "%M"), ("SS", "%S"),
+]
+
+
+def _to_char(value, fmt=None):
+    if value is None:
+        return None
+    if fmt is None:
+        return str(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return value
+    for oracle, py in _ORACLE_DATE_FORMAT:
+        fmt = fmt.replace(oracle, py)
+    return value.strftime(fmt)
+
+
+def _floor(value):
+    return None if value is None else int(value // 1)
+
+
+# =========================================
+# SQL 변환
+# =========================================
+_FETCH_FIRST = re.compile(r"FETCH\s+FIRST\s+(:?\w+)\s+ROWS?\s+ONLY", re.I)
+_RETURNING_INTO = re.compile(r"RETURNING\s+(.+?)\s+INTO\s+(:\w+(?:\s*,\s*:\w+)*)\s*;?\s*$", re.I | re.S)
+_PLSQL_DDL = re.compile(r"^\s*BEGIN\s+EXECUTE\s+IMMEDIATE\s+'(.*)';\s+EXCEPTION", re.I | re.S)
+_IDENTITY_PK = re.compile(r"NUMBER\s+GENERATED\s+(?:BY\s+DEFAULT|ALWAYS)\s+AS\s+IDENTITY\s+PRIMARY\s+KEY", re.I)
+_ALTER_ADD_MANY = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s*\((.*)\)\s*$", re.I | re.S)
+_ALTER_ADD_ONE = re.compile(r"^\s*ALTER\s+TABLE\s+(\w+)\s+ADD\s+(?!COLUMN)(.*)$", re.I | re.S)
+_POSITIONAL = re.compile(r":(\d+)\b")
+_MINUS_SECONDS = re.compile(r"SYSTIMESTAMP\s*-\s*NUMTODSINTERVAL\(\s*(:?\w+)\s*,\s*'SECOND'\s*\)", re.I)
+_IGNORED_DDL_ERRORS = ("already exists", "duplicate column name")
+
+
+def translate(sql, positional=False):
+    if positional:
+        sql = _POSITIONAL.sub(r"?\1", sql)  # :1, :2 (튜플 바인드) → ?1, ?2
+    sql = _FETCH_FIRST.sub(r"LIMIT \1", sql)
+    sql = _MINUS_SECONDS.sub(r"datetime(CURRENT_TIMESTAMP, '-' || \1 || ' seconds')", sql)
+    sql = re.sub(r"\bSYSTIMESTAMP\b|\bSYSDATE\b", "CURRENT_TIMESTAMP", sql, flags=re.I)
+    return sql
+
+
+def translate_ddl(ddl):
+    """Oracle DDL 한 문장 → SQLite DDL 목록"""
+    ddl = _IDENTITY_PK.sub("INTEGER PRIMARY KEY AUTOINCREMENT", ddl)
+    m = _ALTER_ADD_MANY.match(ddl)
+    if m:
+        table, cols = m.groups()
+        return [f"ALTER TABLE {table} ADD COLUMN {c.strip()}" for c in cols.split(",")]
+    m = _ALTER_ADD_ONE.match(ddl)
+    if m:
+        return [f"ALTER TABLE {m.group(1)} ADD COLUMN {m.group(2).strip()}"]
+    return [translate(ddl)]
+
+
+class Var:
+    """cur.var(type) 대역: RETURNING INTO 결과 (행별 값 목록)"""
+
+    def __init__(self, typ=None):
+        self.type = typ
+        self._values = []
+
+    def getvalue(self, pos=0):
+        return self._values
+
+    def setvalue(self, pos, value):
+        self._values = value if isinstance(value, list) else [value]
+
+
+class Cursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self._cur = connection._raw.cursor()
+        self._rows = None  # RETURNING 처럼 미리 읽어 둔 결과
+        self._rowcount = None
+        self.arraysize = 100
+
+    def var(self, typ=None, *args, **kwargs):
+        return Var(typ)
+
+    @property
+    def description(self):
+        return self._cur.description if self._rows is None else None
+
+    @property
+    def rowcount(self):
+        return self._cur.rowcount if self._rowcount is None else self._rowcount
+
+    def execute(self, sql, params=None, **kwargs):
+        positional = isinstance(params, (list, tuple))
+        if not positional:
+            params = dict(params or {}, **kwargs)
+        self._rows = None
+        self._rowcount = None
+
+        m = _PLSQL_DDL.match(sql)
+        if m:
+            for ddl in translate_ddl(m.group(1).replace("''", "'")):
+                try:
+                    self._cur.execute(ddl)
+                except sqlite3.OperationalError as e:
+                    if not any(msg in str(e) for msg in _IGNORED_DDL_ERRORS):
+                        raise
+            return None
+
+        m = _RETURNING_INTO.search(sql)
+        if m:
+            names = [n.strip()[1:] for n in m.group(2).split(",")]
+            targets = [params.pop(n) for n in names]
+            self._cur.execute(translate(sql[:m.start()] + "RETURNING " + m.group(1)), params)
+            rows = self._cur.fetchall()
+            for i, var in enumerate(targets):
+                var.setvalue(0, [r[i] for r in rows])
+            self._rows = []
+            self._rowcount = len(rows)
+            return None
+
+        self._cur.execute(translate(sql, positional), params)
+        return self
+
+    def executemany(self, sql, seq, **kwargs):
+        self._rows = None
+        self._rowcount = None
+        seq = list(seq)
+        positional = bool(seq) and isinstance(seq[0], (list, tuple))
+        self._cur.executemany(translate(sql, positional), seq)
+
+    def fetchone(self):
+        return self._cur.fetchone() if self._rows is None else None
+
+    def fetchmany(self, size=None):
+        return self._cur.fetchmany(size or self.arraysize) if self._rows is None else []
+
+    def fetchall(self):
+        return self._cur.fetchall() if self._rows is None else []
+
+    def __iter__(self):
+        return iter(self.fetchall())
+
+    def close(self):
+        self._cur.close()
+
+
+class Connection:
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def cursor(self):
+        return Cursor(self)
+
+    def commit(self):
+        self._raw.commit()
+
+    def rollback(self):
+        self._raw.rollback()
+
+    def close(self):
+        if self._raw is not None:
+            self._pool.release(self._raw)
+            self._raw = None
+
+
+def connect_raw(path):
+    raw = sqlite3.connect(
+        path, timeout=30, check_same_thread=False, detect_types=sqlite3.PARSE_DECLTYPES,
+    )
+    raw.execute("PRAGMA journal_mode=WAL")
+    raw.execute("PRAGMA synchronous=NORMAL")
+    raw.create_function("NVL", 2, lambda a, b: b if a is None else a, deterministic=True)
+    raw.create_function("TO_CHAR", 1, _to_char, deterministic=True)
+    raw.create_function("TO_CHAR", 2, _to_char, deterministic=True)
+    raw.create_function("FLOOR", 1, _floor, deterministic=True)
+    return raw
+
+
+class Pool:
+    """oracledb 세션 풀 대역: max 개까지 SQLite 연결을 재사용"""
+
+    def __init__(self, path, min=1, max=4, increment=1, timeout=0,
+                 wait_timeout=0, stmtcachesize=20, getmode=POOL_GETMODE_WAIT, **kwargs):
+        self.path = path
+        self.min = min
+        self.max = max
+        self.increment = increment
+        self.timeout = timeout
+        self.wait_timeout = wait_timeout
+        self.stmtcachesize = stmtcachesize
+        self.getmode = getmode
+        self._free = []
+        self._slots = threading.BoundedSemaphore(max)
+        self._lock = threading.Lock()
+        self.busy = 0
+        self.opened = 0
+
+    def acquire(self):
+        timeout = self.wait_timeout / 1000 if self.getmode == POOL_GETMODE_TIMEDWAIT else None
+        if not self._slots.acquire(timeout=timeout):
+            raise DatabaseError("DPY-4005: timed out waiting for the connection pool")
+        with self._lock:
+            raw = self._free.pop() if self._free else None
+            if raw is None:
+                self.opened += 1
+            self.busy += 1
+        if raw is None:
+            raw = connect_raw(self.path)
+        return Connection(self, raw)
+
+    def release(self, raw):
+        raw.rollback()  # oracledb 와 같이 커밋되지 않은 작업은 반납 시 롤백
+        with self._lock:
+            self._free.append(raw)
+            self.busy -= 1
+        self._slots.release()
+
+    def close(self, force=False):
+        with self._lock:
+            for raw in self._free:
+                raw.close()
+            self._free.clear()
+
+
+def create_pool(user=None, password=None, dsn=None, **kwargs):
+    if DB_PATH is None:
+        raise RuntimeError("fake_oracledb.install(path) 를 먼저 호출하세요")
+    return Pool(DB_PATH, **kwargs)
+
+
+def create_base_schema(path):
+    raw = connect_raw(path)
+    raw.executescript(BASE_SCHEMA)
+    raw.executemany("INSERT OR IGNORE INTO color_categories VALUES (?, ?, ?, ?)", COLOR_CATEGORIES)
+    raw.commit()
+    raw.close()
+
+
+def install(path):
+    """이 모듈을 oracledb 로 등록하고 기본 스키마 생성 (app import 전에 호출)"""
+    global DB_PATH
+    DB_PATH = path
+    create_base_schema(path)
+    sys.modules["oracledb"] = sys.modules[__name__]
+    return path
@@ -0,0 +1,162 @@
+import os
+import logging
+import time
+import pickle
+import threading
+from collections import OrderedDict
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 캐시 저장소 (프로세스 내 LRU / 공유 Redis)
+# =========================================
+# 사진 상세 팝업, 갤러리 개수·첫 페이지처럼 자주 읽고 가끔 바뀌는 데이터를 담는다.
+# 값이 바뀌는 쓰기 경로(업로드, 좋아요, 댓글)에서 delete() / 태그 무효화로 비운다.
+#
+# 저장소는 같은 인터페이스(get / set / delete / clear / incr / counter)를 가진다.
+#   - LRUCache   : 프로세스 내 (기본)
+#   - RedisCache : CACHE_URL=redis://... 지정 시, 워커 프로세스 여러 개가 같은 캐시를 본다
+#                  (redis 패키지가 필요하며 없으면 LRUCache 로 대체)
+
+_MISSING = object()
+
+
+class LRUCache:
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key → (만료 시각, 값)
+        self._counters = {}  # 태그 버전 등 (LRU 에서 밀려나면 안 되므로 따로 보관)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._data.get(key, _MISSING)
+            if item is _MISSING or item[0] < time.monotonic():
+                if item is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def incr(self, name):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + 1
+            return self._counters[name]
+
+    def counter(self, name):
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class RedisCache:
+    """여러 프로세스가 공유하는 캐시 (값은 pickle, 만료는 Redis TTL)"""
+
+    def __init__(self, url, namespace="colorwalk", ttl=300):
+        import redis  # 선택 의존성
+
+        self.ttl = ttl
+        self.namespace = namespace
+        self._redis = redis.Redis.from_url(url)
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def get(self, key, default=None):
+        raw = self._redis.get(self._key(key))
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return pickle.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        seconds = max(1, int(self.ttl if ttl is None else ttl))
+        self._redis.set(self._key(key), pickle.dumps(value), ex=seconds)
+
+    def delete(self, *keys):
+        if keys:
+            self._redis.delete(*(self._key(k) for k in keys))
+
+    def clear(self):
+        for key in self._redis.scan_iter(f"{self.namespace}:*"):
+            self._redis.delete(key)
+
+    def incr(self, name):
+        return self._redis.incr(self._key(f"counter:{name}"))
+
+    def counter(self, name):
+        return int(self._redis.get(self._key(f"counter:{name}")) or 0)
+
+
+def make_cache(namespace, maxsize=1024, ttl=300):
+    """CACHE_URL 이 있으면 공유 Redis, 없으면 프로세스 내 LRU"""
+    url = os.environ.get("CACHE_URL")
+    if url:
+        try:
+            return RedisCache(url, namespace=namespace, ttl=ttl)
+        except ImportError:
+            log.warning("redis 패키지가 없어 프로세스 내 캐시를 사용합니다 (pip install redis)")
+    return LRUCache(maxsize=maxsize, ttl=ttl)
+
+
+# =========================================
+# 읽기 통과(read-through) 캐시 + 태그 무효화
+# =========================================
+class ReadThroughCache:
+    """
+    get_or_load(key, loader, tags) : 없으면 loader() 결과를 저장 후 반환
+    invalidate(*keys)              : 키 단위 무효화
+    invalidate_tag(tag)            : 태그 버전을 올려 그 태그로 저장된 값 전체를 무효화
+                                     (키 목록을 몰라도 되고, 옛 값은 TTL/LRU 로 자연히 정리)
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def _versioned(self, key, tags):
+        if not tags:
+            return key
+        versions = ",".join(f"{t}@{self.backend.counter(f'tag:{t}')}" for t in tags)
+        return f"{key}|{versions}"
+
+    def get_or_load(self, key, loader, ttl=None, tags=()):
+        full_key = self._versioned(key, tags)
+        value = self.backend.get(full_key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.backend.set(full_key, value, ttl)
+        return value
+
+    def invalidate(self, *keys):
+        self.backend.delete(*keys)
+
+    def invalidate_tag(self, *tags):
+        for tag in tags:
+            self.backend.incr(f"tag:{tag}")
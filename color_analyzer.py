@@ -0,0 +1,92 @@
+import numpy as np
+from PIL import Image, ImageOps
+
+# =========================================
+# HSV 대표 색상 분석 (업로드 사진 → COLOR_CATEGORIES)
+# =========================================
+# 1) JPEG 는 draft 모드로 DCT 단계에서 1/8 까지 줄여서 디코딩 (12MP 도 수 ms)
+# 2) 작은 크기로 축소 후 NumPy 로 픽셀 전체를 한 번에 HSV 변환
+# 3) upload.js 의 getColorCategory 와 같은 규칙으로 픽셀마다 분류 → 최빈 색상
+#    신뢰도 = 분류된 픽셀 중 최빈 색상이 차지하는 비율
+
+ANALYZE_SIZE = 128
+
+# COLOR_CATEGORIES.COLOR_ID
+RED, ORANGE, YELLOW, GREEN, BLUE, PURPLE, BROWN, BLACK, WHITE = range(1, 10)
+UNKNOWN = 0  # 분홍/자홍 등 어느 범주에도 속하지 않는 픽셀
+
+
+def load_small_rgb(source, size=ANALYZE_SIZE):
+    """파일 경로/파일 객체/Image → 축소된 RGB uint8 배열 (H, W, 3)"""
+    opened = not isinstance(source, Image.Image)
+    img = Image.open(source) if opened else source
+    try:
+        if img.format == "JPEG":
+            img.draft("RGB", (size * 2, size * 2))  # 디코딩 단계에서 축소
+        small = ImageOps.contain(img, (size, size), Image.Resampling.BILINEAR)
+        if small.mode != "RGB":
+            small = small.convert("RGB")
+        return np.asarray(small, dtype=np.uint8)
+    finally:
+        if opened:
+            img.close()
+
+
+def rgb_to_hsv(rgb):
+    """uint8 RGB 배열 → (h 0~360, s 0~1, v 0~1) float32 배열 3개"""
+    rgb = rgb.reshape(-1, 3).astype(np.float32) / 255.0
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    mx = rgb.max(axis=1)
+    mn = rgb.min(axis=1)
+    d = mx - mn
+    safe_d = np.where(d == 0, 1.0, d)
+
+    h = np.select(
+        [d == 0, mx == r, mx == g],
+        [0.0, ((g - b) / safe_d) % 6, (b - r) / safe_d + 2],
+        (r - g) / safe_d + 4,
+    ) * 60.0
+    s = np.where(mx == 0, 0.0, d / np.where(mx == 0, 1.0, mx))
+    return h, s, mx
+
+
+def classify_pixels(h, s, v):
+    """픽셀별 COLOR_ID (upload.js getColorCategory 규칙, 먼저 맞는 조건 우선)"""
+    return np.select(
+        [
+            v < 0.15,
+            (v > 0.9) & (s < 0.15),
+            (h >= 10) & (h < 45) & (s > 0.4) & (v < 0.7),
+            (h >= 345) | (h < 15),
+            (h >= 15) & (h < 45),
+            (h >= 45) & (h < 70),
+            (h >= 70) & (h < 170),
+            (h >= 170) & (h < 260),
+            (h >= 260) & (h < 320),
+        ],
+        [BLACK, WHITE, BROWN, RED, ORANGE, YELLOW, GREEN, BLUE, PURPLE],
+        UNKNOWN,
+    )
+
+
+def analyze_image(source):
+    """
+    대표 색상 분석 → {"color_id", "confidence", "hex"}
+      - color_id   : 1~9 (COLOR_CATEGORIES), 분류 가능한 픽셀이 없으면 None
+      - confidence : 0~1
+      - hex        : 평균 RGB (참고용)
+    """
+    rgb = load_small_rgb(source)
+    h, s, v = rgb_to_hsv(rgb)
+    counts = np.bincount(classify_pixels(h, s, v), minlength=10)
+    counts[UNKNOWN] = 0
+    total = counts.sum()
+    mean = rgb.reshape(-1, 3).mean(axis=0).astype(int)
+    if total == 0:
+        return {"color_id": None, "confidence": 0.0, "hex": "#%02X%02X%02X" % tuple(mean)}
+    color_id = int(counts.argmax())
+    return {
+        "color_id": color_id,
+        "confidence": round(float(counts[color_id] / total), 4),
+        "hex": "#%02X%02X%02X" % tuple(mean),
+    }
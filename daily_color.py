@@ -0,0 +1,157 @@
+import json
+import atexit
+import hashlib
+import logging
+import threading
+
+from db_config import get_connection
+from ranking import service_today
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 오늘의 색상 (/api/color)
+# =========================================
+# - 기본 색상: (사용자, 날짜) 시드로 정해지는 결정적 선택 → 저장할 필요가 없다
+#   날짜는 서버 시간대가 아니라 SHOT_TIME_ZONE 기준 (랭킹 기간과 같은 자정에 바뀜)
+#   (로그인 전에는 모든 방문자가 같은 "오늘의 색상")
+# - 다시 뽑기(force=1)만 세션에 오늘 항목 하나로 기록 {"date", "key", "roll"}
+#   → 날짜가 바뀌면 덮어쓰므로 세션 쿠키가 커지지 않는다
+# - 로그인 사용자의 다시 뽑기 결과는 USERS.TODAY_COLOR / TODAY_DATE 에
+#   백그라운드에서 모아서 한 번에 저장 (요청 안에서는 DB 연결을 열지 않음)
+#   로그인 시 저장된 오늘 색상이 있으면 세션으로 복원한다.
+
+COLORS = (
+    {"id": 1, "key": "red", "name": "레드", "emoji": "❤️", "hex": "#FF4B5C"},
+    {"id": 2, "key": "orange", "name": "오렌지", "emoji": "🧡", "hex": "#FF8C42"},
+    {"id": 3, "key": "yellow", "name": "옐로우", "emoji": "💛", "hex": "#FFD93D"},
+    {"id": 4, "key": "green", "name": "그린", "emoji": "💚", "hex": "#4CAF50"},
+    {"id": 5, "key": "blue", "name": "블루", "emoji": "💙", "hex": "#4A90E2"},
+    {"id": 6, "key": "purple", "name": "퍼플", "emoji": "💜", "hex": "#A66DD4"},
+    {"id": 7, "key": "brown", "name": "브라운", "emoji": "🤎", "hex": "#8B5E3C"},
+    {"id": 8, "key": "black", "name": "블랙", "emoji": "🖤", "hex": "#222"},
+    {"id": 9, "key": "white", "name": "화이트", "emoji": "🤍", "hex": "#FFFFFF"},
+)
+COLOR_BY_KEY = {c["key"]: c for c in COLORS}
+
+SESSION_KEY = "today_color"
+LEGACY_SESSION_KEY = "global_color_data"  # 날짜별로 계속 쌓이던 예전 세션 항목
+
+
+def seeded_color(seed, day, roll=0, exclude=None):
+    """(seed, 날짜, 다시 뽑기 횟수) → 항상 같은 색상 (exclude 키는 후보에서 제외)"""
+    candidates = [c for c in COLORS if c["key"] != exclude] if exclude else COLORS
+    digest = hashlib.sha256(f"{seed}:{day}:{roll}".encode()).digest()
+    return candidates[int.from_bytes(digest[:8], "big") % len(candidates)]
+
+
+class DailyColorService:
+    def __init__(self, flush_interval=5.0, max_pending=200):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending = {}  # user_id → (색상 key, 날짜) : 같은 사용자는 마지막 값만 저장
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="color-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    # ---------- 요청 처리 (DB 없음) ----------
+    @staticmethod
+    def _seed(user_id):
+        return user_id if user_id else "*"
+
+    @staticmethod
+    def _today_entry(session, day):
+        entry = session.get(SESSION_KEY)
+        if entry and entry.get("date") == day and entry.get("key") in COLOR_BY_KEY:
+            return entry
+        return None
+
+    def current(self, session, user_id, day=None):
+        """오늘 색상: 세션에 다시 뽑은 값이 있으면 그 값, 없으면 시드 색상 (세션은 건드리지 않음)"""
+        day = day or service_today().isoformat()  # SHOT_TIME_ZONE 기준 날짜
+        if LEGACY_SESSION_KEY in session:  # 한 번만 정리 (없을 때 pop 하면 매번 쿠키가 다시 쓰임)
+            session.pop(LEGACY_SESSION_KEY)
+        entry = self._today_entry(session, day)
+        if entry:
+            return COLOR_BY_KEY[entry["key"]]
+        return seeded_color(self._seed(user_id), day)
+
+    def reroll(self, session, user_id, day=None):
+        """지금 색상과 다른 색상으로 다시 뽑아 세션(오늘 항목 하나)에 기록, 로그인 사용자는 저장 예약"""
+        day = day or service_today().isoformat()  # SHOT_TIME_ZONE 기준 날짜
+        current = self.current(session, user_id, day)
+        entry = self._today_entry(session, day)
+        roll = (entry.get("roll", 0) if entry else 0) + 1
+        color = seeded_color(self._seed(user_id), day, roll, exclude=current["key"])
+        session[SESSION_KEY] = {"date": day, "key": color["key"], "roll": roll}
+        if user_id:
+            self.record(user_id, color["key"], day)
+        return color
+
+    def restore(self, session, today_color, today_date, day=None):
+        """로그인 시 USERS 에 저장된 오늘 색상이 있으면 세션으로 복원"""
+        day = day or service_today().isoformat()  # SHOT_TIME_ZONE 기준 날짜
+        if not today_color or str(today_date) != day:
+            return
+        try:
+            key = json.loads(today_color).get("key")
+        except (TypeError, ValueError, AttributeError):
+            return
+        if key in COLOR_BY_KEY:
+            session[SESSION_KEY] = {"date": day, "key": key, "roll": 1}
+
+    # ---------- 백그라운드 저장 ----------
+    def record(self, user_id, key, day):
+        with self._lock:
+            self._pending[int(user_id)] = (key, day)
+            pending = len(self._pending)
+        if pending >= self.max_pending:
+            self._wake.set()
+
+    def flush(self):
+        """모아 둔 다시 뽑기 결과를 한 번의 executemany 로 저장 → 저장한 사용자 수"""
+        with self._flush_lock:
+            with self._lock:
+                batch = self._pending
+                self._pending = {}
+            if not batch:
+                return 0
+
+            conn = get_connection()
+            try:
+                if not conn:
+                    raise ConnectionError("DB 연결 실패")
+                cur = conn.cursor()
+                cur.executemany("""
+                    UPDATE users
+                    SET today_color = :c, today_date = :d
+                    WHERE user_id = :uid
+                """, [
+                    {"c": json.dumps(COLOR_BY_KEY[key], ensure_ascii=False), "d": day, "uid": uid}
+                    for uid, (key, day) in batch.items()
+                ])
+                conn.commit()
+                return len(batch)
+            except Exception as e:
+                # ✅ 실패분은 다음 flush 때 다시 시도 (그 사이 새로 뽑은 값이 있으면 그 값 우선)
+                with self._lock:
+                    for uid, value in batch.items():
+                        self._pending.setdefault(uid, value)
+                log.warning("오늘의 색상 저장 실패 (%d건 보류): %s", len(batch), e)
+                return 0
+            finally:
+                if conn:
+                    conn.close()
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
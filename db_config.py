@@ -1,24 +1,227 @@
+import os
+import logging
+import time
+import threading
+
 import oracledb
 
-# ✅ Oracle Connection Pool 생성
+from metrics import TimedConnection
+
+log = logging.getLogger(__name__)
+
+# ✅ 유니크 제약 위반 등 (app.py 에서 DB 드라이버를 직접 import 하지 않도록 노출)
+IntegrityError = oracledb.IntegrityError
+
+# =========================================
+# Oracle Connection Pool (크기/대기 시간은 환경 변수로 조정)
+# =========================================
+#   DB_USER / DB_PASSWORD / DB_DSN   접속 정보 (기본: system / 1234 / localhost:1521/XE)
+#   DB_POOL_MIN        최소 연결 유지 개수 (기본 2)
+#   DB_POOL_MAX        최대 연결 개수 (기본 5)
+#   DB_POOL_INCREMENT  늘어나는 단위 (기본 1)
+#   DB_POOL_TIMEOUT    유휴 연결 유지 시간, 초 (기본 60)
+#   DB_POOL_WAIT_MS    풀이 가득 찼을 때 연결을 기다리는 최대 시간, ms (기본 5000)
+#   DB_STMT_CACHE      연결별 문장 캐시 크기 (기본 50)
+POOL_CONFIG = {
+    "min": int(os.environ.get("DB_POOL_MIN", 2)),
+    "max": int(os.environ.get("DB_POOL_MAX", 5)),
+    "increment": int(os.environ.get("DB_POOL_INCREMENT", 1)),
+    "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 60)),
+    "wait_timeout": int(os.environ.get("DB_POOL_WAIT_MS", 5000)),
+    "stmtcachesize": int(os.environ.get("DB_STMT_CACHE", 50)),
+}
+
 pool = oracledb.create_pool(
-    user="system",             # 사용자명
-    password="1234",           # 비밀번호
-    dsn="localhost:1521/XE",   # XE 기본 주소
-    min=2,                     # 최소 연결 유지 개수
-    max=5,                     # 최대 연결 개수
-    increment=1,               # 늘어나는 단위
-    timeout=60,                # 유휴 연결 유지 시간(초)
+    user=os.environ.get("DB_USER", "system"),
+    password=os.environ.get("DB_PASSWORD", "1234"),
+    dsn=os.environ.get("DB_DSN", "localhost:1521/XE"),
+    getmode=oracledb.POOL_GETMODE_TIMEDWAIT,  # 무한 대기 대신 wait_timeout 후 실패
+    **POOL_CONFIG,
 )
 
-# ✅ 연결 함수 (기존과 동일하게 사용 가능)
+# ✅ 연결 획득 통계 (이 프로세스 기준)
+_stats_lock = threading.Lock()
+_acquire_stats = {
+    "acquired": 0,
+    "acquire_failures": 0,
+    "wait_total_ms": 0.0,
+    "wait_max_ms": 0.0,
+}
+
+
+# ✅ 연결 함수 (기존과 동일하게 사용 가능, 실패 시 None)
 def get_connection():
+    started = time.perf_counter()
     try:
-        connection = pool.acquire()  # 풀에서 즉시 연결 가져오기
-        return connection
+        connection = pool.acquire()  # 풀에 여유가 없으면 wait_timeout 까지 대기
     except Exception as e:
-        print("❌ Oracle 연결 실패:", e)
+        with _stats_lock:
+            _acquire_stats["acquire_failures"] += 1
+        log.error("Oracle 연결 실패: %s", e)
         return None
+    waited = (time.perf_counter() - started) * 1000
+    with _stats_lock:
+        _acquire_stats["acquired"] += 1
+        _acquire_stats["wait_total_ms"] += waited
+        _acquire_stats["wait_max_ms"] = max(_acquire_stats["wait_max_ms"], waited)
+    return TimedConnection(connection)  # 커서별 SQL 실행 시간 기록 (metrics.py)
+
+
+# ✅ 연결 반납 (커밋되지 않은 작업은 풀 반납 시 롤백됨)
+def release_connection(conn):
+    try:
+        conn.close()
+    except Exception as e:
+        log.warning("연결 반납 실패: %s", e)
+
+
+def pool_stats():
+    """풀 상태 + 연결 획득 통계 (/internal/pool)"""
+    with _stats_lock:
+        stats = dict(_acquire_stats)
+    acquired = stats["acquired"]
+    stats["wait_avg_ms"] = round(stats["wait_total_ms"] / acquired, 3) if acquired else 0.0
+    stats["wait_total_ms"] = round(stats["wait_total_ms"], 3)
+    stats["wait_max_ms"] = round(stats["wait_max_ms"], 3)
+    stats.update({
+        "busy": pool.busy,
+        "open": pool.opened,
+        "min": pool.min,
+        "max": pool.max,
+        "wait_timeout_ms": pool.wait_timeout,
+        "stmtcachesize": pool.stmtcachesize,
+    })
+    return stats
+
+
+# ✅ 존재하지 않을 때만 DDL 실행 (ORA-00955/01408/01430: 이미 존재하는 객체·인덱스·컬럼 → 무시)
+def _create_if_missing(cur, ddl):
+    quoted = ddl.replace("'", "''")  # DEFAULT 'queued' 같은 문자열 리터럴 이스케이프
+    cur.execute(f"""
+        BEGIN
+            EXECUTE IMMEDIATE '{quoted}';
+        EXCEPTION
+            WHEN OTHERS THEN
+                IF SQLCODE IN (-955, -1408, -1430) THEN NULL; -- 이미 존재하면 무시
+                ELSE RAISE;
+                END IF;
+        END;
+    """)
+
+
+# ✅ 앱이 직접 관리하는 테이블 / 인덱스
+SCHEMA = [
+    """
+    CREATE TABLE photo (
+        id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        username VARCHAR2(50),
+        color VARCHAR2(20),
+        description VARCHAR2(500),
+        location VARCHAR2(200),
+        image_path VARCHAR2(300),
+        likes NUMBER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    # 🏆 랭킹: 사용자별 산책 세션 집계 (업로드 시 증분 갱신)
+    """
+    CREATE TABLE user_sessions (
+        session_id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        user_id NUMBER NOT NULL,
+        start_epoch NUMBER NOT NULL,
+        end_epoch NUMBER NOT NULL,
+        last_lat NUMBER,
+        last_lon NUMBER,
+        distance_km NUMBER DEFAULT 0,
+        photo_count NUMBER DEFAULT 0,
+        score NUMBER DEFAULT 0
+    )
+    """,
+    "CREATE INDEX idx_user_sessions_user ON user_sessions (user_id, start_epoch)",
+    # 🏆 랭킹: 사용자별 합계 (/ranking 은 이 테이블만 읽음)
+    """
+    CREATE TABLE user_scores (
+        user_id NUMBER PRIMARY KEY,
+        photo_count NUMBER DEFAULT 0,
+        distance_km NUMBER DEFAULT 0,
+        score NUMBER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT SYSTIMESTAMP
+    )
+    """,
+    "CREATE INDEX idx_user_scores_score ON user_scores (score DESC)",
+    # 📅 기간별 랭킹: 사용자 × 날짜(세션 시작일, 1970-01-01 부터의 일 수) 버킷
+    """
+    CREATE TABLE user_daily_scores (
+        user_id NUMBER NOT NULL,
+        day_no NUMBER NOT NULL,
+        photo_count NUMBER DEFAULT 0,
+        distance_km NUMBER DEFAULT 0,
+        score NUMBER DEFAULT 0,
+        PRIMARY KEY (user_id, day_no)
+    )
+    """,
+    "CREATE INDEX idx_user_daily_scores_day ON user_daily_scores (day_no, user_id)",
+    # 👤 마이페이지 상단 통계 (업로드 / 좋아요 시 증감만 반영, user_stats.py)
+    """
+    CREATE TABLE user_stats (
+        user_id NUMBER PRIMARY KEY,
+        photo_count NUMBER DEFAULT 0,
+        likes_received NUMBER DEFAULT 0,
+        likes_given NUMBER DEFAULT 0,
+        updated_at TIMESTAMP DEFAULT SYSTIMESTAMP
+    )
+    """,
+    # 👤 마이페이지 키셋 페이지네이션 (내 사진: photo_id, 좋아요한 사진: 좋아요 시각)
+    "CREATE INDEX idx_photos_user_id ON photos (user_id, photo_id DESC)",
+    "CREATE INDEX idx_likes_user_created ON likes (user_id, created_at DESC, photo_id DESC)",
+    # 🖼️ 갤러리 키셋 페이지네이션 (created_at, photo_id)
+    "CREATE INDEX idx_photos_created ON photos (created_at DESC, photo_id DESC)",
+    # 🗺️ 트렌드 지도 bbox 조회
+    "CREATE INDEX idx_photos_gps ON photos (gps_latitude, gps_longitude)",
+    # 📍 주변 사진 검색용 지오해시 (업로드 시 채움, 기존 행은 flask backfill-geohash)
+    "ALTER TABLE photos ADD (geohash VARCHAR2(12))",
+    "CREATE INDEX idx_photos_geohash ON photos (geohash)",
+    # 📅 정규화된 촬영시각 (업로드 시 채움, 기존 행은 flask migrate-shot-time)
+    "ALTER TABLE photos ADD (shot_at TIMESTAMP)",
+    "CREATE INDEX idx_photos_user_shot ON photos (user_id, shot_at)",
+    # 🏆 랭킹 집계에 반영된 시각 (랭킹 작업이 같은 사진을 두 번 더하지 않도록, rebuild-ranking 이 채움)
+    "ALTER TABLE photos ADD (ranked_at TIMESTAMP)",
+    # 🖼️ 썸네일 공개 URL (업로드 시 계산해 저장, 기존 행은 flask backfill-image-urls)
+    "ALTER TABLE photos ADD (thumb_url VARCHAR2(300))",
+    # 🎨 로그인 사용자의 오늘의 색상 (다시 뽑기 결과, daily_color.py 가 모아서 저장)
+    "ALTER TABLE users ADD (today_color VARCHAR2(200), today_date VARCHAR2(10))",
+    # ❤️ 같은 사용자가 같은 사진에 좋아요 1번만 (원자적 좋아요 수 증감의 전제)
+    "CREATE UNIQUE INDEX uq_likes_photo_user ON likes (photo_id, user_id)",
+    # 💬 사진별 최신 댓글 페이지 조회
+    "CREATE INDEX idx_comments_photo ON comments (photo_id, created_at DESC, comment_id DESC)",
+    # 🎨 HSV 대표 색상 분석 결과 (색상 분석 작업이 채움)
+    "ALTER TABLE photos ADD (dominant_color_id NUMBER, color_confidence NUMBER)",
+    # ⚙️ 업로드 후처리 작업 (썸네일, 랭킹 갱신 등)
+    """
+    CREATE TABLE photo_jobs (
+        job_id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+        photo_id NUMBER NOT NULL,
+        kind VARCHAR2(30) NOT NULL,
+        payload VARCHAR2(4000),
+        status VARCHAR2(10) DEFAULT 'queued',
+        attempts NUMBER DEFAULT 0,
+        last_error VARCHAR2(1000),
+        created_at TIMESTAMP DEFAULT SYSTIMESTAMP,
+        updated_at TIMESTAMP DEFAULT SYSTIMESTAMP
+    )
+    """,
+    "CREATE INDEX idx_photo_jobs_photo ON photo_jobs (photo_id)",
+    "CREATE INDEX idx_photo_jobs_status ON photo_jobs (status)",
+    # 🗂️ 콘텐츠 해시 업로드 저장소 (해시별 한 행)
+    """
+    CREATE TABLE upload_blobs (
+        content_hash VARCHAR2(64) PRIMARY KEY,
+        image_path VARCHAR2(500) NOT NULL,
+        byte_size NUMBER,
+        created_at TIMESTAMP DEFAULT SYSTIMESTAMP
+    )
+    """,
+]
 
 
 # ✅ 초기 테이블 생성
@@ -27,33 +230,16 @@ def init_db():
     if conn:
         cur = conn.cursor()
         try:
-            cur.execute("""
-                BEGIN
-                    EXECUTE IMMEDIATE '
-                        CREATE TABLE photo (
-                            id NUMBER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
-                            username VARCHAR2(50),
-                            color VARCHAR2(20),
-                            description VARCHAR2(500),
-                            location VARCHAR2(200),
-                            image_path VARCHAR2(300),
-                            likes NUMBER DEFAULT 0,
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                        )
-                    ';
-                EXCEPTION
-                    WHEN OTHERS THEN
-                        IF SQLCODE = -955 THEN NULL; -- 이미 존재하면 무시
-                        ELSE RAISE;
-                        END IF;
-                END;
-            """)
+            # ✅ 한 문장이 실패해도 (예: 기존 중복 데이터로 유니크 인덱스 실패) 나머지는 계속 진행
+            for ddl in SCHEMA:
+                try:
+                    _create_if_missing(cur, ddl.strip())
+                except Exception as e:
+                    log.warning("테이블 생성 중 오류: %s\n   → %s", e, ddl.strip().splitlines()[0])
             conn.commit()
-            print("✅ Oracle 테이블 준비 완료")
-        except Exception as e:
-            print("⚠️ 테이블 생성 중 오류:", e)
+            log.info("Oracle 테이블 준비 완료")
         finally:
             cur.close()
             conn.close()
     else:
-        print("❌ DB 연결 실패로 테이블 생성 중단")
+        log.error("DB 연결 실패로 테이블 생성 중단")
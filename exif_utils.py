@@ -0,0 +1,94 @@
+import logging
+
+from PIL import Image
+from PIL.ExifTags import TAGS, GPSTAGS
+
+log = logging.getLogger(__name__)
+
+
+# =========================================
+# EXIF GPS → 소수점 변환 유틸
+# =========================================
+def convert_to_decimal(value):
+    """EXIF GPS 데이터를 10진수(float)로 변환"""
+    if not value:
+        return None
+    try:
+        # (도, 분, 초) 형식
+        if isinstance(value, (list, tuple)) and len(value) == 3:
+            def _to_float(x):
+                return x[0] / x[1] if isinstance(x, tuple) else float(x)
+            deg = _to_float(value[0])
+            minutes = _to_float(value[1])
+            seconds = _to_float(value[2])
+            return round(deg + (minutes / 60.0) + (seconds / 3600.0), 6)
+        # 이미 float이거나 int일 때
+        elif isinstance(value, (float, int)):
+            return round(float(value), 6)
+        # 문자열인 경우
+        elif isinstance(value, str):
+            return round(float(value), 6)
+        else:
+            return None
+    except Exception as e:
+        log.warning("GPS 변환 오류: %s", e)
+        return None
+
+
+# =========================================
+# 열린 이미지에서 촬영시간 / GPS 추출
+# =========================================
+def read_exif(img):
+    """
+    Image 객체의 EXIF → {"shot_time", "shot_offset", "lat", "lon"} (없는 값은 None)
+    - shot_offset: OffsetTimeOriginal (예: "+09:00"), 촬영시각 시간대 환산용
+    파일을 다시 열지 않도록 이미 열린 이미지(업로드 스트림 등)를 받는다.
+    """
+    meta = {"shot_time": None, "shot_offset": None, "lat": None, "lon": None}
+    exif_data = img._getexif() if hasattr(img, "_getexif") else None
+    if not exif_data:
+        return meta
+
+    gps_info = {}
+    for tag_id, value in exif_data.items():
+        tag = TAGS.get(tag_id, tag_id)
+        if tag == "DateTimeOriginal":
+            meta["shot_time"] = value
+        elif tag == "OffsetTimeOriginal":
+            meta["shot_offset"] = value
+        elif tag == "GPSInfo":
+            for t in value:
+                sub_tag = GPSTAGS.get(t, t)
+                gps_info[sub_tag] = value[t]
+
+    if gps_info:
+        lat = convert_to_decimal(gps_info.get("GPSLatitude"))
+        lon = convert_to_decimal(gps_info.get("GPSLongitude"))
+        if lat is not None and lon is not None:
+            if gps_info.get("GPSLatitudeRef") == "S":
+                lat = -lat
+            if gps_info.get("GPSLongitudeRef") == "W":
+                lon = -lon
+            meta["lat"], meta["lon"] = lat, lon
+    return meta
+
+
+# =========================================
+# (옵션) 메타데이터 단독 추출 유틸
+# =========================================
+def extract_metadata(image_path):
+    img = Image.open(image_path)
+    exif_data = img._getexif()
+    meta = {"gps": None, "time": None}
+    if exif_data:
+        for tag_id, value in exif_data.items():
+            tag = TAGS.get(tag_id, tag_id)
+            if tag == 'DateTimeOriginal':
+                meta["time"] = value
+            elif tag == 'GPSInfo':
+                gps_info = {}
+                for t in value:
+                    sub_tag = GPSTAGS.get(t, t)
+                    gps_info[sub_tag] = value[t]
+                meta["gps"] = gps_info
+    return meta
@@ -0,0 +1,270 @@
+from collections import defaultdict
+from math import cos, radians
+
+from ranking import calc_distance
+
+# =========================================
+# 트렌드 지도: 서버 측 격자 클러스터링
+# =========================================
+# 지도 화면(bbox)과 줌 레벨을 받아 위경도 격자 셀 단위로 사진을 묶는다.
+# 줌이 충분히 크면 클러스터 대신 개별 사진 좌표를 돌려준다.
+
+CELLS_PER_TILE = 4          # 타일(256px) 한 칸을 4x4 셀로 → 셀 하나 약 64px
+POINT_ZOOM = 16             # 이 줌 이상이면 개별 사진 반환
+MAX_POINTS = 2000           # 개별 사진 반환 상한 (넘으면 클러스터로 대체)
+SINGLE_BATCH = 500          # 1장짜리 셀 상세 조회 IN 목록 크기 (Oracle 상한 1000)
+
+
+def parse_bbox(value):
+    """'minLon,minLat,maxLon,maxLat' → float 튜플 (잘못된 값이면 ValueError)"""
+    parts = [float(v) for v in (value or "").split(",")]
+    if len(parts) != 4:
+        raise ValueError("bbox 는 minLon,minLat,maxLon,maxLat 형식이어야 합니다")
+    min_lon, min_lat, max_lon, max_lat = parts
+    if min_lon > max_lon or min_lat > max_lat:
+        raise ValueError("bbox 범위가 올바르지 않습니다")
+    return (max(min_lon, -180.0), max(min_lat, -90.0), min(max_lon, 180.0), min(max_lat, 90.0))
+
+
+def cell_size_for_zoom(zoom):
+    """줌 레벨별 격자 셀 크기 (도 단위)"""
+    return 360.0 / (2 ** zoom) / CELLS_PER_TILE
+
+
+def _bbox_filter(bbox, user_id):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    where = """
+        p.gps_latitude BETWEEN :min_lat AND :max_lat
+        AND p.gps_longitude BETWEEN :min_lon AND :max_lon
+    """
+    params = {"min_lat": min_lat, "max_lat": max_lat, "min_lon": min_lon, "max_lon": max_lon}
+    if user_id:
+        where += " AND p.user_id = :user_id"
+        params["user_id"] = user_id
+    return where, params
+
+
+def query_points(cur, bbox, user_id=None, limit=MAX_POINTS):
+    """bbox 안의 개별 사진 (limit 초과 시 None)"""
+    where, params = _bbox_filter(bbox, user_id)
+    params["limit"] = limit + 1
+    cur.execute(f"""
+        SELECT p.photo_id, NVL(p.thumb_url, p.image_path), p.color_id,
+               p.gps_latitude, p.gps_longitude, u.name
+        FROM photos p
+        JOIN users u ON p.user_id = u.user_id
+        WHERE {where}
+        FETCH FIRST :limit ROWS ONLY
+    """, params)
+    rows = cur.fetchall()
+    if len(rows) > limit:
+        return None
+    return [
+        {
+            "photo_id": r[0],
+            "image_path": r[1],
+            "color_id": r[2],
+            "lat": float(r[3]),
+            "lon": float(r[4]),
+            "username": r[5],
+        }
+        for r in rows
+    ]
+
+
+def query_clusters(cur, bbox, zoom, user_id=None):
+    """
+    격자 셀별 (중심 좌표, 사진 수, 대표 color_id) 목록
+    셀 x 색상 단위로 DB 에서 집계하고, 셀별 최빈 색상만 파이썬에서 고른다.
+    사진이 1장뿐인 셀은 개별 사진처럼 photo_id / image_path / username 도 채운다.
+    """
+    cell = cell_size_for_zoom(zoom)
+    where, params = _bbox_filter(bbox, user_id)
+    params["cell"] = cell
+    cur.execute(f"""
+        SELECT FLOOR(p.gps_latitude / :cell), FLOOR(p.gps_longitude / :cell), p.color_id,
+               COUNT(*), SUM(p.gps_latitude), SUM(p.gps_longitude), MIN(p.photo_id)
+        FROM photos p
+        WHERE {where}
+        GROUP BY FLOOR(p.gps_latitude / :cell), FLOOR(p.gps_longitude / :cell), p.color_id
+    """, params)
+
+    cells = defaultdict(lambda: {"count": 0, "lat_sum": 0.0, "lon_sum": 0.0, "colors": {}})
+    for cy, cx, color_id, count, lat_sum, lon_sum, photo_id in cur.fetchall():
+        c = cells[(int(cy), int(cx))]
+        c["photo_id"] = photo_id  # count 가 1 일 때만 의미 있음
+        c["count"] += int(count)
+        c["lat_sum"] += float(lat_sum)
+        c["lon_sum"] += float(lon_sum)
+        c["colors"][color_id] = c["colors"].get(color_id, 0) + int(count)
+
+    clusters = []
+    for (cy, cx), c in cells.items():
+        clusters.append({
+            "cell": f"{cy}:{cx}",
+            "lat": c["lat_sum"] / c["count"],
+            "lon": c["lon_sum"] / c["count"],
+            "count": c["count"],
+            "color_id": max(c["colors"].items(), key=lambda kv: kv[1])[0],
+        })
+        if c["count"] == 1:
+            clusters[-1]["photo_id"] = c["photo_id"]
+
+    # ✅ 사진 1장짜리 셀 → 지도 팝업용 썸네일 / 작성자 (IN 목록은 묶음 단위로)
+    singles = {cl["photo_id"]: cl for cl in clusters if cl["count"] == 1}
+    ids = list(singles)
+    for start in range(0, len(ids), SINGLE_BATCH):
+        chunk = ids[start:start + SINGLE_BATCH]
+        binds = {f"id{i}": pid for i, pid in enumerate(chunk)}
+        cur.execute(f"""
+            SELECT p.photo_id, NVL(p.thumb_url, p.image_path), u.name
+            FROM photos p
+            JOIN users u ON p.user_id = u.user_id
+            WHERE p.photo_id IN ({", ".join(":" + k for k in binds)})
+        """, binds)
+        for photo_id, image_path, username in cur.fetchall():
+            singles[photo_id].update(image_path=image_path, username=username)
+    return clusters
+
+
+def query_trend(cur, bbox, zoom, user_id=None):
+    """줌에 따라 개별 사진 또는 클러스터 반환"""
+    if zoom >= POINT_ZOOM:
+        points = query_points(cur, bbox, user_id)
+        if points is not None:
+            return {"mode": "points", "points": points, "clusters": []}
+    return {"mode": "clusters", "points": [], "clusters": query_clusters(cur, bbox, zoom, user_id)}
+
+
+# =========================================
+# 지오해시 공간 인덱스 + 주변 사진 검색
+# =========================================
+# PHOTOS.GEOHASH 에 정밀도 9(약 5m) 지오해시를 저장하고,
+# 반경 검색은 "후보 셀 9개 범위 조회 → calc_distance 로 정밀 필터" 순서로 한다.
+
+GEOHASH_PRECISION = 9
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_KM_PER_DEG = 111.32
+
+
+def geohash_encode(lat, lon, precision=GEOHASH_PRECISION):
+    """위경도 → 지오해시 문자열"""
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars = []
+    bit, ch, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if lon >= mid:
+                ch = (ch << 1) | 1
+                lon_lo = mid
+            else:
+                ch <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if lat >= mid:
+                ch = (ch << 1) | 1
+                lat_lo = mid
+            else:
+                ch <<= 1
+                lat_hi = mid
+        even = not even
+        bit += 1
+        if bit == 5:
+            chars.append(_BASE32[ch])
+            bit, ch = 0, 0
+    return "".join(chars)
+
+
+def _cell_degrees(precision):
+    """정밀도별 셀 크기 (위도 높이, 경도 너비) - 도 단위"""
+    bits = precision * 5
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (2 ** lat_bits), 360.0 / (2 ** lon_bits)
+
+
+def precision_for_radius(lat, radius_km):
+    """3x3 셀 묶음이 반경 원을 완전히 덮는 가장 세밀한 정밀도"""
+    cos_lat = max(cos(radians(lat)), 0.01)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_deg, lon_deg = _cell_degrees(precision)
+        if min(lat_deg * _KM_PER_DEG, lon_deg * _KM_PER_DEG * cos_lat) >= radius_km:
+            return precision
+    return 1
+
+
+def neighbor_cells(lat, lon, precision):
+    """(lat, lon) 이 속한 셀과 주변 8개 셀의 지오해시 (중복 제거)"""
+    lat_deg, lon_deg = _cell_degrees(precision)
+    cells = []
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            nlat = min(max(lat + dy * lat_deg, -90.0), 90.0 - 1e-9)
+            nlon = (lon + dx * lon_deg + 180.0) % 360.0 - 180.0
+            cell = geohash_encode(nlat, nlon, precision)
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def query_nearby(cur, lat, lon, radius_km, limit=50, exclude_photo_id=None):
+    """
+    반경 radius_km 안의 사진을 가까운 순으로 반환
+    - 후보: 지오해시 접두어 범위 조회 (GEOHASH 인덱스 사용)
+    - 정밀: calc_distance 로 실제 거리 계산 후 반경 밖 제거
+    """
+    precision = precision_for_radius(lat, radius_km)
+    ranges = []
+    params = {}
+    for i, cell in enumerate(neighbor_cells(lat, lon, precision)):
+        ranges.append(f"(p.geohash >= :lo{i} AND p.geohash < :hi{i})")
+        params[f"lo{i}"] = cell
+        params[f"hi{i}"] = cell + "~"  # '~' 는 base32 문자보다 뒤 → 접두어 범위 상한
+
+    cur.execute(f"""
+        SELECT p.photo_id, NVL(p.thumb_url, p.image_path), p.color_id,
+               p.gps_latitude, p.gps_longitude, u.name
+        FROM photos p
+        JOIN users u ON p.user_id = u.user_id
+        WHERE ({" OR ".join(ranges)})
+    """, params)
+
+    results = []
+    for photo_id, image_path, color_id, plat, plon, username in cur.fetchall():
+        if photo_id == exclude_photo_id:
+            continue
+        dist = calc_distance(lat, lon, float(plat), float(plon))
+        if dist <= radius_km:
+            results.append({
+                "photo_id": photo_id,
+                "image_path": image_path,
+                "color_id": color_id,
+                "lat": float(plat),
+                "lon": float(plon),
+                "username": username,
+                "distance_km": round(dist, 3),
+            })
+    results.sort(key=lambda r: r["distance_km"])
+    return results[:limit]
+
+
+def backfill_geohash(cur, batch_size=1000):
+    """GEOHASH 가 비어 있는 사진을 batch_size 개 채움 → 처리한 행 수 (0 이면 완료)"""
+    cur.execute("""
+        SELECT photo_id, gps_latitude, gps_longitude
+        FROM photos
+        WHERE geohash IS NULL
+          AND gps_latitude IS NOT NULL AND gps_longitude IS NOT NULL
+        FETCH FIRST :limit ROWS ONLY
+    """, {"limit": batch_size})
+    rows = cur.fetchall()
+    if rows:
+        cur.executemany(
+            "UPDATE photos SET geohash = :geohash WHERE photo_id = :photo_id",
+            [{"geohash": geohash_encode(float(lat), float(lon)), "photo_id": photo_id}
+             for photo_id, lat, lon in rows],
+        )
+    return len(rows)
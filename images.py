@@ -0,0 +1,147 @@
+import os
+import logging
+import posixpath
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from PIL import Image, ImageOps, features
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 업로드 이미지 파생본 (썸네일 / 미리보기)
+# =========================================
+# 원본: static/uploads/<h[:2]>/<h[2:4]>/<sha256>.<ext>   (storage.py 콘텐츠 해시 경로)
+# 파생: 원본과 같은 폴더의 thumb/, medium/ 하위 → .../<h[2:4]>/thumb/<sha256>.webp
+#       (해시 도입 전 평평한 uploads/<name> 도 같은 규칙: uploads/thumb/<stem>.webp)
+#  - thumb  : 갤러리/마이페이지 카드, 지도 팝업 (고정 크기로 잘라냄)
+#  - medium : 상세 팝업에서 원본이 로드되기 전 먼저 보여줄 미리보기
+
+DERIVATIVES = {
+    "thumb": {"size": (480, 360), "crop": True, "quality": 80},
+    "medium": {"size": (1280, 1280), "crop": False, "quality": 85},
+}
+
+# ✅ Pillow 빌드에 WebP 지원이 없으면 JPEG 로 대체
+DERIVATIVE_FORMAT, DERIVATIVE_EXT = ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+
+def derivative_path(image_path, kind):
+    """'uploads/ab/cd/<hash>.jpg' → 'uploads/ab/cd/thumb/<hash>.webp' (DB 경로 기준, static/ 접두어 유지)"""
+    folder, name = posixpath.split(image_path.replace("\\", "/"))
+    stem = os.path.splitext(name)[0]
+    return posixpath.join(folder, kind, f"{stem}.{DERIVATIVE_EXT}")
+
+
+def public_url(image_path, kind=None):
+    """
+    DB 이미지 경로 → 공개 URL ('/static/uploads/ab/cd/thumb/<hash>.webp')
+    요청 컨텍스트 없이 문자열만으로 계산 → 업로드/가져오기 시 PHOTOS.THUMB_URL 로 저장
+    """
+    if kind:
+        image_path = derivative_path(image_path, kind)
+    image_path = image_path.replace("\\", "/")
+    if image_path.startswith("static/"):
+        image_path = image_path[len("static/"):]
+    return f"/static/{image_path}"
+
+
+def static_file(static_folder, image_path, kind=None):
+    """DB 이미지 경로 → static 폴더 안의 실제 파일 경로 (kind 면 파생본)"""
+    rel = public_url(image_path, kind)[len("/static/"):]
+    return os.path.join(static_folder, *rel.split("/"))
+
+
+def backfill_thumb_urls(cur, static_folder, after_id=0, batch_size=1000):
+    """
+    THUMB_URL 이 비어 있는 사진을 photo_id 순서로 batch_size 개 확인
+    → (읽은 행 수, 마지막 photo_id, 채운 수). 읽은 행 수가 0 이면 완료.
+    썸네일 파일이 실제로 있는 사진만 채운다 (없으면 원본 URL 로 보이다가 파생본 생성 후 채워짐)
+    """
+    cur.execute("""
+        SELECT photo_id, image_path
+        FROM photos
+        WHERE photo_id > :after_id AND thumb_url IS NULL
+        ORDER BY photo_id
+        FETCH FIRST :limit ROWS ONLY
+    """, {"after_id": after_id, "limit": batch_size})
+    rows = cur.fetchall()
+    if not rows:
+        return 0, after_id, 0
+    updates = [
+        {"thumb_url": public_url(image_path, "thumb"), "photo_id": photo_id}
+        for photo_id, image_path in rows
+        if os.path.exists(static_file(static_folder, image_path, "thumb"))
+    ]
+    if updates:
+        cur.executemany("UPDATE photos SET thumb_url = :thumb_url WHERE photo_id = :photo_id", updates)
+    return len(rows), rows[-1][0], len(updates)
+
+
+def make_derivatives(src_path, force=False):
+    """
+    원본 파일 하나에 대한 파생본 생성 (프로세스 풀에서도 호출되므로 모듈 최상위 함수)
+    반환: 새로 만든 파생본 파일 경로 목록
+    """
+    folder, name = os.path.split(src_path)
+    stem = os.path.splitext(name)[0]
+    targets = {
+        kind: os.path.join(folder, kind, f"{stem}.{DERIVATIVE_EXT}")
+        for kind in DERIVATIVES
+    }
+    if not force and all(os.path.exists(p) for p in targets.values()):
+        return []
+
+    created = []
+    with Image.open(src_path) as img:
+        img = ImageOps.exif_transpose(img)  # 📐 EXIF 회전 정보 반영
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        if DERIVATIVE_FORMAT == "JPEG" and img.mode == "RGBA":
+            img = img.convert("RGB")
+
+        for kind, spec in DERIVATIVES.items():
+            dest = targets[kind]
+            if not force and os.path.exists(dest):
+                continue
+            os.makedirs(os.path.dirname(dest), exist_ok=True)
+            if spec["crop"]:
+                out = ImageOps.fit(img, spec["size"], Image.Resampling.LANCZOS)
+            else:
+                out = img.copy()
+                out.thumbnail(spec["size"], Image.Resampling.LANCZOS)
+            if DERIVATIVE_FORMAT == "WEBP":
+                out.save(dest, DERIVATIVE_FORMAT, quality=spec["quality"], method=4)
+            else:
+                out.save(dest, DERIVATIVE_FORMAT, quality=spec["quality"], optimize=True)
+            created.append(dest)
+    return created
+
+
+def iter_originals(upload_folder):
+    """업로드 폴더의 원본 파일 목록 (해시 하위 폴더 포함, 파생본/임시 폴더는 제외)"""
+    for root, dirs, files in os.walk(upload_folder):
+        dirs[:] = sorted(d for d in dirs if d not in DERIVATIVES and not d.startswith("."))
+        for name in sorted(files):
+            if not name.startswith("."):
+                yield os.path.join(root, name)
+
+
+def backfill_derivatives(upload_folder, workers=None, force=False):
+    """
+    기존 업로드 전체의 파생본을 프로세스 풀로 생성
+    반환: (처리한 원본 수, 새로 만든 파생본 수, 실패 목록)
+    """
+    sources = list(iter_originals(upload_folder))
+    created = 0
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(make_derivatives, src, force): src for src in sources}
+        for done, future in enumerate(as_completed(futures), start=1):
+            src = futures[future]
+            try:
+                created += len(future.result())
+            except Exception as e:
+                failed.append((src, str(e)))
+            if done % 100 == 0:
+                log.info("파생본 생성 진행 %d/%d", done, len(sources))
+    return len(sources), created, failed
@@ -0,0 +1,59 @@
+import os
+import hashlib
+
+from PIL import Image
+
+from storage import CHUNK_SIZE, store_upload
+from images import make_derivatives
+from color_analyzer import analyze_image
+
+# =========================================
+# 사진 일괄 가져오기 - 프로세스 풀 작업 (importer.py 에서 사용)
+# =========================================
+# spawn 방식(Windows / macOS)에서는 워커가 이 모듈을 다시 import 한다.
+# db_config 는 import 할 때 Oracle 풀을 열기 때문에 이 모듈의 import 경로에 넣지 않는다
+# (storage / images / exif_utils / color_analyzer 만 사용).
+
+_known_hashes = frozenset()
+
+
+def init_worker(known_hashes):
+    """프로세스 풀 initializer: 이미 가져온 콘텐츠 해시 (작업마다 보내지 않고 워커당 한 번만 전달)"""
+    global _known_hashes
+    _known_hashes = known_hashes
+
+
+def file_hash(path):
+    """파일 SHA-256 (storage 의 콘텐츠 해시와 같은 값, 저장은 하지 않음)"""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def prepare_file(path, upload_folder):
+    """
+    파일 하나 처리 (프로세스 풀에서 호출되므로 모듈 최상위 함수)
+    반환: store_upload 결과 + {"source", "mtime", "color"}
+          / 이미 가져온 내용이면 {"source", "content_hash", "skipped"} / 실패 시 {"source", "error"}
+    """
+    try:
+        # ✅ 재실행 시 이미 가져온 파일은 해시만 계산하고 끝 (저장 / 파생본 / 색상 분석 생략)
+        content_hash = file_hash(path)
+        if content_hash in _known_hashes:
+            return {"source": path, "content_hash": content_hash, "skipped": True}
+        with Image.open(path):  # 이미지가 아닌 파일은 저장소에 쓰기 전에 거른다 (헤더만 읽음)
+            pass
+        with open(path, "rb") as f:
+            stored = store_upload(f, upload_folder, os.path.basename(path))
+        make_derivatives(stored["save_path"])  # 이미 있으면 건너뜀
+        stored["color"] = analyze_image(stored["save_path"])
+        stored["source"] = path
+        stored["mtime"] = os.path.getmtime(path)
+        return stored
+    except Exception as e:
+        return {"source": path, "error": str(e)}
@@ -0,0 +1,119 @@
+import os
+import logging
+from datetime import datetime
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+from storage import register_blob, content_hash_of
+from user_stats import bump_user_stats
+from images import public_url
+from import_worker import prepare_file, init_worker
+from geo import geohash_encode
+from ranking import normalize_shot_time, SHOT_TIME_ZONE
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 사진 일괄 가져오기 (flask import-photos)
+# =========================================
+# 산책 모임 아카이브처럼 수천 장을 /upload 없이 한 번에 넣는다.
+#  1) 프로세스 풀: 파일마다 저장(콘텐츠 해시 경로) + EXIF + 파생본 + 대표 색상 (import_worker.py)
+#  2) 메인 프로세스: PHOTOS 를 batch_size 개씩 executemany 로 INSERT 후 커밋
+#  3) 이미 가져온 사진(같은 사용자 + 같은 내용)은 건너뜀 → 중단 후 같은 명령으로 재개
+#     (워커가 해시만 먼저 계산해 비교하므로 건너뛰는 파일은 다시 처리하지 않음)
+# 랭킹 집계는 가져오기가 끝난 뒤 호출하는 쪽에서 사용자 단위로 한 번 다시 만든다.
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tif", ".tiff", ".heic"}
+
+
+def iter_import_files(folder):
+    """폴더 아래 이미지 파일 (하위 폴더 포함, 숨김 파일 제외, 경로순)"""
+    for root, dirs, files in os.walk(folder):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in sorted(files):
+            if not name.startswith(".") and os.path.splitext(name)[1].lower() in IMAGE_EXTS:
+                yield os.path.join(root, name)
+
+
+def _photo_row(user_id, item):
+    exif = item["exif"]
+    shot_at = normalize_shot_time(exif["shot_time"], exif["shot_offset"])
+    if shot_at is None:
+        # 촬영시각이 없으면 파일 수정 시각 (서비스 시간대)
+        shot_at = datetime.fromtimestamp(item["mtime"], SHOT_TIME_ZONE).replace(tzinfo=None, microsecond=0)
+    lat, lon = exif["lat"], exif["lon"]
+    color = item["color"]
+    return {
+        "user_id": user_id,
+        "color_id": color["color_id"] or 1,
+        "description": os.path.splitext(os.path.basename(item["source"]))[0],
+        "image_path": item["db_path"],
+        "thumb_url": public_url(item["db_path"], "thumb"),
+        "gps_latitude": lat,
+        "gps_longitude": lon,
+        "geohash": geohash_encode(lat, lon) if lat is not None and lon is not None else None,
+        "shot_time": exif["shot_time"] or shot_at.strftime("%Y-%m-%d %H:%M:%S"),
+        "shot_at": shot_at,
+        "dominant_color_id": color["color_id"],
+        "color_confidence": color["confidence"],
+    }
+
+
+def _insert_batch(cur, user_id, items):
+    cur.executemany("""
+        INSERT INTO photos (
+            user_id, color_id, description, location, image_path,
+            gps_latitude, gps_longitude, geohash, shot_time, shot_at, thumb_url,
+            dominant_color_id, color_confidence, likes_count, created_at
+        ) VALUES (
+            :user_id, :color_id, :description, NULL, :image_path,
+            :gps_latitude, :gps_longitude, :geohash, :shot_time, :shot_at, :thumb_url,
+            :dominant_color_id, :color_confidence, 0, SYSTIMESTAMP
+        )
+    """, [_photo_row(user_id, item) for item in items])
+    for item in items:
+        register_blob(cur, item["content_hash"], item["db_path"], item["byte_size"])
+    bump_user_stats(cur, user_id, photos=len(items))
+
+
+def import_photos(conn, user_id, folder, upload_folder, workers=None, batch_size=200, progress=None):
+    """
+    folder 의 이미지를 user_id 사진으로 가져온다 (GPS 가 없으면 좌표는 비워 둠)
+    progress(stats) 는 배치를 커밋할 때마다 호출된다.
+    반환: {"total", "imported", "skipped", "failed": [(경로, 오류)]}
+    """
+    sources = list(iter_import_files(folder))
+    cur = conn.cursor()
+    cur.execute("SELECT image_path FROM photos WHERE user_id = :user_id", {"user_id": user_id})
+    existing = {content_hash_of(r[0]) for r in cur.fetchall()} - {None}
+
+    stats = {"total": len(sources), "done": 0, "imported": 0, "skipped": 0, "failed": []}
+    batch = []
+
+    def flush():
+        if batch:
+            _insert_batch(cur, user_id, batch)
+            stats["imported"] += len(batch)
+            batch.clear()
+        conn.commit()
+        if progress:
+            progress(stats)
+
+    work = partial(prepare_file, upload_folder=upload_folder)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(frozenset(existing),)) as pool:
+        # ✅ map 은 입력 순서대로 결과를 돌려줌 → 커밋 경계가 경로순으로 일정
+        for item in pool.map(work, sources, chunksize=8):
+            stats["done"] += 1
+            if "error" in item:
+                log.warning("가져오기 실패 %s: %s", item["source"], item["error"])
+                stats["failed"].append((item["source"], item["error"]))
+            elif item.get("skipped") or item["content_hash"] in existing:
+                stats["skipped"] += 1  # 이전 실행에서 가져옴 / 이번 실행에 같은 내용이 이미 있음
+            else:
+                existing.add(item["content_hash"])
+                batch.append(item)
+            if len(batch) >= batch_size:
+                flush()
+    flush()
+    return stats
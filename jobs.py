@@ -0,0 +1,244 @@
+import os
+import logging
+import json
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from db_config import get_connection
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 업로드 후처리 작업 큐 (PHOTO_JOBS + 워커 스레드 풀)
+# =========================================
+# /upload 는 사진 행과 작업 행만 INSERT 하고 바로 응답한다.
+# 워커가 썸네일 생성, 랭킹 갱신 같은 파생 작업을 처리하고
+# 상태(queued → running → done / retry / failed)를 PHOTO_JOBS 에 남긴다.
+#
+# 환경 변수
+#   JOB_WORKERS       워커 스레드 수 (기본 2)
+#   JOB_PROCESSES     CPU 작업용 프로세스 풀 크기 (기본 0 = 워커 스레드에서 직접 실행)
+#   JOB_MAX_ATTEMPTS  최대 시도 횟수 (기본 3)
+#   JOB_RETRY_DELAY   재시도 대기 초 (시도마다 2배, 기본 5)
+#   JOB_STALE_SEC     시작 시 복구할 작업의 최소 방치 시간 (기본 600)
+#                     → 다른 프로세스가 지금 처리 중인 작업은 가져오지 않는다
+
+
+class JobQueue:
+    def __init__(self, workers=2, processes=0, max_attempts=3, retry_delay=5, stale_after=600):
+        self.workers = workers
+        self.processes = processes
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.stale_after = stale_after
+        self.handlers = {}
+        self._queue = queue.Queue()
+        self._pending = set()  # 큐에 들어 있는 job_id (복구/재시도 중복 투입 방지)
+        self._pool = None
+        self._started = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            workers=int(os.environ.get("JOB_WORKERS", 2)),
+            processes=int(os.environ.get("JOB_PROCESSES", 0)),
+            max_attempts=int(os.environ.get("JOB_MAX_ATTEMPTS", 3)),
+            retry_delay=float(os.environ.get("JOB_RETRY_DELAY", 5)),
+            stale_after=int(os.environ.get("JOB_STALE_SEC", 600)),
+        )
+
+    # ✅ 작업 종류별 처리 함수 등록: handler(cur, payload)
+    def handler(self, kind):
+        def register(fn):
+            self.handlers[kind] = fn
+            return fn
+        return register
+
+    # ✅ CPU 위주 함수는 프로세스 풀에서 실행 (설정이 없으면 현재 스레드에서)
+    def run_cpu(self, fn, *args):
+        if self._pool is None:
+            return fn(*args)
+        return self._pool.submit(fn, *args).result()
+
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            if self.processes > 0:
+                self._pool = ProcessPoolExecutor(max_workers=self.processes)
+            for i in range(self.workers):
+                threading.Thread(target=self._worker, name=f"photo-job-{i}", daemon=True).start()
+        self.recover()
+
+    # ✅ 호출자 트랜잭션 안에서 작업 행 생성 → job_id
+    def create_job(self, cur, photo_id, kind, payload=None):
+        job_id = cur.var(int)
+        cur.execute("""
+            INSERT INTO photo_jobs (photo_id, kind, payload, status, attempts, created_at, updated_at)
+            VALUES (:photo_id, :kind, :payload, 'queued', 0, SYSTIMESTAMP, SYSTIMESTAMP)
+            RETURNING job_id INTO :job_id
+        """, {
+            "photo_id": photo_id,
+            "kind": kind,
+            "payload": json.dumps(payload or {}, ensure_ascii=False, default=str),
+            "job_id": job_id,
+        })
+        return job_id.getvalue()[0]
+
+    # ✅ 커밋 이후 호출: 메모리 큐에 투입
+    def submit(self, job_id, kind, payload=None):
+        self.start()
+        self._enqueue(job_id, kind, payload or {})
+
+    def _enqueue(self, job_id, kind, payload):
+        with self._lock:
+            if job_id in self._pending:
+                return
+            self._pending.add(job_id)
+        self._queue.put((job_id, kind, payload))
+
+    def join(self):
+        """큐에 들어간 작업이 모두 처리될 때까지 대기 (CLI 용)"""
+        self._queue.join()
+
+    def recover(self):
+        """
+        재시작 등으로 끝나지 않은 채 stale_after 초 넘게 방치된 작업을 가져와 다시 큐에 넣음
+        작업마다 updated_at 을 조건부로 갱신해 "가져감" 을 표시 → 동시에 시작한 다른 프로세스와 나눠 가짐
+        """
+        conn = get_connection()
+        if not conn:
+            return 0
+        stale = "updated_at < SYSTIMESTAMP - NUMTODSINTERVAL(:stale_after, 'SECOND')"
+        try:
+            cur = conn.cursor()
+            cur.execute(f"""
+                SELECT job_id, kind, payload FROM photo_jobs
+                WHERE status IN ('queued', 'running', 'retry') AND {stale}
+                ORDER BY job_id
+            """, {"stale_after": self.stale_after})
+            claimed = []
+            for job_id, kind, payload in cur.fetchall():
+                cur.execute(f"""
+                    UPDATE photo_jobs SET updated_at = SYSTIMESTAMP
+                    WHERE job_id = :job_id AND status IN ('queued', 'running', 'retry') AND {stale}
+                """, {"job_id": job_id, "stale_after": self.stale_after})
+                if cur.rowcount == 1:
+                    claimed.append((job_id, kind, payload))
+            conn.commit()
+        finally:
+            conn.close()
+        for job_id, kind, payload in claimed:
+            self._enqueue(job_id, kind, json.loads(payload or "{}"))
+        return len(claimed)
+
+    def retry_failed(self, photo_id=None):
+        """실패한 작업을 시도 횟수 초기화 후 다시 실행 → 재투입 건수"""
+        conn = get_connection()
+        cur = conn.cursor()
+        where = "status = 'failed'" + (" AND photo_id = :photo_id" if photo_id else "")
+        params = {"photo_id": photo_id} if photo_id else {}
+        cur.execute(f"SELECT job_id, kind, payload FROM photo_jobs WHERE {where}", params)
+        rows = cur.fetchall()
+        cur.execute(f"""
+            UPDATE photo_jobs SET status = 'queued', attempts = 0, updated_at = SYSTIMESTAMP
+            WHERE {where}
+        """, params)
+        conn.commit()
+        conn.close()
+        for job_id, kind, payload in rows:
+            self.submit(job_id, kind, json.loads(payload or "{}"))
+        return len(rows)
+
+    def _set_status(self, cur, job_id, status, error=None, attempt=False):
+        attempts = cur.var(int)
+        cur.execute(f"""
+            UPDATE photo_jobs
+            SET status = :status, last_error = :error, updated_at = SYSTIMESTAMP
+                {", attempts = attempts + 1" if attempt else ""}
+            WHERE job_id = :job_id
+            RETURNING attempts INTO :attempts
+        """, {
+            "status": status,
+            "error": error[:1000] if error else None,
+            "job_id": job_id,
+            "attempts": attempts,
+        })
+        return attempts.getvalue()[0]
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            with self._lock:
+                self._pending.discard(job[0])
+            try:
+                self._run(*job)
+            except Exception:
+                # ✅ 실패 처리 중 오류(끊긴 연결 등)로 워커 스레드가 죽지 않도록 → 큐는 계속 처리
+                log.exception("작업 처리 중 예기치 않은 오류 job=%s kind=%s", job[0], job[1])
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id, kind, payload):
+        conn = get_connection()
+        if not conn:
+            self._schedule_retry(job_id, kind, payload)
+            return
+        cur = conn.cursor()
+        attempts = 0
+        try:
+            attempts = self._set_status(cur, job_id, "running", attempt=True)
+            conn.commit()
+            handler = self.handlers.get(kind)
+            if handler is None:
+                raise LookupError(f"등록되지 않은 작업 종류: {kind}")
+            handler(cur, payload)
+            self._set_status(cur, job_id, "done")
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            log.warning("작업 실패 job=%s kind=%s (%d회차) → %s", job_id, kind, attempts, e)
+            final = attempts >= self.max_attempts
+            self._set_status(cur, job_id, "failed" if final else "retry", error=str(e))
+            conn.commit()
+            if not final:
+                self._schedule_retry(job_id, kind, payload, max(attempts, 1))
+        finally:
+            conn.close()
+
+    def _schedule_retry(self, job_id, kind, payload, attempts=1):
+        delay = self.retry_delay * (2 ** (attempts - 1))
+        timer = threading.Timer(delay, self._enqueue, args=(job_id, kind, payload))
+        timer.daemon = True
+        timer.start()
+
+
+def photo_job_status(cur, photo_id):
+    """사진별 후처리 상태 → {"status": 전체 상태, "jobs": [...]}"""
+    cur.execute("""
+        SELECT kind, status, attempts, last_error, updated_at
+        FROM photo_jobs
+        WHERE photo_id = :photo_id
+        ORDER BY job_id
+    """, {"photo_id": photo_id})
+    jobs = [
+        {
+            "kind": kind,
+            "status": status,
+            "attempts": int(attempts or 0),
+            "error": error,
+            "updated_at": str(updated_at) if updated_at else None,
+        }
+        for kind, status, attempts, error, updated_at in cur.fetchall()
+    ]
+    statuses = {j["status"] for j in jobs}
+    if not jobs or statuses == {"done"}:
+        overall = "done"
+    elif "failed" in statuses:
+        overall = "failed"
+    else:
+        overall = "processing"
+    return {"status": overall, "jobs": jobs}
@@ -0,0 +1,139 @@
+import time
+import logging
+import threading
+from bisect import bisect_left
+
+from db_config import get_connection
+from ranking import RANKING_WINDOWS, window_days
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 리더보드 스냅샷 (USER_SCORES → 메모리, 주기적으로 통째 교체)
+# =========================================
+# /ranking, /api/ranking, 마이페이지 순위는 모두 현재 스냅샷만 읽는다.
+#  - 새 스냅샷은 백그라운드 스레드가 한 번의 쿼리로 만들고 참조만 바꿔 끼운다(원자적 교체)
+#    → 읽는 쪽은 락 없이 항상 완성된 스냅샷 하나를 본다
+#  - 순위는 공동 순위(1, 2, 2, 4 …): 나보다 점수가 높은 사용자 수 + 1
+#  - 사용자 순위: user_id → 순위 dict (O(1)), 임의 점수의 순위: 이분 탐색 (O(log n))
+#  - 기간별 랭킹(day / week / month)은 USER_DAILY_SCORES 의 기간 내 버킷 합으로 같이 만든다
+#    ("all" = 전체 기간 = USER_SCORES)
+
+
+class LeaderboardSnapshot:
+    def __init__(self, rows, built_at=None):
+        """rows: [(user_id, email, photo_count, distance_km, score)] (점수 내림차순)"""
+        self.built_at = built_at or time.time()
+        self.entries = []
+        self._neg_scores = []  # 오름차순 (= 점수 내림차순) → bisect 용
+        self._by_user = {}
+        rank = 0
+        prev_score = None
+        for position, (user_id, email, cnt, dist, score) in enumerate(rows, start=1):
+            score = round(float(score or 0), 1)
+            if score != prev_score:
+                rank, prev_score = position, score
+            entry = {
+                "rank": rank,
+                "user_id": int(user_id),
+                "email": email,
+                "photo_count": int(cnt or 0),
+                "distance_km": round(float(dist or 0), 2),
+                "score": score,
+            }
+            self.entries.append(entry)
+            self._neg_scores.append(-score)
+            self._by_user[entry["user_id"]] = entry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def top(self, n):
+        return self.entries[:n]
+
+    def page(self, offset=0, limit=50):
+        return self.entries[offset:offset + limit]
+
+    def entry_of(self, user_id):
+        """스냅샷에 있는 사용자의 항목 (없으면 None)"""
+        return self._by_user.get(int(user_id)) if user_id is not None else None
+
+    def rank_for_score(self, score):
+        """임의 점수가 이 스냅샷에서 몇 등인지 (스냅샷 이후 점수가 바뀐 사용자용)"""
+        return bisect_left(self._neg_scores, -round(float(score), 1)) + 1
+
+
+def load_snapshot(cur):
+    cur.execute("""
+        SELECT s.user_id, u.email, s.photo_count, s.distance_km, s.score
+        FROM user_scores s
+        JOIN users u ON u.user_id = s.user_id
+        ORDER BY s.score DESC, s.user_id
+    """)
+    return LeaderboardSnapshot(cur.fetchall())
+
+
+def load_window_snapshot(cur, window, today=None):
+    """기간 안의 일별 버킷만 합산 (기간 길이 × 사용자 수만큼만 읽음)"""
+    first_day, last_day = window_days(window, today)
+    cur.execute("""
+        SELECT b.user_id, u.email, SUM(b.photo_count), SUM(b.distance_km), SUM(b.score)
+        FROM user_daily_scores b
+        JOIN users u ON u.user_id = b.user_id
+        WHERE b.day_no BETWEEN :first_day AND :last_day
+        GROUP BY b.user_id, u.email
+        ORDER BY SUM(b.score) DESC, b.user_id
+    """, {"first_day": first_day, "last_day": last_day})
+    return LeaderboardSnapshot(cur.fetchall())
+
+
+def load_snapshots(cur, today=None):
+    """{"all": 전체, "day": 오늘, "week": 이번 주, "month": 이번 달}"""
+    snapshots = {"all": load_snapshot(cur)}
+    for window in RANKING_WINDOWS:
+        snapshots[window] = load_window_snapshot(cur, window, today)
+    return snapshots
+
+
+class Leaderboard:
+    def __init__(self, refresh_interval=60):
+        self.refresh_interval = refresh_interval
+        self._snapshots = None
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="leaderboard", daemon=True)
+            self._thread.start()
+
+    def snapshot(self, window="all"):
+        """현재 스냅샷 (아직 없으면 이 자리에서 한 번 만든다)"""
+        snapshots = self._snapshots
+        if snapshots is None:
+            snapshots = self.refresh() or {}
+        return snapshots.get(window) or LeaderboardSnapshot([])
+
+    def refresh(self):
+        """전체 + 기간별 스냅샷을 새로 만들어 한꺼번에 교체 → {기간: 스냅샷} (실패 시 None, 기존 유지)"""
+        with self._refresh_lock:
+            conn = get_connection()
+            if not conn:
+                return None
+            try:
+                started = time.perf_counter()
+                snapshots = load_snapshots(conn.cursor())
+                self._snapshots = snapshots  # ✅ 참조 교체 한 번 = 원자적 교체
+                log.debug("리더보드 스냅샷 갱신: %d명 (%.1fms)",
+                          len(snapshots["all"]), (time.perf_counter() - started) * 1000)
+                return snapshots
+            except Exception as e:
+                log.warning("리더보드 스냅샷 갱신 실패: %s", e)
+                return None
+            finally:
+                conn.close()
+
+    def _loop(self):
+        while True:
+            time.sleep(self.refresh_interval)
+            self.refresh()
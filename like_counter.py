@@ -0,0 +1,98 @@
+import logging
+import atexit
+import threading
+from collections import defaultdict
+
+from db_config import get_connection
+from user_stats import bump_likes_received
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 좋아요 수 쓰기 지연(write-behind) 버퍼
+# =========================================
+# 인기 사진은 클릭마다 PHOTOS 같은 행을 UPDATE 하느라 직렬화된다.
+# 이 버퍼는 사진별 증감(delta)을 메모리에 모았다가 주기적으로
+# "likes_count = likes_count + :delta" 한 번으로 반영한다.
+#  - 상대값 갱신이라 여러 프로세스가 동시에 flush 해도 덮어쓰기가 없다
+#  - flush 실패 시 delta 를 다시 합쳐 두므로 유실되지 않는다
+#  - LIKES 행 자체는 요청 안에서 바로 INSERT/DELETE (중복 방지는 유니크 인덱스)
+#  - 사진 주인의 USER_STATS.likes_received 도 같은 트랜잭션에서 같이 반영
+#  - 커밋 후 on_flush(반영한 photo_id 목록) 호출 → 좋아요 수를 담은 캐시를 그때 비운다
+
+
+class LikeCounterBuffer:
+    def __init__(self, flush_interval=2.0, max_pending=500, on_flush=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+        self._deltas = defaultdict(int)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="like-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def add(self, photo_id, delta):
+        if not delta:
+            return
+        with self._lock:
+            self._deltas[photo_id] += delta
+            pending = len(self._deltas)
+        if pending >= self.max_pending:
+            self._wake.set()
+
+    def pending(self, photo_id):
+        """아직 DB 에 반영되지 않은 이 프로세스의 증감"""
+        with self._lock:
+            return self._deltas.get(photo_id, 0)
+
+    def flush(self):
+        """모아 둔 delta 를 한 번의 executemany 로 반영 → 반영한 사진 수"""
+        with self._flush_lock:
+            with self._lock:
+                batch = {pid: d for pid, d in self._deltas.items() if d}
+                self._deltas.clear()
+            if not batch:
+                return 0
+
+            conn = get_connection()
+            try:
+                if not conn:
+                    raise ConnectionError("DB 연결 실패")
+                cur = conn.cursor()
+                cur.executemany("""
+                    UPDATE photos
+                    SET likes_count = NVL(likes_count, 0) + :delta
+                    WHERE photo_id = :photo_id
+                """, [{"photo_id": pid, "delta": d} for pid, d in batch.items()])
+                bump_likes_received(cur, batch)
+                conn.commit()
+            except Exception as e:
+                # ✅ 실패분은 다음 flush 때 다시 시도 (그 사이 쌓인 값과 합산)
+                with self._lock:
+                    for pid, d in batch.items():
+                        self._deltas[pid] += d
+                log.warning("좋아요 수 flush 실패 (%d건 보류): %s", len(batch), e)
+                return 0
+            finally:
+                if conn:
+                    conn.close()
+
+            if self.on_flush:
+                try:
+                    self.on_flush(list(batch))
+                except Exception as e:
+                    log.warning("좋아요 수 flush 후 캐시 무효화 실패: %s", e)
+            return len(batch)
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
@@ -0,0 +1,42 @@
+import os
+import logging
+
+# =========================================
+# 로깅 설정 (print 대신 모듈별 logger 사용)
+# =========================================
+# 환경 변수
+#   LOG_LEVEL   기본 레벨 (기본 INFO)
+#   LOG_LEVELS  모듈별 레벨, 예: "ranking=DEBUG,metrics=WARNING,werkzeug=WARNING"
+#   LOG_FORMAT  로그 형식 (기본: 시각 레벨 [모듈] 메시지)
+#
+# 각 모듈은 log = logging.getLogger(__name__) 후 log.info("... %s", 값) 처럼
+# % 인자로 넘겨서, 레벨이 꺼져 있으면 문자열을 만들지 않는다.
+# 랭킹 계산 추적(ranking.trace)은 레벨이 아니라 ranking.ranking_trace() /
+# RANKING_TRACE_USERS 로 요청·사용자 단위로 켠다.
+
+DEFAULT_FORMAT = "%(asctime)s %(levelname)-7s [%(name)s] %(message)s"
+
+
+def parse_levels(value):
+    """'ranking=DEBUG,geo=WARNING' → {"ranking": 10, "geo": 30}"""
+    levels = {}
+    for item in (value or "").split(","):
+        if "=" not in item:
+            continue
+        name, level = (part.strip() for part in item.split("=", 1))
+        if name and level:
+            levels[name] = logging.getLevelName(level.upper())
+    return {name: lv for name, lv in levels.items() if isinstance(lv, int)}
+
+
+def setup_logging(level=None, levels=None):
+    logging.basicConfig(
+        level=(level or os.environ.get("LOG_LEVEL", "INFO")).upper(),
+        format=os.environ.get("LOG_FORMAT", DEFAULT_FORMAT),
+    )
+    module_levels = parse_levels(os.environ.get("LOG_LEVELS"))
+    module_levels.update(levels or {})
+    # ✅ 추적 로그는 켜진 요청/사용자에서만 호출되므로 레벨로는 막지 않는다
+    module_levels.setdefault("ranking.trace", logging.DEBUG)
+    for name, lv in module_levels.items():
+        logging.getLogger(name).setLevel(lv)
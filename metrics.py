@@ -0,0 +1,199 @@
+import os
+import logging
+import re
+import time
+import threading
+from bisect import bisect_left
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 지연 시간 측정 (라우트별 / SQL 문장별) → Prometheus 텍스트 형식
+# =========================================
+# - 라우트: app.py 의 before_request / after_request 에서 observe_request()
+# - SQL   : db_config.get_connection() 이 돌려주는 연결의 커서를 TimedCursor 로 감싸서
+#           execute/executemany 시간과 처리 행 수를 문장별로 기록
+# - 느린 쿼리 로그: SLOW_QUERY_MS 를 지정하면 그 이상 걸린 문장을 출력 (기본: 끔)
+
+SLOW_QUERY_MS = float(os.environ.get("SLOW_QUERY_MS", 0))
+
+# 초 단위 버킷 (5ms ~ 10s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_SQL_LABEL_LEN = 120
+
+
+class Histogram:
+    """라벨 조합별 누적 히스토그램 (count / sum / 버킷)"""
+
+    def __init__(self, name, help_text, label_names, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series = {}  # labels → [버킷별 개수..., count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if idx < len(self.buckets):
+                series[idx] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, series in items:
+            base = _format_labels(self.label_names, labels)
+            cumulative = 0
+            for bound, n in zip(self.buckets, series):
+                cumulative += n
+                lines.append(f'{self.name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{base},le="+Inf"}} {series[-2]}')
+            lines.append(f"{self.name}_count{{{base}}} {series[-2]}")
+            lines.append(f"{self.name}_sum{{{base}}} {series[-1]:.6f}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{{{_format_labels(self.label_names, labels)}}} {value}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values):
+    return ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+REQUEST_LATENCY = Histogram(
+    "colorwalk_request_duration_seconds", "HTTP 요청 처리 시간", ("endpoint", "method", "status"),
+)
+SQL_LATENCY = Histogram(
+    "colorwalk_sql_duration_seconds", "SQL 문장 실행 시간", ("statement",),
+)
+SQL_ROWS = Counter(
+    "colorwalk_sql_rows_total", "SQL 문장별 조회/변경 행 수", ("statement",),
+)
+SQL_ERRORS = Counter(
+    "colorwalk_sql_errors_total", "SQL 문장별 실행 오류 수", ("statement",),
+)
+
+
+def observe_request(endpoint, method, status, seconds):
+    REQUEST_LATENCY.observe((endpoint or "unknown", method, str(status)), seconds)
+
+
+def sql_label(sql):
+    """공백을 정리하고 앞부분만 남긴 문장 (바인드 변수를 쓰므로 종류가 한정됨)"""
+    label = re.sub(r"\s+", " ", sql).strip()
+    return label if len(label) <= _SQL_LABEL_LEN else label[:_SQL_LABEL_LEN] + "…"
+
+
+class TimedCursor:
+    """DB 커서 래퍼: 실행 시간 / 행 수 기록, 나머지 속성은 원래 커서에 위임"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self._label = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._count_rows(1)
+            yield row
+
+    def _timed(self, method, sql, *args, **kwargs):
+        label = sql_label(sql)
+        started = time.perf_counter()
+        try:
+            result = method(sql, *args, **kwargs)
+        except Exception:
+            SQL_ERRORS.inc((label,))
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            SQL_LATENCY.observe((label,), elapsed)
+            if SLOW_QUERY_MS and elapsed * 1000 >= SLOW_QUERY_MS:
+                log.warning("느린 쿼리 %.1fms: %s", elapsed * 1000, label)
+        self._label = label
+        # DML 은 실행 직후 영향받은 행 수, SELECT 는 fetch 할 때 센다
+        if not self._cursor.description:
+            self._count_rows(self._cursor.rowcount or 0)
+        return result
+
+    def execute(self, sql, *args, **kwargs):
+        return self._timed(self._cursor.execute, sql, *args, **kwargs)
+
+    def executemany(self, sql, *args, **kwargs):
+        return self._timed(self._cursor.executemany, sql, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count_rows(1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._count_rows(len(rows))
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._count_rows(len(rows))
+        return rows
+
+    def _count_rows(self, n):
+        if self._label and n:
+            SQL_ROWS.inc((self._label,), n)
+
+
+class TimedConnection:
+    """연결 래퍼: cursor() 만 TimedCursor 로 감싸고 나머지는 그대로 위임"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._conn.cursor(*args, **kwargs))
+
+
+def render_metrics(extra=None):
+    """Prometheus 텍스트 형식 (extra: {"이름": 값} 게이지 추가)"""
+    lines = []
+    for metric in (REQUEST_LATENCY, SQL_LATENCY, SQL_ROWS, SQL_ERRORS):
+        lines.extend(metric.render())
+    for name, value in (extra or {}).items():
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {value}")
+    return "\n".join(lines) + "\n"
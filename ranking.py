@@ -0,0 +1,553 @@
+import os
+import logging
+import calendar
+import contextvars
+from contextlib import contextmanager
+from math import radians, sin, cos, sqrt, atan2
+from datetime import datetime, date, timedelta, timezone
+
+log = logging.getLogger(__name__)
+trace_log = logging.getLogger(__name__ + ".trace")
+
+# 🔹 5시간(300분) 이내 촬영이면 같은 산책 세션으로 본다
+SESSION_GAP_MIN = 300
+
+DAY_SECONDS = 86400
+_EPOCH_DATE = date(1970, 1, 1)
+
+# 🔹 기간별 랭킹 (오늘 / 이번 주(월요일부터) / 이번 달)
+RANKING_WINDOWS = ("day", "week", "month")
+
+# =========================================
+# 랭킹 계산 추적 (사진 쌍마다 시간 차이 / 거리 출력)
+# =========================================
+# 평소에는 꺼져 있고 루프 밖에서 한 번만 확인하므로 비용이 없다.
+#   - 요청/작업 단위 : with ranking_trace(): ...  (/ranking?trace=1 등)
+#   - 사용자 단위    : RANKING_TRACE_USERS="a@x.com,12"  (이메일 또는 user_id, "*" 는 전체)
+_trace_enabled = contextvars.ContextVar("ranking_trace", default=False)
+TRACE_USERS = {u.strip() for u in os.environ.get("RANKING_TRACE_USERS", "").split(",") if u.strip()}
+
+
+def start_trace(enabled=True):
+    """with 없이 켜기 (요청 훅용) → 반환된 토큰을 reset_trace() 에 넘겨 되돌림"""
+    return _trace_enabled.set(bool(enabled))
+
+
+def reset_trace(token):
+    _trace_enabled.reset(token)
+
+
+@contextmanager
+def ranking_trace(enabled=True):
+    token = start_trace(enabled)
+    try:
+        yield
+    finally:
+        reset_trace(token)
+
+
+def tracing(user=None):
+    """현재 요청(또는 사용자)에 대해 추적 로그를 남길지"""
+    if _trace_enabled.get():
+        return True
+    return bool(TRACE_USERS) and ("*" in TRACE_USERS or str(user) in TRACE_USERS)
+
+
+# ✅ 거리 계산 (하버사인 공식)
+def calc_distance(lat1, lon1, lat2, lon2):
+    R = 6371.0  # km 단위
+    dlat = radians(lat2 - lat1)
+    dlon = radians(lon2 - lon1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlon / 2) ** 2
+    c = 2 * atan2(sqrt(a), sqrt(1 - a))
+    return R * c
+
+
+# ✅ 안전한 시간 파싱 (EXIF or DB 포맷 혼용 대응)
+def safe_parse_time(t):
+    """다양한 datetime 포맷을 처리 (ex: '2025-10-29 19:43:33', '2025-10-29 19:43:33.441000')"""
+    if not t:
+        return None
+    if isinstance(t, datetime):  # SHOT_AT(TIMESTAMP) 에서 읽은 값은 그대로
+        return t
+    for fmt in ("%Y-%m-%d %H:%M:%S.%f", "%Y-%m-%d %H:%M:%S", "%Y:%m:%d %H:%M:%S"):
+        try:
+            return datetime.strptime(t, fmt)
+        except ValueError:
+            continue
+    log.warning("시간 파싱 실패 → %r", t)
+    return None
+
+
+# ✅ 촬영시간 → epoch 초 (세션 집계 테이블 저장용, 숫자면 이미 epoch)
+def to_epoch(t):
+    if isinstance(t, (int, float)):
+        return float(t)
+    dt = safe_parse_time(t) if isinstance(t, str) else t
+    if dt is None:
+        return None
+    return calendar.timegm(dt.timetuple()) + dt.microsecond / 1e6
+
+
+def from_epoch(t):
+    """to_epoch 의 역변환 → naive datetime (SHOT_AT 범위 조건용)"""
+    return datetime(1970, 1, 1) + timedelta(seconds=t)
+
+
+# =========================================
+# 촬영시각 정규화 (SHOT_TIME 문자열 → SHOT_AT TIMESTAMP)
+# =========================================
+# SHOT_AT 은 서비스 시간대(SHOT_TIME_ZONE, 기본 +09:00)의 벽시계 시각으로 저장한다.
+# EXIF OffsetTimeOriginal 이 있고 서비스 시간대와 다르면 서비스 시간대로 환산,
+# 없으면 이미 서비스 시간대라고 본다 (기존 문자열 데이터와 같은 기준 → 세션/일별 버킷 유지).
+
+def parse_utc_offset(value):
+    """'+09:00' / '-0530' → timezone (형식이 다르면 None)"""
+    if not isinstance(value, str):
+        return None
+    value = value.strip().rstrip("\x00")
+    if value in ("Z", "z"):
+        return timezone.utc
+    if len(value) not in (5, 6) or value[0] not in "+-":
+        return None
+    digits = value[1:].replace(":", "")
+    if len(digits) != 4 or not digits.isdigit():
+        return None
+    delta = timedelta(hours=int(digits[:2]), minutes=int(digits[2:]))
+    return timezone(-delta if value[0] == "-" else delta)
+
+
+SHOT_TIME_ZONE = parse_utc_offset(os.environ.get("SHOT_TIME_ZONE", "+09:00")) or timezone(timedelta(hours=9))
+
+
+def normalize_shot_time(value, offset=None):
+    """EXIF / 문자열 / datetime 촬영시각 → 서비스 시간대 naive datetime (실패 시 None)"""
+    if isinstance(value, str):
+        value = value.strip().rstrip("\x00")
+    dt = safe_parse_time(value)
+    if dt is None:
+        return None
+    tz = dt.tzinfo or parse_utc_offset(offset)
+    if tz is not None:
+        dt = dt.replace(tzinfo=tz).astimezone(SHOT_TIME_ZONE).replace(tzinfo=None)
+    return dt
+
+
+def now_shot_time():
+    """촬영시각이 없을 때 쓰는 현재 시각 (서비스 시간대)"""
+    return datetime.now(SHOT_TIME_ZONE).replace(tzinfo=None, microsecond=0)
+
+
+def service_today():
+    """서비스 시간대의 오늘 날짜 (SHOT_AT / day_no 와 같은 기준, 서버 시간대와 무관)"""
+    return datetime.now(SHOT_TIME_ZONE).date()
+
+
+def backfill_shot_at(cur, after_id=0, batch_size=1000):
+    """
+    SHOT_AT 이 비어 있는 사진을 photo_id 순서로 batch_size 개 변환
+    → (읽은 행 수, 마지막 photo_id, 변환 실패 수). 읽은 행 수가 0 이면 완료.
+    해석할 수 없는 문자열은 NULL 로 남기고 건너뛴다 (키셋 진행이라 다시 읽지 않음).
+    """
+    cur.execute("""
+        SELECT photo_id, shot_time
+        FROM photos
+        WHERE photo_id > :after_id
+          AND shot_at IS NULL AND shot_time IS NOT NULL
+        ORDER BY photo_id
+        FETCH FIRST :limit ROWS ONLY
+    """, {"after_id": after_id, "limit": batch_size})
+    rows = cur.fetchall()
+    if not rows:
+        return 0, after_id, 0
+    updates = []
+    for photo_id, shot_time in rows:
+        shot_at = normalize_shot_time(shot_time)
+        if shot_at is not None:
+            updates.append({"shot_at": shot_at, "photo_id": photo_id})
+    if updates:
+        cur.executemany("UPDATE photos SET shot_at = :shot_at WHERE photo_id = :photo_id", updates)
+    return len(rows), rows[-1][0], len(rows) - len(updates)
+
+
+# ✅ 산책 세션 그룹핑 (시간 기준)
+def group_by_time(photo_data, gap_min=SESSION_GAP_MIN, trace=None):
+    """촬영시간 순 (시간, 위도, 경도) 목록 → 세션 목록 (촬영시간을 파싱할 수 없는 사진은 제외)"""
+    if trace is None:
+        trace = tracing()
+    # ✅ 파싱 불가 사진은 위치와 상관없이 버린다 (ranking_batch / 증분 엔진과 같은 규칙)
+    parsed = [(safe_parse_time(p[0]), p) for p in photo_data]
+    parsed = [(t, p) for t, p in parsed if t]
+    if not parsed:
+        return []
+
+    sessions = []
+    current = [parsed[0][1]]
+
+    for i in range(1, len(parsed)):
+        t1, t2 = parsed[i - 1][0], parsed[i][0]
+        diff = (t2 - t1).total_seconds() / 60
+        if trace:
+            trace_log.debug("시간 비교: %s → %s | 차이 %.2f분", photo_data[i - 1][0], photo_data[i][0], diff)
+
+        if diff <= gap_min:
+            current.append(parsed[i][1])
+        else:
+            sessions.append(current)
+            current = [parsed[i][1]]
+
+    sessions.append(current)
+    if trace:
+        trace_log.debug("세션 %d개로 그룹핑 완료", len(sessions))
+    return sessions
+
+
+# ✅ 세션 점수 (사진 1장짜리 세션은 거리 계산 없이 0점)
+def session_score(photo_count, session_dist):
+    if photo_count < 2:
+        return 0
+    return photo_count * 10 + session_dist * 5
+
+
+# ✅ 세션 하나의 이동거리
+def session_distance(session):
+    dist = 0
+    for i in range(1, len(session)):
+        _, lat1, lon1 = session[i - 1]
+        _, lat2, lon2 = session[i]
+        dist += calc_distance(float(lat1), float(lon1), float(lat2), float(lon2))
+    return dist
+
+
+# ✅ 사용자별 세션 점수 계산
+def calc_user_score(email, photo_data):
+    trace = tracing(email)
+    sessions = group_by_time(photo_data, trace=trace)
+    total_score = 0
+    total_dist = 0
+    total_photos = 0
+
+    for session in sessions:
+        session_dist = 0
+        if len(session) < 2:
+            if trace:
+                trace_log.debug("%s 세션에 사진 1장만 있어 거리 계산 생략", email)
+            total_photos += len(session)
+            continue
+
+        for i in range(1, len(session)):
+            _, lat1, lon1 = session[i - 1]
+            _, lat2, lon2 = session[i]
+
+            # ✅ 문자열 → float 변환
+            lat1, lon1, lat2, lon2 = float(lat1), float(lon1), float(lat2), float(lon2)
+            dist = calc_distance(lat1, lon1, lat2, lon2)
+            session_dist += dist
+            if trace:
+                trace_log.debug("거리 계산: (%s,%s) → (%s,%s) = %.3f km", lat1, lon1, lat2, lon2, dist)
+
+        photo_count = len(session)
+        score = session_score(photo_count, session_dist)
+
+        total_score += score
+        total_dist += session_dist
+        total_photos += photo_count
+
+        if trace:
+            trace_log.debug("%s 세션 요약 → 거리: %.3f km, 사진 수: %d", email, session_dist, photo_count)
+
+    if trace:
+        trace_log.debug("%s 총 거리: %.3f km, 총 사진 수: %d, 총 점수: %.1f",
+                        email, total_dist, total_photos, total_score)
+    return total_photos, total_dist, total_score
+
+
+# =========================================
+# 증분 랭킹 엔진 (USER_SESSIONS / USER_SCORES)
+# =========================================
+# 업로드 시 해당 사용자의 세션 집계만 갱신하고,
+# /ranking 은 USER_SCORES 를 읽기만 한다.
+
+def _insert_session(cur, user_id, start, end, last_lat, last_lon, dist, count):
+    cur.execute("""
+        INSERT INTO user_sessions (
+            user_id, start_epoch, end_epoch, last_lat, last_lon,
+            distance_km, photo_count, score
+        ) VALUES (
+            :user_id, :start_epoch, :end_epoch, :last_lat, :last_lon,
+            :distance_km, :photo_count, :score
+        )
+    """, {
+        "user_id": user_id,
+        "start_epoch": start,
+        "end_epoch": end,
+        "last_lat": last_lat,
+        "last_lon": last_lon,
+        "distance_km": dist,
+        "photo_count": count,
+        "score": session_score(count, dist),
+    })
+
+
+def _load_user_points(cur, user_id, lo=None, hi=None, ranked_only=False):
+    """
+    사용자의 (epoch, lat, lon) 목록을 시간순으로 반환 (lo~hi 구간만 선택 가능)
+    ranked_only: 랭킹에 이미 반영된(ranked_at 표시된) 사진만 → 증분 재계산용
+    """
+    params = {"user_id": user_id}
+    window = ""
+    if ranked_only:
+        window += " AND ranked_at IS NOT NULL"
+    if lo is not None:
+        window += " AND shot_at >= :lo"
+        params["lo"] = from_epoch(lo)
+    if hi is not None:
+        window += " AND shot_at <= :hi"
+        params["hi"] = from_epoch(hi)
+    # ✅ 구간 조건과 정렬을 DB 에서 (user_id, shot_at) 인덱스로 처리 → 문자열 파싱 없음
+    cur.execute(f"""
+        SELECT shot_at, gps_latitude, gps_longitude
+        FROM photos
+        WHERE user_id = :user_id
+          AND shot_at IS NOT NULL
+          AND gps_latitude IS NOT NULL AND gps_longitude IS NOT NULL{window}
+        ORDER BY shot_at, photo_id
+    """, params)
+    return [(to_epoch(shot_at), float(lat), float(lon)) for shot_at, lat, lon in cur.fetchall()]
+
+
+def _insert_sessions_from_points(cur, user_id, points, gap_min=SESSION_GAP_MIN):
+    """시간순 포인트를 세션으로 나눠 USER_SESSIONS 에 기록"""
+    if not points:
+        return
+    gap = gap_min * 60
+    start = points[0]
+    prev = points[0]
+    dist = 0
+    count = 1
+    for p in points[1:]:
+        if p[0] - prev[0] <= gap:
+            dist += calc_distance(prev[1], prev[2], p[1], p[2])
+            count += 1
+        else:
+            _insert_session(cur, user_id, start[0], prev[0], prev[1], prev[2], dist, count)
+            start, dist, count = p, 0, 1
+        prev = p
+    _insert_session(cur, user_id, start[0], prev[0], prev[1], prev[2], dist, count)
+
+
+def refresh_user_score(cur, user_id):
+    """세션 합계로 USER_SCORES 한 줄 갱신 (사용자 세션 수만큼만 읽음)"""
+    cur.execute("""
+        SELECT NVL(SUM(photo_count), 0), NVL(SUM(distance_km), 0), NVL(SUM(score), 0)
+        FROM user_sessions
+        WHERE user_id = :user_id
+    """, {"user_id": user_id})
+    photo_count, dist, score = cur.fetchone()
+    params = {
+        "user_id": user_id,
+        "photo_count": photo_count,
+        "distance_km": dist,
+        "score": score,
+    }
+    cur.execute("""
+        UPDATE user_scores
+        SET photo_count = :photo_count, distance_km = :distance_km,
+            score = :score, updated_at = SYSTIMESTAMP
+        WHERE user_id = :user_id
+    """, params)
+    if cur.rowcount == 0:
+        cur.execute("""
+            INSERT INTO user_scores (user_id, photo_count, distance_km, score, updated_at)
+            VALUES (:user_id, :photo_count, :distance_km, :score, SYSTIMESTAMP)
+        """, params)
+
+
+# =========================================
+# 기간별 랭킹용 일별 버킷 (USER_DAILY_SCORES)
+# =========================================
+# 세션 점수는 세션이 시작된 날(촬영 시각 기준 날짜)에 통째로 넣는다.
+# 세션이 바뀔 때 그 시작일 버킷 한 줄만 다시 합산하므로,
+# 주간/월간 랭킹은 기간 안의 버킷(최대 31일 × 사용자)만 더하면 된다 → 전체 기록 양과 무관.
+
+def day_no(value):
+    """epoch 초 또는 date → 1970-01-01 부터의 일 수 (to_epoch 와 같은 기준)"""
+    if isinstance(value, date):
+        return (value - _EPOCH_DATE).days
+    return int(value // DAY_SECONDS)
+
+
+def window_days(window, today=None):
+    """'day' | 'week' | 'month' → (시작 day_no, 끝 day_no), 오늘은 서비스 시간대 기준"""
+    today = today or service_today()
+    if window == "day":
+        start = today
+    elif window == "week":
+        start = today - timedelta(days=today.weekday())
+    elif window == "month":
+        start = today.replace(day=1)
+    else:
+        raise ValueError(f"알 수 없는 랭킹 기간: {window!r}")
+    return day_no(start), day_no(today)
+
+
+def refresh_day_bucket(cur, user_id, day):
+    """그날 시작한 세션들의 합계로 USER_DAILY_SCORES 한 줄 갱신 (세션 없으면 삭제)"""
+    cur.execute("""
+        SELECT COUNT(*), NVL(SUM(photo_count), 0), NVL(SUM(distance_km), 0), NVL(SUM(score), 0)
+        FROM user_sessions
+        WHERE user_id = :user_id
+          AND start_epoch >= :day_start AND start_epoch < :day_end
+    """, {"user_id": user_id, "day_start": day * DAY_SECONDS, "day_end": (day + 1) * DAY_SECONDS})
+    sessions, photo_count, dist, score = cur.fetchone()
+    if not sessions:
+        cur.execute("DELETE FROM user_daily_scores WHERE user_id = :user_id AND day_no = :day_no",
+                    {"user_id": user_id, "day_no": day})
+        return
+    params = {
+        "user_id": user_id,
+        "day_no": day,
+        "photo_count": photo_count,
+        "distance_km": dist,
+        "score": score,
+    }
+    cur.execute("""
+        UPDATE user_daily_scores
+        SET photo_count = :photo_count, distance_km = :distance_km, score = :score
+        WHERE user_id = :user_id AND day_no = :day_no
+    """, params)
+    if cur.rowcount == 0:
+        cur.execute("""
+            INSERT INTO user_daily_scores (user_id, day_no, photo_count, distance_km, score)
+            VALUES (:user_id, :day_no, :photo_count, :distance_km, :score)
+        """, params)
+
+
+def rebuild_day_buckets(cur, user_id=None):
+    """USER_SESSIONS 로 일별 버킷 전체(또는 한 사용자) 재생성"""
+    where = "WHERE user_id = :user_id" if user_id is not None else ""
+    params = {"user_id": user_id} if user_id is not None else {}
+    cur.execute(f"DELETE FROM user_daily_scores {where}", params)
+    cur.execute(f"""
+        INSERT INTO user_daily_scores (user_id, day_no, photo_count, distance_km, score)
+        SELECT user_id, FLOOR(start_epoch / {DAY_SECONDS}),
+               SUM(photo_count), SUM(distance_km), SUM(score)
+        FROM user_sessions
+        {where}
+        GROUP BY user_id, FLOOR(start_epoch / {DAY_SECONDS})
+    """, params)
+
+
+def record_photo(cur, user_id, shot_time, lat, lon, gap_min=SESSION_GAP_MIN):
+    """
+    새 사진 1장을 세션 집계에 반영 (claim_photo 와 같은 트랜잭션에서 호출)
+    - 마지막 세션 뒤에 이어지는 경우: 해당 세션만 O(1) 갱신
+    - 과거 시각(순서가 뒤바뀐 업로드): 영향을 받는 세션 구간만 다시 계산
+      (이미 반영된 사진만 다시 읽음 → 작업이 아직 안 돈 사진은 자기 차례에 더해진다)
+    """
+    t = to_epoch(shot_time)
+    if t is None or lat is None or lon is None:
+        return
+    lat, lon = float(lat), float(lon)
+    gap = gap_min * 60
+
+    # ✅ 새 사진과 gap 이내로 닿는 세션들
+    cur.execute("""
+        SELECT session_id, start_epoch, end_epoch, last_lat, last_lon,
+               distance_km, photo_count
+        FROM user_sessions
+        WHERE user_id = :user_id
+          AND end_epoch >= :lo AND start_epoch <= :hi
+        ORDER BY start_epoch
+    """, {"user_id": user_id, "lo": t - gap, "hi": t + gap})
+    touching = cur.fetchall()
+
+    trace = tracing(user_id)
+    if not touching:
+        # ✅ 독립된 새 세션
+        if trace:
+            trace_log.debug("user=%s 새 세션 시작 (t=%s)", user_id, shot_time)
+        _insert_session(cur, user_id, t, t, lat, lon, 0, 1)
+        days = {day_no(t)}
+    elif len(touching) == 1 and t > touching[0][2]:
+        # ✅ 가장 흔한 경우: 진행 중인 세션 끝에 이어 붙이기
+        #    (끝과 같은 시각이면 아래 구간 재계산 → 같은 시각 사진 순서를 photo_id 로 고정)
+        session_id, _, _, last_lat, last_lon, dist, count = touching[0]
+        dist = float(dist) + calc_distance(float(last_lat), float(last_lon), lat, lon)
+        count = int(count) + 1
+        if trace:
+            trace_log.debug("user=%s 세션 %s 에 이어 붙임 → 거리 %.3f km, 사진 %d장",
+                            user_id, session_id, dist, count)
+        cur.execute("""
+            UPDATE user_sessions
+            SET end_epoch = :end_epoch, last_lat = :last_lat, last_lon = :last_lon,
+                distance_km = :distance_km, photo_count = :photo_count, score = :score
+            WHERE session_id = :session_id
+        """, {
+            "end_epoch": t,
+            "last_lat": lat,
+            "last_lon": lon,
+            "distance_km": dist,
+            "photo_count": count,
+            "score": session_score(count, dist),
+            "session_id": session_id,
+        })
+        days = {day_no(float(touching[0][1]))}
+    else:
+        # ✅ 순서가 뒤바뀐 업로드 → 닿는 세션들만 지우고 그 구간을 재계산
+        lo = min(float(touching[0][1]), t)
+        hi = max(max(float(s[2]) for s in touching), t)
+        if trace:
+            trace_log.debug("user=%s 순서가 바뀐 사진 → 세션 %d개 구간 재계산 (%s~%s)",
+                            user_id, len(touching), lo, hi)
+        for s in touching:
+            cur.execute("DELETE FROM user_sessions WHERE session_id = :session_id",
+                        {"session_id": s[0]})
+        points = _load_user_points(cur, user_id, lo, hi, ranked_only=True)
+        _insert_sessions_from_points(cur, user_id, points, gap_min)
+        # 지운 세션과 새 세션의 시작일은 모두 lo~hi 안에 있다
+        days = range(day_no(lo), day_no(hi) + 1)
+
+    for day in days:
+        refresh_day_bucket(cur, user_id, day)
+    refresh_user_score(cur, user_id)
+
+
+def claim_photo(cur, photo_id):
+    """
+    사진을 '랭킹 반영됨' 으로 표시 → 이번 호출이 처음이면 True
+    record_photo 와 같은 트랜잭션에서 호출한다. 같은 사진의 작업이 다시 실행되거나
+    (복구 / 여러 프로세스) 재생성으로 이미 반영된 사진이면 False → 점수를 두 번 더하지 않음
+    """
+    cur.execute("""
+        UPDATE photos SET ranked_at = SYSTIMESTAMP
+        WHERE photo_id = :photo_id AND ranked_at IS NULL
+    """, {"photo_id": photo_id})
+    return cur.rowcount == 1
+
+
+def rebuild_user_sessions(cur, user_id):
+    """한 사용자의 세션 집계를 처음부터 다시 생성"""
+    cur.execute("""
+        UPDATE photos SET ranked_at = SYSTIMESTAMP
+        WHERE user_id = :user_id AND ranked_at IS NULL
+    """, {"user_id": user_id})
+    cur.execute("DELETE FROM user_sessions WHERE user_id = :user_id", {"user_id": user_id})
+    _insert_sessions_from_points(cur, user_id, _load_user_points(cur, user_id))
+    rebuild_day_buckets(cur, user_id)
+    refresh_user_score(cur, user_id)
+
+
+def rebuild_all_sessions(cur):
+    """전체 사용자 세션 집계 재생성 (최초 도입 / 데이터 보정용)"""
+    cur.execute("UPDATE photos SET ranked_at = SYSTIMESTAMP WHERE ranked_at IS NULL")
+    cur.execute("SELECT DISTINCT user_id FROM photos")
+    user_ids = [r[0] for r in cur.fetchall()]
+    cur.execute("DELETE FROM user_sessions")
+    cur.execute("DELETE FROM user_scores")
+    for user_id in user_ids:
+        _insert_sessions_from_points(cur, user_id, _load_user_points(cur, user_id))
+        refresh_user_score(cur, user_id)
+    rebuild_day_buckets(cur)
+    return len(user_ids)
+
@@ -0,0 +1,146 @@
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ranking import SESSION_GAP_MIN, calc_user_score, to_epoch
+
+R_KM = 6371.0
+
+
+# =========================================
+# 배치(벡터화) 랭킹 점수 계산
+# =========================================
+# calc_user_score 를 사용자마다 파이썬 루프로 돌리는 대신
+# 전체 사용자 사진을 배열 하나로 놓고 NumPy 로 한 번에 계산한다.
+
+def rows_to_arrays(rows):
+    """
+    (email, shot_time, lat, lon) 행 목록 → 배열 묶음
+    - 행 순서는 그대로 유지 (fetch_ranking_rows 의 ORDER BY 와 동일하게 들어온다고 가정)
+    - 촬영시간은 행마다 딱 한 번만 파싱, 파싱 실패한 행은 제외
+    """
+    emails = []
+    email_index = {}
+    epochs, lats, lons, user_idx = [], [], [], []
+    for email, shot_time, lat, lon in rows:
+        t = to_epoch(shot_time)
+        if t is None:
+            continue
+        if email not in email_index:
+            email_index[email] = len(emails)
+            emails.append(email)
+        epochs.append(t)
+        lats.append(float(lat))
+        lons.append(float(lon))
+        user_idx.append(email_index[email])
+    return (
+        emails,
+        np.asarray(epochs, dtype=np.float64),
+        np.asarray(lats, dtype=np.float64),
+        np.asarray(lons, dtype=np.float64),
+        np.asarray(user_idx, dtype=np.int64),
+    )
+
+
+def haversine_np(lat1, lon1, lat2, lon2):
+    """calc_distance 의 배열 버전 (km)"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return R_KM * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+
+def score_batch(epochs, lats, lons, user_idx, n_users, gap_min=SESSION_GAP_MIN):
+    """
+    사용자별 (사진 수, 이동거리, 점수) 배열을 반환
+    - 같은 사용자의 인접한 두 사진이 gap_min 분 이내면 같은 세션
+    - 세션 점수 = 사진 수 * 10 + 거리 * 5 (사진 1장 세션은 0점)
+    """
+    n = len(epochs)
+    if n == 0:
+        zeros = np.zeros(n_users)
+        return zeros.astype(np.int64), zeros, zeros
+
+    # ✅ 세션 경계 찾기
+    same_user = user_idx[1:] == user_idx[:-1]
+    diff_min = (epochs[1:] - epochs[:-1]) / 60
+    cont = same_user & (diff_min <= gap_min)
+
+    # ✅ 인접 사진 간 거리 (세션이 끊기는 쌍은 0)
+    pair_dist = np.where(cont, haversine_np(lats[:-1], lons[:-1], lats[1:], lons[1:]), 0.0)
+
+    # ✅ 세션 번호 부여 후 세션별 집계
+    session_start = np.concatenate(([True], ~cont))
+    session_id = np.cumsum(session_start) - 1
+    n_sessions = int(session_id[-1]) + 1
+    session_count = np.bincount(session_id, minlength=n_sessions)
+    session_dist = np.bincount(session_id[1:], weights=pair_dist, minlength=n_sessions)
+    session_score = np.where(session_count >= 2, session_count * 10 + session_dist * 5, 0.0)
+
+    # ✅ 사용자별 합계
+    session_user = user_idx[session_start]
+    photos = np.bincount(session_user, weights=session_count, minlength=n_users).astype(np.int64)
+    dist = np.bincount(session_user, weights=session_dist, minlength=n_users)
+    score = np.bincount(session_user, weights=session_score, minlength=n_users)
+    return photos, dist, score
+
+
+def calculate_ranking_batch(rows, gap_min=SESSION_GAP_MIN):
+    """calculate_ranking_scalar 와 같은 형식 [(email, 사진 수, 거리, 점수)] 을 배치 계산으로 반환"""
+    emails, epochs, lats, lons, user_idx = rows_to_arrays(rows)
+    photos, dist, score = score_batch(epochs, lats, lons, user_idx, len(emails), gap_min)
+    results = [
+        (email, int(photos[i]), round(float(dist[i]), 2), round(float(score[i]), 1))
+        for i, email in enumerate(emails)
+    ]
+    results.sort(key=lambda x: x[3], reverse=True)
+    return results
+
+
+# =========================================
+# 스칼라 경로와의 동등성 검증
+# =========================================
+def calculate_ranking_scalar(rows):
+    """기존 calc_user_score 루프 (비교 기준)"""
+    users = {}
+    for email, shot_time, lat, lon in rows:
+        users.setdefault(email, []).append((shot_time, lat, lon))
+
+    results = []
+    for email, photo_data in users.items():
+        total_photos, total_dist, total_score = calc_user_score(email, photo_data)
+        if total_photos == 0:
+            continue  # 촬영시간을 하나도 파싱할 수 없는 사용자 (배치 경로도 제외)
+        results.append((email, total_photos, round(total_dist, 2), round(total_score, 1)))
+    results.sort(key=lambda x: x[3], reverse=True)
+    return results
+
+
+def compare_rankings(rows, gap_min=SESSION_GAP_MIN):
+    """두 경로 결과를 사용자별로 비교해 불일치 목록을 반환 (비어 있으면 동일)"""
+    scalar = {r[0]: r[1:] for r in calculate_ranking_scalar(rows)}
+    batch = {r[0]: r[1:] for r in calculate_ranking_batch(rows, gap_min)}
+    mismatches = []
+    for email in sorted(set(scalar) | set(batch)):
+        s, b = scalar.get(email), batch.get(email)
+        if s is None or b is None or s[0] != b[0] \
+                or not np.isclose(s[1], b[1], atol=0.011) or not np.isclose(s[2], b[2], atol=0.11):
+            mismatches.append((email, s, b))
+    return mismatches
+
+
+def synthetic_rows(n_users=50, n_photos=5000, seed=0):
+    """검증용 임의 데이터 (fetch_ranking_rows 와 같은 이메일/촬영시간 정렬)"""
+    rng = random.Random(seed)
+    base = datetime(2025, 10, 1)
+    rows = []
+    for _ in range(n_photos):
+        email = f"user{rng.randrange(n_users)}@colorwalk.test"
+        shot = base + timedelta(minutes=rng.randrange(60 * 24 * 60))
+        fmt = rng.choice(("%Y-%m-%d %H:%M:%S", "%Y:%m:%d %H:%M:%S"))
+        rows.append((email, shot, shot.strftime(fmt),
+                     round(rng.uniform(34.2, 37.9), 6), round(rng.uniform(126.5, 129.5), 6)))
+    rows.sort(key=lambda r: (r[0], r[1]))
+    return [(email, shot_time, lat, lon) for email, _, shot_time, lat, lon in rows]
@@ -78,20 +78,32 @@ document.addEventListener("DOMContentLoaded", () => {
   const commentList = document.getElementById("commentList");
   const commentInput = document.getElementById("commentInput");
   const commentSubmit = document.getElementById("commentSubmit");
+  const loadOlderBtn = document.getElementById("loadOlderComments");
 
-  // ✅ 댓글 목록 렌더링 함수
+  // ✅ 댓글 한 줄 만들기
+  const createCommentEl = (c) => {
+    const p = document.createElement("p");
+    p.textContent = `💬 ${c.username}: ${c.content}`;
+    return p;
+  };
+
+  // ✅ 댓글 목록 렌더링 함수 (최신 1페이지)
   const renderComments = (comments) => {
     commentList.innerHTML = "";
-    comments.forEach((c) => {
-      const p = document.createElement("p");
-      p.textContent = `💬 ${c.username}: ${c.content}`;
-      commentList.appendChild(p);
-    });
+    comments.forEach((c) => commentList.appendChild(createCommentEl(c)));
   };
 
-  // ✅ 각 사진 카드 클릭 시 상세보기
-  document.querySelectorAll(".photo-card").forEach((card) => {
-    card.addEventListener("click", async () => {
+  // ✅ "이전 댓글 더보기" 커서 (없으면 버튼 숨김)
+  const setOlderCursor = (cursor) => {
+    loadOlderBtn.dataset.cursor = cursor || "";
+    loadOlderBtn.style.display = cursor ? "block" : "none";
+  };
+
+  // ✅ 각 사진 카드 클릭 시 상세보기 (무한 스크롤로 추가된 카드도 처리하도록 위임)
+  const gallerySection = document.querySelector(".photo-gallery");
+  gallerySection.addEventListener("click", async (e) => {
+      const card = e.target.closest(".photo-card");
+      if (!card) return;
       const photoId = card.getAttribute("data-photo-id");
       modal.style.display = "flex";
 
@@ -99,12 +111,18 @@ document.addEventListener("DOMContentLoaded", () => {
         const res = await fetch(`/photo/${photoId}`);
         const data = await res.json();
 
-        // 모달 채우기
-if (data.image_path.startsWith("static/")) {
-  modalImg.src = `/${data.image_path}`;
-} else {
-  modalImg.src = `/static/${data.image_path}`;
-}
+        // 모달 채우기 (미리보기 먼저 → 원본 로드되면 교체)
+const originalSrc = data.image_path.startsWith("static/")
+  ? `/${data.image_path}`
+  : `/static/${data.image_path}`;
+modalImg.src = data.preview_url || originalSrc;
+modalImg.dataset.original = originalSrc;
+const original = new Image();
+original.onload = () => {
+  // 그 사이 다른 사진을 열었다면 교체하지 않음
+  if (modalImg.dataset.original === originalSrc) modalImg.src = originalSrc;
+};
+original.src = originalSrc;
 
 modalDesc.textContent = data.description || "설명 없음";
 modalLoc.textContent = `📍 ${data.location || "위치 미등록"}`;
@@ -114,6 +132,21 @@ likeCount.textContent = data.likes_count;
 likeBtn.textContent = data.liked ? "❤️ 취소" : "🤍 좋아요";
 
         renderComments(data.comments);
+        setOlderCursor(data.comments_cursor);
+
+        // 이전 댓글 불러오기 → 목록 앞에 추가
+        loadOlderBtn.onclick = async () => {
+          const cursor = loadOlderBtn.dataset.cursor;
+          if (!cursor) return;
+          const res = await fetch(
+            `/api/photos/${photoId}/comments?before=${encodeURIComponent(cursor)}`
+          );
+          const page = await res.json();
+          const fragment = document.createDocumentFragment();
+          page.comments.forEach((c) => fragment.appendChild(createCommentEl(c)));
+          commentList.prepend(fragment);
+          setOlderCursor(page.next_cursor);
+        };
 
         // 좋아요 버튼 동작
         likeBtn.onclick = async () => {
@@ -133,13 +166,17 @@ likeBtn.textContent = data.liked ? "❤️ 취소" : "🤍 좋아요";
             body: JSON.stringify({ content }),
           });
           const result = await res.json();
-          renderComments(result.comments);
+          if (!res.ok) {
+            alert(result.error || "댓글 등록 실패");
+            return;
+          }
+          // 새 댓글만 받아서 목록 끝에 추가
+          commentList.appendChild(createCommentEl(result.comment));
           commentInput.value = "";
         };
       } catch (err) {
         console.error("❌ 사진 상세 로딩 실패:", err);
       }
-    });
   });
 
   // ✅ 모달 닫기 버튼
@@ -153,3 +190,77 @@ likeBtn.textContent = data.liked ? "❤️ 취소" : "🤍 좋아요";
       modal.style.display = "none";
     }
   });
+
+  // ===================================================
+  // ♾️ 무한 스크롤 (/api/gallery 키셋 페이지네이션)
+  // ===================================================
+  const sentinel = document.getElementById("gallery-sentinel");
+  const labelHex = {
+    red: "#FF4B5C", orange: "#FF8C42", yellow: "#FFD93D",
+    green: "#4CAF50", blue: "#4A90E2", purple: "#A66DD4",
+    brown: "#8B5E3C", black: "#222", white: "#FFFFFF",
+  };
+  let nextCursor = sentinel.dataset.nextCursor;
+  let loadingPage = false;
+
+  // ✅ 서버 템플릿과 같은 구조의 카드 생성
+  const createPhotoCard = (p) => {
+    const card = document.createElement("div");
+    card.className = "photo-card fade-in";
+    card.dataset.photoId = p.photo_id;
+    card.dataset.color = p.color_key || "unknown";
+
+    const image = document.createElement("div");
+    image.className = "photo-image";
+    image.style.backgroundImage = `url('${p.image_url}')`;
+
+    const info = document.createElement("div");
+    info.className = "photo-info";
+    info.innerHTML = `
+      <div class="photo-meta">
+        <span class="color-label"></span>
+        <p class="color-name"></p>
+      </div>
+      <p class="description"></p>
+      <p class="location"></p>`;
+    info.querySelector(".color-label").style.background = labelHex[p.color_key] || "";
+    info.querySelector(".color-name").textContent = p.color_name;
+    info.querySelector(".description").textContent = p.username;
+    info.querySelector(".location").textContent = p.location || "";
+
+    card.appendChild(image);
+    card.appendChild(info);
+    return card;
+  };
+
+  const loadNextPage = async () => {
+    if (loadingPage || !nextCursor) return;
+    loadingPage = true;
+    try {
+      const params = new URLSearchParams({ cursor: nextCursor });
+      if (sentinel.dataset.colorKey !== "all") {
+        params.set("color_key", sentinel.dataset.colorKey);
+      }
+      const res = await fetch(`/api/gallery?${params}`);
+      const data = await res.json();
+      data.photos.forEach((p) => {
+        gallerySection.insertBefore(createPhotoCard(p), modal);
+      });
+      nextCursor = data.next_cursor;
+      // 센티넬이 아직 화면 안이면 다시 관찰해서 다음 페이지를 이어서 요청
+      observer.unobserve(sentinel);
+      if (nextCursor) observer.observe(sentinel);
+    } catch (err) {
+      console.error("❌ 다음 페이지 로딩 실패:", err);
+    } finally {
+      loadingPage = false;
+    }
+  };
+
+  const observer = new IntersectionObserver(
+    (entries) => {
+      if (entries.some((entry) => entry.isIntersecting)) loadNextPage();
+    },
+    { rootMargin: "400px" }
+  );
+  if (nextCursor) observer.observe(sentinel);
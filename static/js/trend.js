@@ -1,5 +1,4 @@
-const photos = window.photosData || [];
-const myPhotos = window.myPhotosData || [];
+const isLoggedIn = window.isLoggedIn || false;
 
 // 색상 매핑
 const colorKeyMap = {
@@ -32,6 +31,21 @@ function getMarkerIcon(colorKey) {
   });
 }
 
+// 🔵 클러스터 아이콘 (대표 색상 원 + 사진 수)
+function getClusterIcon(colorKey, count) {
+  const fill = colorHex[colorKey] || "#888888";
+  const text = colorKey === "white" || colorKey === "yellow" ? "#333" : "#FFF";
+  const size = count < 10 ? 32 : count < 100 ? 40 : count < 1000 ? 48 : 56;
+  return L.divIcon({
+    className: "cluster-icon",
+    html: `<div style="width:${size}px;height:${size}px;line-height:${size}px;
+             border-radius:50%;background:${fill};color:${text};text-align:center;
+             font-weight:700;border:2px solid #fff;box-shadow:0 2px 6px rgba(0,0,0,.3)">${count}</div>`,
+    iconSize: [size, size],
+    iconAnchor: [size / 2, size / 2],
+  });
+}
+
 // 지도 초기화 (DOMContentLoaded 이후 실행해야 함)
 document.addEventListener("DOMContentLoaded", () => {
   const map = L.map("map", { zoomControl: true }).setView([36.3, 127.8], 7);
@@ -40,21 +54,19 @@ document.addEventListener("DOMContentLoaded", () => {
     attribution: "&copy; OpenStreetMap contributors",
   }).addTo(map);
 
-  let markers = [];
-
-  function showMarkers(data) {
-    markers.forEach(m => map.removeLayer(m));
-    markers = [];
+  const layer = L.layerGroup().addTo(map);
+  let mineOnly = false;
+  let requestSeq = 0;
 
-    data.forEach(p => {
-      const lat = p.lat ?? 37.5665;
-      const lon = p.lon ?? 126.9780;
-      const colorKey = colorKeyMap[p.color_id] || "gray";
+  // 📸 개별 사진 마커 + 팝업 (points 모드와 1장짜리 클러스터 공통)
+  function addPhotoMarker(p) {
+    const colorKey = colorKeyMap[p.color_id] || "gray";
 
-      const marker = L.marker([lat, lon], {
-        icon: getMarkerIcon(colorKey)
-      }).addTo(map);
+    const marker = L.marker([p.lat, p.lon], {
+      icon: getMarkerIcon(colorKey)
+    });
 
+    if (p.image_path) {
       marker.bindPopup(`
         <div style="text-align:center">
           <img src="${p.image_path}" width="120" style="border-radius:8px; margin-bottom:6px"><br>
@@ -62,15 +74,57 @@ document.addEventListener("DOMContentLoaded", () => {
           <small>📸 ${p.username || '익명 사용자'}</small>
         </div>
       `);
+    }
+
+    layer.addLayer(marker);
+  }
 
-      markers.push(marker);
+  function showPoints(points) {
+    points.forEach(addPhotoMarker);
+  }
+
+  function showClusters(clusters) {
+    clusters.forEach(c => {
+      const colorKey = colorKeyMap[c.color_id] || "gray";
+      if (c.count === 1) {
+        addPhotoMarker(c);
+        return;
+      }
+      const marker = L.marker([c.lat, c.lon], { icon: getClusterIcon(colorKey, c.count) });
+      // 클러스터 클릭 → 해당 위치로 확대
+      marker.on("click", () => map.setView([c.lat, c.lon], Math.min(map.getZoom() + 2, 18)));
+      layer.addLayer(marker);
     });
+  }
 
-    map.setView([36.3, 127.8], 8);
+  // ✅ 현재 화면 범위만 서버에 요청
+  async function refresh() {
+    const seq = ++requestSeq;
+    const b = map.getBounds();
+    const params = new URLSearchParams({
+      bbox: [b.getWest(), b.getSouth(), b.getEast(), b.getNorth()].map(v => v.toFixed(6)).join(","),
+      zoom: map.getZoom(),
+    });
+    if (mineOnly) params.set("mine", "1");
+
+    try {
+      const res = await fetch(`/api/trend/clusters?${params}`);
+      const data = await res.json();
+      if (seq !== requestSeq) return; // 더 최근 요청이 있으면 무시
+
+      layer.clearLayers();
+      if (data.mode === "points") showPoints(data.points);
+      else showClusters(data.clusters);
+      return data;
+    } catch (err) {
+      console.error("❌ 지도 데이터 로딩 실패:", err);
+    }
   }
 
+  map.on("moveend", refresh);
+
   // 전체 사진 기본 표시
-  showMarkers(photos);
+  refresh();
 
   // 버튼 이벤트
   const btnAll = document.getElementById("showAll");
@@ -79,21 +133,25 @@ document.addEventListener("DOMContentLoaded", () => {
   btnAll.addEventListener("click", () => {
     btnAll.classList.add("active");
     btnMine.classList.remove("active");
-    showMarkers(photos);
+    mineOnly = false;
+    refresh();
   });
 
-  btnMine.addEventListener("click", () => {
+  btnMine.addEventListener("click", async () => {
+    if (!isLoggedIn) {
+      alert("⚠️ 내 사진이 없습니다. (로그인하지 않았거나 업로드 기록이 없습니다.)");
+      return;
+    }
     btnMine.classList.add("active");
     btnAll.classList.remove("active");
+    mineOnly = true;
 
-    if (myPhotos.length > 0) {
-      showMarkers(myPhotos);
-    } else {
-      markers.forEach(m => map.removeLayer(m));
-      alert("⚠️ 내 사진이 없습니다. (로그인하지 않았거나 업로드 기록이 없습니다.)");
+    const data = await refresh();
+    if (data && data.points.length === 0 && data.clusters.length === 0) {
+      alert("⚠️ 현재 지도 범위에 내 사진이 없습니다.");
     }
   });
 
   // 지도 리사이즈 버그 방지 (로드 후 재계산)
   setTimeout(() => map.invalidateSize(), 300);
-});
\ No newline at end of file
+});
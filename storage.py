@@ -0,0 +1,115 @@
+import os
+import logging
+import re
+import hashlib
+import tempfile
+
+from PIL import Image
+from werkzeug.utils import secure_filename
+
+from exif_utils import read_exif
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 콘텐츠 주소 기반 업로드 저장소 (중복 제거)
+# =========================================
+# 업로드 본문을 임시 파일로 쓰면서 동시에 SHA-256 을 계산하고,
+# static/uploads/<h[:2]>/<h[2:4]>/<hash>.<ext> 에 저장한다.
+# 같은 내용은 한 번만 저장되며 UPLOAD_BLOBS 에 해시별로 한 행만 기록한다.
+# (사진 삭제 기능이 없으므로 참조 수는 두지 않는다 → 파일은 지우지 않음)
+
+CHUNK_SIZE = 64 * 1024
+TMP_DIR = ".tmp"
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+_FORMAT_EXT = {
+    "JPEG": "jpg", "MPO": "jpg", "PNG": "png", "WEBP": "webp",
+    "GIF": "gif", "BMP": "bmp", "TIFF": "tif", "HEIF": "heic",
+}
+
+
+def _blob_relpath(content_hash, ext):
+    return os.path.join(content_hash[:2], content_hash[2:4], f"{content_hash}.{ext}")
+
+
+def store_upload(stream, upload_folder, filename=""):
+    """
+    업로드 스트림을 저장하고 EXIF 까지 한 번에 읽는다.
+    반환: {"content_hash", "db_path", "save_path", "byte_size", "is_new", "exif"}
+      - db_path : PHOTOS.IMAGE_PATH 에 저장할 경로 ('uploads/ab/cd/<hash>.jpg')
+      - is_new  : 디스크에 처음 쓰인 내용이면 True (중복이면 임시 파일만 삭제)
+    """
+    tmp_dir = os.path.join(upload_folder, TMP_DIR)
+    os.makedirs(tmp_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+
+    sha = hashlib.sha256()
+    byte_size = 0
+    ext = None
+    exif = {"shot_time": None, "shot_offset": None, "lat": None, "lon": None}
+    try:
+        with os.fdopen(fd, "w+b") as tmp:
+            # ✅ 쓰는 동안 해시 계산 (파일을 다시 읽지 않음)
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                sha.update(chunk)
+                tmp.write(chunk)
+                byte_size += len(chunk)
+
+            # ✅ 같은 버퍼에서 바로 EXIF 파싱 (헤더만 읽음)
+            tmp.seek(0)
+            try:
+                with Image.open(tmp) as img:
+                    ext = _FORMAT_EXT.get(img.format)
+                    exif = read_exif(img)
+            except Exception as e:
+                log.warning("EXIF 파싱 실패: %s", e)
+
+        if not ext:
+            ext = os.path.splitext(secure_filename(filename or ""))[1].lstrip(".").lower() or "jpg"
+
+        content_hash = sha.hexdigest()
+        relpath = _blob_relpath(content_hash, ext)
+        save_path = os.path.join(upload_folder, relpath)
+        is_new = not os.path.exists(save_path)
+        if is_new:
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            os.replace(tmp_path, save_path)  # 같은 파일시스템 → 원자적 이동
+        else:
+            os.remove(tmp_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+    return {
+        "content_hash": content_hash,
+        "db_path": "uploads/" + relpath.replace(os.sep, "/"),
+        "save_path": save_path,
+        "byte_size": byte_size,
+        "is_new": is_new,
+        "exif": exif,
+    }
+
+
+def register_blob(cur, content_hash, image_path, byte_size):
+    """UPLOAD_BLOBS 에 처음 보는 내용만 기록 → 새로 기록했으면 True"""
+    # 가져오기 워커(import_worker)도 이 모듈을 쓰므로 db_config(풀 생성)는 여기서만 import
+    from db_config import IntegrityError
+    try:
+        cur.execute("""
+            INSERT INTO upload_blobs (content_hash, image_path, byte_size, created_at)
+            VALUES (:content_hash, :image_path, :byte_size, SYSTIMESTAMP)
+        """, {"content_hash": content_hash, "image_path": image_path, "byte_size": byte_size})
+        return True
+    except IntegrityError:
+        # 이미 있는 내용 (중복 업로드 또는 동시에 같은 내용이 올라온 경우)
+        return False
+
+
+def content_hash_of(image_path):
+    """IMAGE_PATH 에서 콘텐츠 해시 추출 (이전 방식 경로면 None)"""
+    stem = os.path.splitext(os.path.basename(image_path or ""))[0]
+    return stem if _HASH_RE.match(stem) else None
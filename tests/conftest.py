@@ -0,0 +1,126 @@
+"""
+테스트 공통 준비
+
+Oracle 대신 bench/fake_oracledb.py (SQLite 대역) 를 oracledb 로 등록한다.
+db_config 가 import 시점에 풀을 만들기 때문에 다른 모듈보다 먼저, 세션당 한 번만 설치한다.
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(TESTS_DIR)
+BENCH_DIR = os.path.join(REPO_DIR, "bench")
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+import fake_oracledb  # noqa: E402
+
+WORK_DIR = tempfile.mkdtemp(prefix="colorwalk-test-")
+fake_oracledb.install(os.path.join(WORK_DIR, "test.db"))
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+# 2026-10-19 00:22 KST = 2026-10-18 15:22 UTC (서버 시간대 기준으로는 아직 전날)
+NOW_UTC = datetime(2026, 10, 18, 15, 22, tzinfo=timezone.utc)
+
+
+class _FrozenDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW_UTC.astimezone(tz) if tz else NOW_UTC.astimezone().replace(tzinfo=None)
+
+
+@pytest.fixture
+def utc_server(monkeypatch):
+    """서버 시간대는 UTC, 현재 시각은 NOW_UTC 로 고정 (ranking.service_today 기준)"""
+    if not hasattr(time, "tzset"):
+        pytest.skip("TZ 변경 불가 플랫폼")
+    import ranking
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    monkeypatch.setattr(ranking, "datetime", _FrozenDatetime)
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+@pytest.fixture(scope="session")
+def db():
+    """init_db 로 앱 테이블까지 만든 뒤 연결 하나를 빌려준다"""
+    from db_config import get_connection, init_db
+    init_db()
+    conn = get_connection()
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope="session")
+def app_module(db):
+    """app 모듈 (static / uploads 는 임시 폴더 복사본 → 저장소를 건드리지 않음)"""
+    cwd = os.getcwd()
+    os.chdir(WORK_DIR)
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    static_dir = os.path.join(WORK_DIR, "static")
+    for sub in ("css", "js"):
+        if not os.path.isdir(os.path.join(static_dir, sub)):
+            shutil.copytree(os.path.join(REPO_DIR, "static", sub), os.path.join(static_dir, sub))
+    app.app.static_folder = static_dir
+    app.app.config["UPLOAD_FOLDER"] = os.path.join(static_dir, "uploads")
+    app.app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def new_user(db):
+    """new_user("이름") → user_id"""
+    def make(name="tester"):
+        cur = db.cursor()
+        cur.execute("SELECT NVL(MAX(user_id), 0) + 1 FROM users")
+        user_id = cur.fetchone()[0]
+        cur.execute("""
+            INSERT INTO users (user_id, name, email, password)
+            VALUES (:user_id, :name, :email, 'x')
+        """, {"user_id": user_id, "name": name, "email": f"{name}{user_id}@test.local"})
+        db.commit()
+        return user_id
+    return make
+
+
+@pytest.fixture
+def new_photo(db):
+    """new_photo(user_id, **컬럼) → photo_id (파일은 만들지 않음)"""
+    def make(user_id, **columns):
+        row = {"user_id": user_id, "color_id": 1, "description": "test",
+               "image_path": "static/uploads/test.jpg", "likes_count": 0, **columns}
+        cur = db.cursor()
+        photo_id = cur.var(int)
+        cur.execute(f"""
+            INSERT INTO photos ({", ".join(row)}, created_at)
+            VALUES ({", ".join(":" + k for k in row)}, SYSTIMESTAMP)
+            RETURNING photo_id INTO :photo_id
+        """, {**row, "photo_id": photo_id})
+        db.commit()
+        return photo_id.getvalue()[0]
+    return make
+
+
+@pytest.fixture
+def login(app_module):
+    """login(user_id) → 로그인된 test client"""
+    def make(user_id):
+        client = app_module.app.test_client()
+        with client.session_transaction() as s:
+            s["user_id"] = user_id
+            s["user_name"] = f"user{user_id}"
+            s["user_email"] = f"user{user_id}@test.local"
+        return client
+    return make
@@ -0,0 +1,84 @@
+import json
+
+import daily_color
+from daily_color import COLORS, DailyColorService, LEGACY_SESSION_KEY, SESSION_KEY, seeded_color
+
+DAY = "2026-10-19"
+
+
+def test_seeded_pick_is_stable():
+    service = DailyColorService()
+    for seed in (1, 2, 42, "*"):
+        assert seeded_color(seed, DAY) == seeded_color(seed, DAY)
+    session = {}
+    assert service.current(session, 42, DAY) == seeded_color(42, DAY)
+    assert session == {}  # 기본 색상은 세션에 쓰지 않는다
+    # 날짜 / 사용자가 바뀌면 다른 시드 → 9색 전부가 한 번은 나온다
+    picks = {seeded_color(uid, f"2026-10-{d:02d}")["key"] for uid in range(5) for d in range(1, 31)}
+    assert picks == {c["key"] for c in COLORS}
+
+
+def test_current_uses_shot_time_zone_day(utc_server):
+    # 서버(UTC)는 아직 18일이지만 서비스 시간대로는 19일 → 어제 다시 뽑은 값은 무시
+    service = DailyColorService()
+    session = {SESSION_KEY: {"date": "2026-10-18", "key": "red", "roll": 1}}
+    assert service.current(session, 7) == seeded_color(7, DAY)
+
+
+def test_reroll_never_returns_current_color():
+    service = DailyColorService()
+    for user_id in (None, 3, 8):
+        session = {}
+        current = service.current(session, user_id, DAY)
+        for roll in range(1, 30):
+            color = service.reroll(session, user_id, DAY)
+            assert color["key"] != current["key"]
+            assert session[SESSION_KEY] == {"date": DAY, "key": color["key"], "roll": roll}
+            current = service.current(session, user_id, DAY)
+            assert current == color
+
+
+def test_legacy_session_entry_is_dropped():
+    service = DailyColorService()
+    session = {LEGACY_SESSION_KEY: {"2026-10-01": "red", "2026-10-02": "blue"}}
+    service.current(session, 1, DAY)
+    assert LEGACY_SESSION_KEY not in session
+
+
+def test_restore_ignores_stale_or_broken_values():
+    service = DailyColorService()
+    saved = json.dumps({"key": "green"})
+    session = {}
+    service.restore(session, saved, "2026-10-18", day=DAY)
+    assert session == {}
+    service.restore(session, "not json", DAY, day=DAY)
+    assert session == {}
+    service.restore(session, json.dumps({"key": "nope"}), DAY, day=DAY)
+    assert session == {}
+    service.restore(session, saved, DAY, day=DAY)
+    assert session[SESSION_KEY] == {"date": DAY, "key": "green", "roll": 1}
+
+
+def test_flush_requeues_batch_after_failed_write(db, new_user, monkeypatch):
+    user_id = new_user("color")
+    other_id = new_user("color2")
+    service = DailyColorService()
+    service.record(user_id, "red", DAY)
+    service.record(other_id, "blue", DAY)
+
+    def failing_connection():
+        # 저장 도중 같은 사용자가 다시 뽑음 → 실패분을 되돌릴 때 새 값이 우선
+        service.record(user_id, "purple", DAY)
+        return None
+
+    monkeypatch.setattr(daily_color, "get_connection", failing_connection)
+    assert service.flush() == 0
+    assert service._pending == {user_id: ("purple", DAY), other_id: ("blue", DAY)}
+
+    monkeypatch.undo()
+    assert service.flush() == 2
+    assert service._pending == {}
+    cur = db.cursor()
+    cur.execute("SELECT today_color, today_date FROM users WHERE user_id = :u", {"u": user_id})
+    saved, day = cur.fetchone()
+    assert json.loads(saved)["key"] == "purple" and day == DAY
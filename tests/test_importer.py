@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from PIL import Image
+
+from images import derivative_path
+from importer import import_photos
+
+COLORS = [(200, 30, 40), (30, 160, 60), (40, 80, 200)]
+
+
+@pytest.fixture
+def archive(tmp_path):
+    """색이 다른 JPEG 3장 (하위 폴더 포함)"""
+    folder = tmp_path / "archive"
+    (folder / "day2").mkdir(parents=True)
+    for i, rgb in enumerate(COLORS):
+        sub = folder / "day2" if i == 2 else folder
+        Image.new("RGB", (64, 48), rgb).save(sub / f"walk{i}.jpg", quality=90)
+    return str(folder)
+
+
+def _unranked(db, user_id):
+    cur = db.cursor()
+    cur.execute("SELECT COUNT(*) FROM photos WHERE user_id = :u AND ranked_at IS NULL", {"u": user_id})
+    return cur.fetchone()[0]
+
+
+def test_rerun_after_interrupted_import_rebuilds_ranking(app_module, db, new_user, archive):
+    user_id = new_user("importer")
+    upload_folder = app_module.app.config["UPLOAD_FOLDER"]
+
+    # 배치는 커밋됐지만 CLI 가 랭킹 재생성 전에 죽은 상태
+    stats = import_photos(db, user_id, archive, upload_folder, workers=1, batch_size=2)
+    assert stats["imported"] == 3
+    assert _unranked(db, user_id) == 3
+
+    runner = app_module.app.test_cli_runner()
+    result = runner.invoke(args=["import-photos", archive, "--user", str(user_id), "--workers", "1"])
+    assert result.exit_code == 0, result.output
+    assert "추가 0장, 건너뜀 3장" in result.output
+    assert _unranked(db, user_id) == 0
+
+
+def test_worker_module_does_not_open_db_pool():
+    # spawn 방식 워커는 prepare_file 의 모듈을 새 프로세스에서 import 한다 → 풀을 열면 안 됨
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, import_worker; sys.exit('db_config' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", code], cwd=repo).returncode == 0
+
+
+def test_rerun_skips_imported_files_before_processing(app_module, db, new_user, archive):
+    user_id = new_user("resume")
+    static_dir = app_module.app.static_folder
+    upload_folder = app_module.app.config["UPLOAD_FOLDER"]
+    assert import_photos(db, user_id, archive, upload_folder, workers=1)["imported"] == 3
+
+    cur = db.cursor()
+    cur.execute("SELECT image_path FROM photos WHERE user_id = :u", {"u": user_id})
+    thumbs = [os.path.join(static_dir, derivative_path(r[0], "thumb")) for r in cur.fetchall()]
+    for path in thumbs:
+        os.remove(path)
+
+    # 해시만 보고 건너뛰므로 파생본을 다시 만들지 않는다
+    stats = import_photos(db, user_id, archive, upload_folder, workers=1)
+    assert (stats["imported"], stats["skipped"], stats["failed"]) == (0, 3, [])
+    assert not any(os.path.exists(path) for path in thumbs)
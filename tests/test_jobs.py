@@ -0,0 +1,72 @@
+import threading
+from datetime import datetime
+
+from jobs import JobQueue
+from ranking import to_epoch
+
+
+def test_worker_survives_errors_in_failure_handling(db, monkeypatch):
+    jobs = JobQueue(workers=1, max_attempts=1)
+    done = threading.Event()
+
+    @jobs.handler("boom")
+    def boom(cur, payload):
+        raise RuntimeError("handler 실패")
+
+    @jobs.handler("ok")
+    def ok(cur, payload):
+        done.set()
+
+    real_set_status = jobs._set_status
+
+    def flaky_set_status(cur, job_id, status, error=None, attempt=False):
+        if status == "failed":
+            raise ConnectionError("연결 끊김")  # 실패 기록 자체가 실패
+        return real_set_status(cur, job_id, status, error, attempt)
+
+    monkeypatch.setattr(jobs, "_set_status", flaky_set_status)
+    monkeypatch.setattr(jobs, "recover", lambda: 0)
+    cur = db.cursor()
+    first = jobs.create_job(cur, 1, "boom")
+    second = jobs.create_job(cur, 1, "ok")
+    db.commit()
+
+    jobs.submit(first, "boom")
+    jobs.submit(second, "ok")
+    assert done.wait(5), "첫 작업 오류 후 워커가 멈춤"
+
+
+def _job_ids(jobs, monkeypatch):
+    claimed = []
+    monkeypatch.setattr(jobs, "_enqueue", lambda job_id, kind, payload: claimed.append(job_id))
+    return claimed
+
+
+def test_recover_claims_only_stale_jobs_once(db, monkeypatch):
+    cur = db.cursor()
+    cur.execute("UPDATE photo_jobs SET status = 'done'")
+    fresh = JobQueue().create_job(cur, 1, "ok")
+    stale = JobQueue().create_job(cur, 1, "ok")
+    cur.execute("""
+        UPDATE photo_jobs SET status = 'running', updated_at = :old WHERE job_id = :job_id
+    """, {"old": datetime(2000, 1, 1), "job_id": stale})
+    db.commit()
+
+    first, second = JobQueue(stale_after=600), JobQueue(stale_after=600)
+    got_first, got_second = _job_ids(first, monkeypatch), _job_ids(second, monkeypatch)
+    assert first.recover() == 1 and got_first == [stale]  # 방금 만든 작업은 다른 프로세스 몫
+    assert second.recover() == 0 and got_second == []     # 이미 가져간 작업은 다시 가져가지 않음
+    assert fresh not in got_first
+
+
+def test_ranking_job_is_idempotent(app_module, db, new_user, new_photo):
+    user_id = new_user("walker")
+    shot = datetime(2026, 10, 1, 10, 0)
+    photo_id = new_photo(user_id, shot_at=shot, gps_latitude=37.5, gps_longitude=127.0)
+    payload = {"photo_id": photo_id, "user_id": user_id, "shot_time": to_epoch(shot),
+               "lat": 37.5, "lon": 127.0}
+    cur = db.cursor()
+    app_module.ranking_job(cur, payload)
+    app_module.ranking_job(cur, payload)  # 복구 / 다른 프로세스에서 한 번 더 실행
+    cur.execute("SELECT photo_count FROM user_scores WHERE user_id = :u", {"u": user_id})
+    assert cur.fetchone()[0] == 1
@@ -0,0 +1,36 @@
+from like_counter import LikeCounterBuffer
+
+
+def test_like_updates_count_and_detail_cache(app_module, new_user, new_photo, login):
+    owner, fan = new_user("owner"), new_user("fan")
+    photo_id = new_photo(owner)
+    client = login(fan)
+
+    assert client.get(f"/photo/{photo_id}").get_json()["likes_count"] == 0
+    r = client.post(f"/like/{photo_id}").get_json()
+    assert r == {"status": "liked", "likes_count": 1, "liked": True}
+    assert client.get(f"/photo/{photo_id}").get_json()["likes_count"] == 1
+
+
+def test_write_behind_flush_clears_cached_counts(app_module, monkeypatch, new_user, new_photo, login):
+    buffer = LikeCounterBuffer(flush_interval=3600, on_flush=app_module.invalidate_like_counts)
+    monkeypatch.setattr(app_module, "like_buffer", buffer)
+    owner, fan = new_user("owner"), new_user("fan")
+    photo_id = new_photo(owner)
+    client = login(fan)
+
+    assert client.post(f"/like/{photo_id}").get_json()["likes_count"] == 1
+    # flush 전 조회는 DB 값(0)을 캐시한다
+    assert client.get(f"/photo/{photo_id}").get_json()["likes_count"] == 0
+
+    assert buffer.flush() == 1
+    assert client.get(f"/photo/{photo_id}").get_json()["likes_count"] == 1
+
+
+def test_like_missing_photo_is_404(app_module, db, new_user, login):
+    fan = new_user("fan")
+    r = login(fan).post("/like/987654")
+    assert r.status_code == 404
+    cur = db.cursor()
+    cur.execute("SELECT COUNT(*) FROM likes WHERE photo_id = 987654")
+    assert cur.fetchone()[0] == 0
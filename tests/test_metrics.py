@@ -0,0 +1,18 @@
+REMOTE = {"REMOTE_ADDR": "203.0.113.7"}
+
+
+def test_metrics_is_local_only(app_module):
+    client = app_module.app.test_client()
+    assert client.get("/metrics").status_code == 200
+    assert client.get("/metrics", environ_base=REMOTE).status_code == 404
+    assert client.get("/internal/pool", environ_base=REMOTE).status_code == 404
+
+
+def test_metrics_token_for_remote_scraper(app_module, monkeypatch):
+    monkeypatch.setattr(app_module, "METRICS_TOKEN", "s3cret")
+    client = app_module.app.test_client()
+    ok = client.get("/metrics", environ_base=REMOTE, headers={"Authorization": "Bearer s3cret"})
+    assert ok.status_code == 200
+    assert b"colorwalk_db_pool_busy" in ok.data
+    wrong = client.get("/metrics", environ_base=REMOTE, headers={"Authorization": "Bearer nope"})
+    assert wrong.status_code == 404
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ranking import SESSION_GAP_MIN
+from ranking_batch import compare_rankings, synthetic_rows, calculate_ranking_batch, calculate_ranking_scalar
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2, 7, 42])
+def test_batch_matches_scalar_dense(seed):
+    assert compare_rankings(synthetic_rows(n_users=20, n_photos=3000, seed=seed)) == []
+
+
+@pytest.mark.parametrize("seed", [0, 3, 11])
+def test_batch_matches_scalar_sparse(seed):
+    # 사용자당 몇 장이 60일에 흩어짐 → 사진 1장짜리 세션 / 여러 세션이 대부분
+    rows = synthetic_rows(n_users=200, n_photos=600, seed=seed)
+    assert compare_rankings(rows) == []
+
+
+def test_batch_matches_scalar_session_edges():
+    base = datetime(2025, 10, 1, 9, 0)
+    gap = timedelta(minutes=SESSION_GAP_MIN)
+    fmt = "%Y-%m-%d %H:%M:%S"
+    rows = [
+        # 간격이 정확히 SESSION_GAP_MIN / 1분 더 긴 경우
+        ("a@test", base.strftime(fmt), 37.50, 127.00),
+        ("a@test", (base + gap).strftime(fmt), 37.51, 127.01),
+        ("a@test", (base + gap * 2 + timedelta(minutes=1)).strftime(fmt), 37.52, 127.02),
+        ("a@test", (base + gap * 2 + timedelta(minutes=30)).strftime("%Y:%m:%d %H:%M:%S"), 37.53, 127.03),
+        # 사진 1장뿐인 사용자
+        ("b@test", base.strftime(fmt), 35.10, 129.00),
+        # 파싱 불가 촬영시간이 맨 앞 / 세션 중간에 섞인 사용자 (좌표가 달라 포함되면 거리가 바뀜)
+        ("c@test", "unknown", 35.10, 129.00),
+        ("c@test", base.strftime(fmt), 36.00, 128.00),
+        ("c@test", (base + timedelta(minutes=10)).strftime(fmt), 36.50, 128.50),
+        ("d@test", base.strftime(fmt), 37.00, 127.00),
+        ("d@test", "2025-13-45 99:99:99", 37.10, 127.10),
+        ("d@test", (base + timedelta(minutes=5)).strftime(fmt), 37.01, 127.01),
+        # 촬영시간을 하나도 읽을 수 없는 사용자는 양쪽 모두 제외
+        ("e@test", "unknown", 35.00, 129.00),
+    ]
+    assert compare_rankings(rows) == []
+    scalar = {r[0]: r[1:] for r in calculate_ranking_scalar(rows)}
+    assert set(scalar) == {r[0] for r in calculate_ranking_batch(rows)} == {"a@test", "b@test", "c@test", "d@test"}
+    # 파싱 불가 사진은 버리고 남은 2장만으로 세션 하나
+    assert scalar["c@test"][0] == 2 and scalar["c@test"][1] == pytest.approx(71.42, abs=0.01)
+    assert scalar["d@test"][:2] == (2, pytest.approx(1.42, abs=0.01))
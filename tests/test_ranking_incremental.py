@@ -0,0 +1,70 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from ranking import SESSION_GAP_MIN, claim_photo, record_photo, rebuild_user_sessions, to_epoch
+
+BASE = datetime(2025, 10, 1, 10, 0)
+
+
+def _score_of(cur, user_id):
+    cur.execute("""
+        SELECT photo_count, ROUND(distance_km, 2), ROUND(score, 1)
+        FROM user_scores WHERE user_id = :user_id
+    """, {"user_id": user_id})
+    return tuple(float(v) for v in cur.fetchone())
+
+
+def _run_jobs(db, user_id, photos, order):
+    """사진은 모두 먼저 커밋된 상태에서 랭킹 작업만 order 순서로 실행 (워커 여러 개와 같은 상황)"""
+    cur = db.cursor()
+    for i in order:
+        photo_id, shot_at, lat, lon = photos[i]
+        if claim_photo(cur, photo_id):
+            record_photo(cur, user_id, to_epoch(shot_at), lat, lon)
+        db.commit()
+    incremental = _score_of(cur, user_id)
+    rebuild_user_sessions(cur, user_id)
+    db.commit()
+    return incremental, _score_of(cur, user_id)
+
+
+def _insert(new_photo, user_id, points):
+    return [
+        (new_photo(user_id, shot_at=shot_at, gps_latitude=lat, gps_longitude=lon), shot_at, lat, lon)
+        for shot_at, lat, lon in points
+    ]
+
+
+def test_out_of_order_job_does_not_count_pending_photo_twice(db, new_user, new_photo):
+    user_id = new_user("ooo")
+    photos = _insert(new_photo, user_id, [
+        (BASE, 37.50, 127.00),
+        (BASE + timedelta(minutes=10), 37.51, 127.01),
+        (BASE + timedelta(minutes=10), 37.52, 127.02),  # A: 세션 끝과 같은 시각 (연속 촬영)
+        (BASE - timedelta(minutes=5), 37.49, 126.99),   # B: 세션 앞쪽 (순서가 바뀐 사진)
+    ])
+    # 세션 10:00~10:10 반영 후 B 작업이 A 작업보다 먼저 실행 → B 의 구간 재계산에 A 가 보임
+    incremental, rebuilt = _run_jobs(db, user_id, photos, [0, 1, 3, 2])
+    assert incremental == rebuilt
+    assert incremental[0] == 4
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_shuffled_jobs_match_rebuild(db, new_user, new_photo, seed):
+    rng = random.Random(seed)
+    user_id = new_user(f"shuffle{seed}")
+    points = []
+    t = BASE
+    for _ in range(25):
+        # 같은 시각(연속 촬영) / 세션 안 간격 / 세션이 끊기는 간격
+        t += timedelta(minutes=rng.choice((0, 0, 3, 12, 45, SESSION_GAP_MIN + 1)))
+        points.append((t, 37.5 + rng.random() / 50, 127.0 + rng.random() / 50))
+    photos = _insert(new_photo, user_id, points)
+    order = list(range(len(photos)))
+    rng.shuffle(order)
+
+    incremental, rebuilt = _run_jobs(db, user_id, photos, order)
+    assert incremental == rebuilt
+    assert incremental[0] == len(photos)
@@ -0,0 +1,40 @@
+from datetime import datetime, date
+
+import pytest
+
+from leaderboard import load_window_snapshot
+from ranking import record_photo, to_epoch, window_days, day_no, service_today
+
+
+def test_service_today_uses_shot_time_zone(utc_server):
+    assert service_today() == date(2026, 10, 19)
+    assert window_days("day") == (day_no(date(2026, 10, 19)),) * 2
+
+
+def test_window_boundaries():
+    monday = date(2026, 10, 19)
+    assert window_days("week", date(2026, 10, 25)) == (day_no(monday), day_no(date(2026, 10, 25)))
+    assert window_days("month", date(2026, 10, 19)) == (day_no(date(2026, 10, 1)), day_no(monday))
+    with pytest.raises(ValueError):
+        window_days("year")
+
+
+def test_upload_after_midnight_kst_is_in_today_window(utc_server, db):
+    cur = db.cursor()
+    cur.execute("INSERT INTO users (name, email, password) VALUES ('tz', 'tz@test.local', 'x')")
+    cur.execute("SELECT user_id FROM users WHERE email = 'tz@test.local'")
+    user_id = cur.fetchone()[0]
+
+    # 촬영시각은 서비스 시간대 벽시계 (SHOT_AT 과 같은 기준)
+    record_photo(cur, user_id, to_epoch(datetime(2026, 10, 19, 0, 5)), 37.50, 127.00)
+    record_photo(cur, user_id, to_epoch(datetime(2026, 10, 19, 0, 22)), 37.51, 127.01)
+    # 전날 밤 산책은 오늘 랭킹에 들어가면 안 된다
+    record_photo(cur, user_id, to_epoch(datetime(2026, 10, 18, 12, 0)), 37.50, 127.00)
+    db.commit()
+
+    day = load_window_snapshot(cur, "day").entry_of(user_id)
+    assert day is not None and day["photo_count"] == 2
+    week = load_window_snapshot(cur, "week").entry_of(user_id)
+    assert week["photo_count"] == 2  # 2026-10-19 은 월요일 → 일요일(18일) 세션은 지난주
+    month = load_window_snapshot(cur, "month").entry_of(user_id)
+    assert month["photo_count"] == 3
@@ -0,0 +1,132 @@
+import os
+import gzip
+
+import pytest
+from flask import url_for
+
+from assets import IMMUTABLE, REVALIDATE, precompress_assets
+
+CSS = "body { color: #333; }\n" * 200  # 압축본이 원본보다 작도록
+
+
+@pytest.fixture
+def asset(app_module):
+    """임시 static 폴더에 CSS 하나 (+ .gz / .br) → (filename, 지문 URL)"""
+    static = app_module.app.static_folder
+    path = os.path.join(static, "css", "test-asset.css")
+    with open(path, "w") as f:
+        f.write(CSS)
+    for ext in (".gz", ".br"):
+        if os.path.exists(path + ext):
+            os.remove(path + ext)
+    with app_module.app.test_request_context():
+        url = url_for("static", filename="css/test-asset.css")
+    yield "css/test-asset.css", url
+    for p in (path, path + ".gz", path + ".br"):
+        if os.path.exists(p):
+            os.remove(p)
+
+
+def test_url_for_adds_content_fingerprint(app_module, asset):
+    filename, url = asset
+    assert url.startswith("/static/css/test-asset.css?v=")
+    assert url.endswith(app_module.static_assets.fingerprint(filename))
+
+
+def test_versioned_url_is_immutable_with_strong_etag(app_module, asset):
+    _, url = asset
+    r = app_module.app.test_client().get(url)
+    assert r.status_code == 200
+    assert r.headers["Cache-Control"] == IMMUTABLE
+    etag = r.headers["ETag"]
+    assert etag and not etag.startswith("W/")
+
+
+def test_unversioned_or_stale_url_revalidates(app_module, asset):
+    filename, _ = asset
+    client = app_module.app.test_client()
+    for url in (f"/static/{filename}", f"/static/{filename}?v=0000000000000000"):
+        assert client.get(url).headers["Cache-Control"] == REVALIDATE
+
+
+def test_if_none_match_returns_empty_304(app_module, asset):
+    _, url = asset
+    client = app_module.app.test_client()
+    etag = client.get(url).headers["ETag"]
+    again = client.get(url, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+
+def test_content_change_changes_fingerprint_and_etag(app_module, asset):
+    filename, url = asset
+    client = app_module.app.test_client()
+    etag = client.get(url).headers["ETag"]
+    path = os.path.join(app_module.app.static_folder, filename)
+    with open(path, "a") as f:
+        f.write("a { color: red; }\n")
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10**9))
+    with app_module.app.test_request_context():
+        new_url = url_for("static", filename=filename)
+    assert new_url != url
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_precompressed_variant_follows_accept_encoding(app_module, asset):
+    filename, url = asset
+    static = app_module.app.static_folder
+    precompress_assets(static)
+    path = os.path.join(static, filename)
+    if not os.path.exists(path + ".br"):  # brotli 패키지가 없을 때: 선택 로직만 확인
+        with open(path + ".br", "wb") as f:
+            f.write(b"br-bytes")
+    client = app_module.app.test_client()
+
+    br = client.get(url, headers={"Accept-Encoding": "br, gzip"})
+    assert br.headers["Content-Encoding"] == "br"
+    assert br.headers["ETag"].strip('"').endswith("-br")
+    assert "Accept-Encoding" in br.headers["Vary"]
+
+    gz = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert gz.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(gz.data).decode() == CSS
+    assert gz.headers["ETag"] != br.headers["ETag"]
+
+    plain = client.get(url, headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in plain.headers
+    assert plain.get_data(as_text=True) == CSS
+
+    # 원본보다 오래된 압축본은 쓰지 않음
+    st = os.stat(path)
+    os.utime(path + ".gz", ns=(st.st_atime_ns, st.st_mtime_ns - 10**9))
+    os.remove(path + ".br")
+    stale = client.get(url, headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in stale.headers
+
+
+def test_content_addressed_upload_is_immutable_without_version(app_module):
+    digest = "ab" * 32
+    rel = f"uploads/ab/ab/thumb/{digest}.webp"
+    path = os.path.join(app_module.app.static_folder, *rel.split("/"))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"RIFF0000WEBP")
+    r = app_module.app.test_client().get(f"/static/{rel}")
+    assert r.status_code == 200
+    assert r.headers["Cache-Control"] == IMMUTABLE
+    assert r.headers["ETag"].strip('"') == digest[:16]
+
+
+def test_page_static_urls_are_fingerprinted(app_module, new_user, login):
+    import re
+    client = login(new_user("pages"))
+    urls = set()
+    for page in ("/", "/gallery", "/ranking", "/mypage"):
+        urls.update(re.findall(r"""/static/(?:css|js)/[^"'\s)<>]+""", client.get(page).get_data(as_text=True)))
+    assert urls
+    for url in urls:
+        url = url.replace("&amp;", "&")
+        assert "?v=" in url, url
+        first = client.get(url)
+        assert first.headers["Cache-Control"] == IMMUTABLE, url
+        assert client.get(url, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
@@ -0,0 +1,18 @@
+import io
+
+from storage import store_upload, register_blob
+
+
+def test_same_content_is_stored_and_registered_once(db, tmp_path):
+    cur = db.cursor()
+    first = store_upload(io.BytesIO(b"same bytes"), str(tmp_path), "a.jpg")
+    second = store_upload(io.BytesIO(b"same bytes"), str(tmp_path), "b.jpg")
+    assert first["save_path"] == second["save_path"]
+    assert first["is_new"] and not second["is_new"]
+
+    assert register_blob(cur, first["content_hash"], first["db_path"], first["byte_size"]) is True
+    # 중복 INSERT 는 PK 위반 → 트랜잭션은 그대로 이어서 쓸 수 있어야 한다
+    assert register_blob(cur, second["content_hash"], second["db_path"], second["byte_size"]) is False
+    db.commit()
+    cur.execute("SELECT COUNT(*) FROM upload_blobs WHERE content_hash = :h", {"h": first["content_hash"]})
+    assert cur.fetchone()[0] == 1
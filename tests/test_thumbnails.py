@@ -0,0 +1,67 @@
+import io
+import os
+
+from PIL import Image
+
+from images import static_file
+
+
+def _jpeg(color):
+    buf = io.BytesIO()
+    Image.new("RGB", (320, 240), color).save(buf, "JPEG")
+    buf.seek(0)
+    return buf
+
+
+def _upload(client, color, name):
+    r = client.post("/upload", data={"description": name, "image": (_jpeg(color), f"{name}.jpg")},
+                    content_type="multipart/form-data")
+    assert r.status_code == 302
+
+
+def _latest(cur, user_id):
+    cur.execute("""
+        SELECT photo_id, image_path, thumb_url FROM photos
+        WHERE user_id = :u ORDER BY photo_id DESC FETCH FIRST 1 ROWS ONLY
+    """, {"u": user_id})
+    return cur.fetchone()
+
+
+def test_thumb_url_is_stored_only_after_derive(app_module, db, monkeypatch, new_user, login):
+    user_id = new_user("thumbs")
+    client = login(user_id)
+    started = []
+    # 작업은 커밋 직후 바로 돌지 않게 막아 두고 "derive 전" 상태를 확인
+    monkeypatch.setattr(app_module.job_queue, "submit", lambda *job: started.append(job))
+    _upload(client, (10, 200, 30), "fresh")
+    cur = db.cursor()
+    photo_id, image_path, thumb_url = _latest(cur, user_id)
+    assert thumb_url is None
+    assert [kind for _, kind, _ in started] == ["derive", "color", "ranking"]
+    cards = client.get("/mypage").get_data(as_text=True)
+    assert app_module.public_url(image_path) in cards  # 썸네일이 생기기 전에는 원본
+
+    derive = next(payload for _, kind, payload in started if kind == "derive")
+    app_module.derive_job(cur, derive)
+    thumb = app_module.public_url(image_path, "thumb")
+    assert _latest(cur, user_id)[2] == thumb
+    assert os.path.exists(static_file(app_module.app.static_folder, image_path, "thumb"))
+    assert thumb in client.get("/mypage").get_data(as_text=True)
+
+    # 같은 내용 재업로드: 썸네일이 이미 있으므로 바로 저장, derive 작업 없음
+    started.clear()
+    _upload(client, (10, 200, 30), "again")
+    assert _latest(cur, user_id)[2] == thumb
+    assert "derive" not in [kind for _, kind, _ in started]
+
+
+def test_backfill_only_fills_existing_thumbnails(app_module, db, new_user, new_photo):
+    user_id = new_user("legacy")
+    missing = new_photo(user_id, image_path="uploads/00/00/missing.jpg")
+    cur = db.cursor()
+    cur.execute("UPDATE photos SET thumb_url = NULL WHERE photo_id = :p", {"p": missing})
+    db.commit()
+    result = app_module.app.test_cli_runner().invoke(args=["backfill-image-urls", "--batch-size", "2"])
+    assert result.exit_code == 0, result.output
+    cur.execute("SELECT thumb_url FROM photos WHERE photo_id = :p", {"p": missing})
+    assert cur.fetchone()[0] is None
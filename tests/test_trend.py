@@ -0,0 +1,25 @@
+# 외딴 bbox 를 써서 다른 테스트가 넣은 사진과 섞이지 않게 한다
+BBOX = "130.000000,40.000000,131.000000,41.000000"
+
+
+def test_single_photo_cluster_has_popup_fields(app_module, new_user, new_photo):
+    user_id = new_user("trend")
+    lone = new_photo(user_id, gps_latitude=40.10, gps_longitude=130.10,
+                     image_path="static/uploads/ab/cd/lone.jpg",
+                     thumb_url="static/uploads/ab/cd/thumb/lone.webp")
+    for _ in range(2):
+        new_photo(user_id, gps_latitude=40.90, gps_longitude=130.90)
+
+    client = app_module.app.test_client()
+    data = client.get(f"/api/trend/clusters?bbox={BBOX}&zoom=7").get_json()
+    assert data["mode"] == "clusters"
+
+    by_count = sorted(data["clusters"], key=lambda c: c["count"])
+    single, group = by_count
+    assert single["count"] == 1
+    assert single["photo_id"] == lone
+    assert single["image_path"] == "/static/uploads/ab/cd/thumb/lone.webp"
+    assert single["username"] == "trend"
+    # 여러 장짜리 클러스터는 확대용이라 팝업 정보가 없다
+    assert group["count"] == 2
+    assert "photo_id" not in group and "image_path" not in group
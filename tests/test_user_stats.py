@@ -0,0 +1,45 @@
+from db_config import IntegrityError
+from user_stats import load_user_stats, rebuild_user_stats
+
+
+class _RacingCursor:
+    """INSERT INTO user_stats 직전에 다른 연결이 같은 행을 먼저 만든 상황"""
+
+    def __init__(self, cur, other):
+        self._cur, self._other = cur, other
+
+    def __getattr__(self, name):
+        return getattr(self._cur, name)
+
+    def execute(self, sql, params=None):
+        if sql.lstrip().startswith("INSERT INTO user_stats"):
+            rebuild_user_stats(self._other.cursor(), params["user_id"])
+            self._other.commit()
+            raise IntegrityError("ORA-00001: unique constraint violated")
+        return self._cur.execute(sql, params)
+
+
+def test_first_load_creates_row(db, new_user, new_photo):
+    user_id = new_user("stats")
+    new_photo(user_id, likes_count=3)
+    stats = load_user_stats(db.cursor(), user_id)
+    assert (stats["photo_count"], stats["likes_received"], stats["likes_given"]) == (1, 3, 0)
+
+
+def test_concurrent_first_load_rereads_instead_of_failing(db, new_user, new_photo):
+    from db_config import get_connection
+    user_id = new_user("race")
+    new_photo(user_id, likes_count=2)
+    other = get_connection()
+    try:
+        stats = load_user_stats(_RacingCursor(db.cursor(), other), user_id)
+    finally:
+        other.close()
+    assert stats["photo_count"] == 1 and stats["likes_received"] == 2
+
+
+def test_mypage_header_uses_stats(app_module, new_user, new_photo, login):
+    user_id = new_user("header")
+    new_photo(user_id)
+    html = login(user_id).get("/mypage").get_data(as_text=True)
+    assert "📸 1개의 사진" in html
@@ -0,0 +1,123 @@
+import logging
+
+from db_config import IntegrityError
+
+log = logging.getLogger(__name__)
+
+# =========================================
+# 사용자별 통계 (USER_STATS, 마이페이지 상단)
+# =========================================
+# 업로드 수 / 받은 좋아요 / 누른 좋아요를 쓰기 시점에 증감만 반영한다 (COUNT/SUM 재계산 없음)
+#  - 업로드 / 가져오기 : photo_count + n
+#  - 좋아요 토글       : 누른 사람 likes_given ± 1, 사진 주인 likes_received ± 1
+#                        (LIKE_WRITE_BEHIND 모드에서는 likes_count 와 같이 flush 때 반영)
+#  - 기존 DB 는 flask rebuild-user-stats 로 한 번 채운다. 그래도 행이 없는 사용자는
+#    처음 조회할 때 INSERT 만으로 만든다 (동시에 만들면 PK 위반 → 롤백 후 다시 읽음)
+# 총 이동 거리는 USER_SCORES(랭킹 집계)에서, 순위는 리더보드 스냅샷에서 가져온다.
+
+STAT_COLUMNS = ("photo_count", "likes_received", "likes_given")
+
+
+def bump_user_stats(cur, user_id, photos=0, likes_given=0, likes_received=0):
+    """한 사용자 통계 증감 (행이 없으면 건너뜀 → 조회 시 집계로 생성)"""
+    if not (photos or likes_given or likes_received):
+        return
+    cur.execute("""
+        UPDATE user_stats
+        SET photo_count = photo_count + :photos,
+            likes_given = likes_given + :likes_given,
+            likes_received = likes_received + :likes_received,
+            updated_at = SYSTIMESTAMP
+        WHERE user_id = :user_id
+    """, {
+        "user_id": user_id,
+        "photos": photos,
+        "likes_given": likes_given,
+        "likes_received": likes_received,
+    })
+
+
+def bump_likes_received(cur, deltas):
+    """{photo_id: 증감} → 각 사진 주인의 likes_received 를 한 번의 executemany 로 반영"""
+    rows = [{"photo_id": pid, "delta": d} for pid, d in deltas.items() if d]
+    if not rows:
+        return
+    cur.executemany("""
+        UPDATE user_stats
+        SET likes_received = likes_received + :delta, updated_at = SYSTIMESTAMP
+        WHERE user_id = (SELECT user_id FROM photos WHERE photo_id = :photo_id)
+    """, rows)
+
+
+_AGGREGATE = """
+    SELECT u.user_id,
+           (SELECT COUNT(*) FROM photos p WHERE p.user_id = u.user_id),
+           (SELECT NVL(SUM(p.likes_count), 0) FROM photos p WHERE p.user_id = u.user_id),
+           (SELECT COUNT(*) FROM likes l WHERE l.user_id = u.user_id),
+           SYSTIMESTAMP
+    FROM users u
+"""
+
+
+def rebuild_user_stats(cur, user_id=None):
+    """PHOTOS / LIKES 에서 다시 집계 (user_id 가 없으면 전체) → 만든 행 수"""
+    if user_id is None:
+        cur.execute("DELETE FROM user_stats")
+        cur.execute(f"""
+            INSERT INTO user_stats (user_id, photo_count, likes_received, likes_given, updated_at)
+            {_AGGREGATE}
+        """)
+    else:
+        cur.execute("DELETE FROM user_stats WHERE user_id = :user_id", {"user_id": user_id})
+        cur.execute(f"""
+            INSERT INTO user_stats (user_id, photo_count, likes_received, likes_given, updated_at)
+            {_AGGREGATE} WHERE u.user_id = :user_id
+        """, {"user_id": user_id})
+    return cur.rowcount
+
+
+def create_user_stats(cur, user_id):
+    """행이 없을 때만 집계해서 INSERT (이미 있으면 그대로) → 새로 만들었으면 True"""
+    try:
+        cur.execute(f"""
+            INSERT INTO user_stats (user_id, photo_count, likes_received, likes_given, updated_at)
+            {_AGGREGATE}
+            WHERE u.user_id = :user_id
+              AND NOT EXISTS (SELECT 1 FROM user_stats s WHERE s.user_id = u.user_id)
+        """, {"user_id": user_id})
+        created = cur.rowcount == 1
+        cur.connection.commit()
+        return created
+    except IntegrityError:
+        # ✅ 다른 요청이 같은 사용자 행을 먼저 만듦 → 그 행을 쓰면 된다
+        cur.connection.rollback()
+        return False
+
+
+def load_user_stats(cur, user_id):
+    """
+    통계 한 줄 + 랭킹 집계 (기본키 조회 1번)
+    반환: {"photo_count", "likes_received", "likes_given", "distance_km", "score"}
+    """
+    def fetch():
+        cur.execute("""
+            SELECT s.photo_count, s.likes_received, s.likes_given,
+                   NVL(sc.distance_km, 0), NVL(sc.score, 0)
+            FROM user_stats s
+            LEFT JOIN user_scores sc ON sc.user_id = s.user_id
+            WHERE s.user_id = :user_id
+        """, {"user_id": user_id})
+        return cur.fetchone()
+
+    row = fetch()
+    if row is None:
+        # ✅ 처음 보는 사용자: 한 번만 집계해서 행을 만든다
+        if create_user_stats(cur, user_id):
+            log.debug("사용자 통계 생성: user_id=%s", user_id)
+        row = fetch()
+    if row is None:
+        return None
+    stats = dict(zip(STAT_COLUMNS, (max(int(v or 0), 0) for v in row[:3])))
+    stats["distance_km"] = round(float(row[3]), 2)
+    stats["score"] = round(float(row[4]), 1)
+    return stats